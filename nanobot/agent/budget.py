@@ -0,0 +1,103 @@
+"""Token budgets for tool results appended to the prompt."""
+
+from nanobot.agent.tokens import heuristic_tokens
+
+
+class ToolResultBudget:
+    """
+    Caps how much tool output enters the prompt during one turn.
+
+    Every tool result is sent again on each later LLM call of the turn, so an
+    oversized result is paid for many times. Each result is limited to the
+    tool's own cap (``per_tool``, else ``max_tokens``) and to what is left of
+    the turn-wide ``turn_tokens``; a result over its limit keeps its head and
+    tail and states how much was elided from the middle. Once the turn budget
+    is spent, results still get ``min_tokens`` so the model sees something.
+
+    Limits of 0 disable the corresponding cap. Create one budget per turn
+    with ``fork()``.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        turn_tokens: int = 16000,
+        per_tool: dict[str, int] | None = None,
+        min_tokens: int = 256,
+    ):
+        self.max_tokens = max_tokens
+        self.turn_tokens = turn_tokens
+        self.per_tool = per_tool or {}
+        self.min_tokens = min_tokens
+        self.used_tokens = 0
+        self.elided_tokens = 0
+
+    def fork(self) -> "ToolResultBudget":
+        """Return a fresh budget with the same limits (for a new turn)."""
+        return ToolResultBudget(self.max_tokens, self.turn_tokens, self.per_tool, self.min_tokens)
+
+    def limit_for(self, tool_name: str) -> int | None:
+        """Token limit for the next result of a tool, or None if unlimited."""
+        limits = []
+        tool_limit = self.per_tool.get(tool_name, self.max_tokens)
+        if tool_limit > 0:
+            limits.append(tool_limit)
+        if self.turn_tokens > 0:
+            limits.append(max(self.turn_tokens - self.used_tokens, self.min_tokens))
+        return min(limits) if limits else None
+
+    def fit(self, tool_name: str, result: str) -> str:
+        """
+        Shrink a tool result to its budget and charge it to the turn.
+
+        Args:
+            tool_name: Name of the tool that produced the result.
+            result: Raw tool output.
+
+        Returns:
+            The result unchanged if it fits, otherwise its head and tail
+            around a note saying how much was elided.
+        """
+        tokens = heuristic_tokens(result)
+        limit = self.limit_for(tool_name)
+        if limit is None or tokens <= limit:
+            self.used_tokens += tokens
+            return result
+
+        # Scale by the result's own density so wide (CJK) text is cut as far as ASCII
+        fitted = sample_head_tail(result, len(result) * limit // tokens)
+        fitted_tokens = heuristic_tokens(fitted)
+        self.used_tokens += fitted_tokens
+        self.elided_tokens += tokens - fitted_tokens
+        return fitted
+
+
+def sample_head_tail(text: str, max_chars: int, head_ratio: float = 2 / 3) -> str:
+    """
+    Keep the start and end of ``text`` within ``max_chars``, noting the gap.
+
+    Cuts snap to line boundaries when one is close, so lines are not split.
+    """
+    if len(text) <= max_chars:
+        return text
+    keep = max(max_chars - 200, 0)  # leave room for the elision note
+    head_len = int(keep * head_ratio)
+    tail_len = keep - head_len
+
+    head = text[:head_len]
+    cut = head.rfind("\n")
+    if cut > head_len * 0.8:
+        head = head[:cut]
+
+    tail = text[len(text) - tail_len:] if tail_len else ""
+    cut = tail.find("\n")
+    if 0 <= cut < tail_len * 0.2:
+        tail = tail[cut + 1:]
+
+    elided = len(text) - len(head) - len(tail)
+    note = (
+        f"\n\n[... {elided:,} chars (~{heuristic_tokens(text[len(head):len(text) - len(tail)]):,} tokens) "
+        f"of {len(text):,} elided from the middle of this result to fit the context budget. "
+        f"Request a narrower range if you need the missing part. ...]\n\n"
+    )
+    return head + note + tail
@@ -1,13 +1,17 @@
 """Context builder for assembling agent prompts."""
 
-import base64
-import mimetypes
 import platform
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+from loguru import logger
+
+from nanobot.agent.budget import ToolResultBudget, sample_head_tail
+from nanobot.agent.media import ImageEncoder
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
+from nanobot.agent.tokens import CHARS_PER_TOKEN, TokenEstimator
+from nanobot.utils.helpers import stat_signature
 
 
 class ContextBuilder:
@@ -16,14 +20,64 @@ class ContextBuilder:
     
     Assembles bootstrap files, memory, skills, and conversation history
     into a coherent prompt for the LLM.
+    
+    Each system prompt section is cached together with a cheap key (file
+    mtimes/sizes, skills signature) and only rebuilt when that key changes,
+    so an unchanged workspace costs a few ``stat`` calls per turn.
+    
+    Layouts:
+        inline: everything, including the current time, session and
+            conversation summary, goes into the system message.
+        cache: the system message only holds stable content (identity,
+            bootstrap files, skills, then memory) so it stays byte-identical
+            across calls; time, session and summary go into a runtime context
+            message placed right before the current user message. This lets
+            provider prompt caches reuse the system prompt and history prefix.
     """
     
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
+    LAYOUTS = ("inline", "cache")
+    # Tool results of the current turn are cut to this when a prompt overflows
+    COMPACT_TOOL_RESULT_TOKENS = 1000
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        layout: str = "inline",
+        media: ImageEncoder | None = None,
+        tokens: TokenEstimator | None = None,
+        memory: MemoryStore | None = None,
+    ):
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown prompt layout {layout!r}; expected one of {self.LAYOUTS}")
         self.workspace = workspace
-        self.memory = MemoryStore(workspace)
+        self.layout = layout
+        self.media = media or ImageEncoder()
+        self.tokens = tokens or TokenEstimator()
+        self.memory = memory or MemoryStore(workspace)
         self.skills = SkillsLoader(workspace)
+        self._sections: dict[str, tuple[Any, str]] = {}  # name -> (key, content)
+        self._workspace_path: str | None = None
+    
+    def invalidate(self, path: Path | None = None) -> None:
+        """
+        Drop cached prompt sections so the next build re-reads the workspace.
+        
+        Args:
+            path: The file that changed (e.g. from a file tool); ignored, as
+                dropping everything is cheap.
+        """
+        self._sections.clear()
+        self.skills.invalidate()
+    
+    def _section(self, name: str, key: Any, build: Callable[[], str]) -> str:
+        """Return a cached section, rebuilding it if its key changed."""
+        cached = self._sections.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        content = build()
+        self._sections[name] = (key, content)
+        return content
     
     def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
         """
@@ -36,30 +90,46 @@ class ContextBuilder:
             Complete system prompt.
         """
         parts = []
+        cache_layout = self.layout == "cache"
         
-        # Core identity
-        parts.append(self._get_identity())
+        # Core identity (the cache layout moves the current time out of it)
+        parts.append(self._get_identity(include_time=not cache_layout))
         
         # Bootstrap files
-        bootstrap = self._load_bootstrap_files()
+        bootstrap = self._section(
+            "bootstrap",
+            stat_signature(self.workspace / name for name in self.BOOTSTRAP_FILES),
+            self._load_bootstrap_files,
+        )
         if bootstrap:
             parts.append(bootstrap)
         
-        # Memory context
-        memory = self.memory.get_memory_context()
-        if memory:
+        # Memory context (only the pinned core once memory is retrieved per message)
+        memory = self._section(
+            "memory",
+            stat_signature([self.memory.memory_file, self.memory.get_today_file()]),
+            lambda: (
+                self.memory.get_pinned_context()
+                if self.memory.uses_retrieval()
+                else self.memory.get_memory_context()
+            ),
+        )
+        if memory and not cache_layout:
             parts.append(f"# Memory\n\n{memory}")
         
         # Skills - progressive loading
+        skills_key = self.skills.signature()
         # 1. Always-loaded skills: include full content
-        always_skills = self.skills.get_always_skills()
-        if always_skills:
-            always_content = self.skills.load_skills_for_context(always_skills)
-            if always_content:
-                parts.append(f"# Active Skills\n\n{always_content}")
+        always_content = self._section(
+            "always_skills",
+            skills_key,
+            lambda: self.skills.load_skills_for_context(self.skills.get_always_skills()),
+        )
+        if always_content:
+            parts.append(f"# Active Skills\n\n{always_content}")
         
         # 2. Available skills: only show summary (agent uses read_file to load)
-        skills_summary = self.skills.build_skills_summary()
+        skills_summary = self._section("skills_summary", skills_key, self.skills.build_skills_summary)
         if skills_summary:
             parts.append(f"""# Skills
 
@@ -68,19 +138,31 @@ Skills with available="false" need dependencies installed first - you can try in
 
 {skills_summary}""")
         
+        # Memory changes more often than skills, so the cache layout puts it last
+        if memory and cache_layout:
+            parts.append(f"# Memory\n\n{memory}")
+        
         return "\n\n---\n\n".join(parts)
     
-    def _get_identity(self) -> str:
+    def _get_identity(self, include_time: bool = True) -> str:
         """Get the core identity section.
 
         The personality and name are defined in SOUL.md (loaded separately).
         This method only provides runtime context and tool instructions.
         """
-        from datetime import datetime
-        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
-        workspace_path = str(self.workspace.expanduser().resolve())
+        if self._workspace_path is None:
+            self._workspace_path = str(self.workspace.expanduser().resolve())
+        workspace_path = self._workspace_path
+        time_section = f"{self._current_time_section()}\n\n" if include_time else ""
         system = platform.system()
         runtime = f"{'macOS' if system == 'Darwin' else system} {platform.machine()}, Python {platform.python_version()}"
+        if self.memory.use_facts:
+            remember_hint = (
+                "When remembering something, use the 'remember' tool (and 'forget' for outdated facts). "
+                "MEMORY.md is generated from these facts; do not edit it directly."
+            )
+        else:
+            remember_hint = f"When remembering something, write to {workspace_path}/memory/MEMORY.md"
         
         return f"""# System Context
 
@@ -93,23 +175,26 @@ You have access to tools that allow you to:
 - Send messages to users on chat channels
 - Spawn subagents for complex background tasks
 
-## Current Time
-{now}
-
-## Runtime
+{time_section}## Runtime
 {runtime}
 
 ## Workspace
 Your workspace is at: {workspace_path}
 - Memory files: {workspace_path}/memory/MEMORY.md
-- Daily notes: {workspace_path}/memory/YYYY-MM-DD.md
+- Daily notes: {workspace_path}/memory/YYYY-MM-DD.md (older months are bundled into memory/archive/YYYY-MM.zip; find them with memory_search)
 - Custom skills: {workspace_path}/skills/{{skill-name}}/SKILL.md
 
 IMPORTANT: When responding to direct questions or conversations, reply directly with your text response.
 Only use the 'message' tool when you need to send a message to a specific chat channel (like WhatsApp).
 For normal conversation, just respond with text - do not call the message tool.
 
-When remembering something, write to {workspace_path}/memory/MEMORY.md"""
+{remember_hint}"""
+    
+    @staticmethod
+    def _current_time_section() -> str:
+        from datetime import datetime
+        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
+        return f"## Current Time\n{now}"
     
     def _load_bootstrap_files(self) -> str:
         """Load all bootstrap files from workspace."""
@@ -132,6 +217,7 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
         channel: str | None = None,
         chat_id: str | None = None,
         summary: str | None = None,
+        token_budget: int | None = None,
     ) -> list[dict[str, Any]]:
         """
         Build the complete message list for an LLM call.
@@ -144,58 +230,168 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
             channel: Current channel (telegram, feishu, etc.).
             chat_id: Current chat/user ID.
             summary: Optional conversation summary from previous context evictions.
+            token_budget: Prompt tokens available for all messages (context
+                window minus tool schemas and reserved output). History is
+                packed newest-first into what the other messages leave.
 
         Returns:
             List of messages including system prompt.
         """
-        messages = []
-
         # System prompt
         system_prompt = self.build_system_prompt(skill_names)
+        relevant = self.memory.get_relevant_context(current_message) if self.memory.uses_retrieval() else ""
+        volatile = self._volatile_sections(channel, chat_id, summary, relevant)
+        if self.layout == "inline":
+            system_prompt += "".join(f"\n\n{section}" for section in volatile)
+        head = [{"role": "system", "content": system_prompt}]
+
+        # Cache layout: per-call context goes after the cacheable prefix
+        tail = []
+        if self.layout == "cache":
+            runtime = "\n\n".join([self._current_time_section(), *volatile])
+            tail.append({"role": "user", "content": f"# Runtime Context\n\n{runtime}"})
+
+        # Current message (with optional image attachments)
+        user_content = self._build_user_content(current_message, media)
+        tail.append({"role": "user", "content": user_content})
+
+        # History
+        if token_budget is not None:
+            history = self.pack_history(history, token_budget - self.tokens.count_messages(head + tail))
+
+        return head + list(history) + tail
+
+    def tail_length(self) -> int:
+        """Number of messages ``build_messages`` places after the history."""
+        return 2 if self.layout == "cache" else 1
+
+    def compact(
+        self,
+        messages: list[dict[str, Any]],
+        turn_start: int,
+        target_tokens: int,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Shrink a prompt the provider rejected as too long.
+
+        Replaces images with a placeholder, cuts this turn's tool results to
+        their head and tail, then drops the oldest history until the prompt
+        fits ``target_tokens``.
+
+        Args:
+            messages: The rejected message list (system prompt first).
+            turn_start: Index of the first message of the current turn;
+                everything between the system prompt and it is history.
+            target_tokens: Token estimate the compacted prompt must fit.
+
+        Returns:
+            The compacted messages and the new ``turn_start``.
+        """
+        max_chars = self.COMPACT_TOOL_RESULT_TOKENS * CHARS_PER_TOKEN
+        compacted = []
+        for i, msg in enumerate(messages):
+            content = msg.get("content")
+            if isinstance(content, list):
+                texts = [
+                    block.get("text", "") if block.get("type") == "text" else "[image omitted]"
+                    for block in content
+                ]
+                msg = {**msg, "content": "\n".join(texts)}
+            elif msg.get("role") == "tool" and i >= turn_start and isinstance(content, str):
+                msg = {**msg, "content": sample_head_tail(content, max_chars)}
+            compacted.append(msg)
+
+        head, history, turn = compacted[:1], compacted[1:turn_start], compacted[turn_start:]
+        history = self.pack_history(history, target_tokens - self.tokens.count_messages(head + turn))
+        return head + history + turn, len(head) + len(history)
+
+    def pack_history(self, history: list[dict[str, Any]], budget: int) -> list[dict[str, Any]]:
+        """
+        Keep the newest history messages that fit in ``budget`` tokens.
+
+        The result starts at a user message, since providers reject
+        conversations that open with an assistant turn.
+        """
+        kept: list[dict[str, Any]] = []
+        used = 0
+        for msg in reversed(history):
+            cost = self.tokens.count_messages([msg])
+            if used + cost > budget:
+                break
+            kept.append(msg)
+            used += cost
+        kept.reverse()
+        while kept and kept[0].get("role") != "user":
+            kept.pop(0)
+        if len(kept) < len(history):
+            logger.debug(
+                f"History packed to {len(kept)}/{len(history)} messages "
+                f"({used} of {budget} budgeted tokens)"
+            )
+        return kept
+
+    @staticmethod
+    def _volatile_sections(
+        channel: str | None, chat_id: str | None, summary: str | None, relevant_memory: str = ""
+    ) -> list[str]:
+        """Sections that change between calls: session, summary and retrieved memory."""
+        sections = []
+        if relevant_memory:
+            sections.append(f"## Relevant Memory\n\n{relevant_memory}")
         if channel and chat_id:
-            system_prompt += f"\n\n## Current Session\nChannel: {channel}\nChat ID: {chat_id}"
+            sections.append(f"## Current Session\nChannel: {channel}\nChat ID: {chat_id}")
         if summary:
-            system_prompt += (
-                "\n\n## Conversation Summary\n\n"
+            sections.append(
+                "## Conversation Summary\n\n"
                 "The following is a summary of earlier conversation that is no longer "
                 "in the message history:\n\n"
                 f"{summary}"
             )
-        messages.append({"role": "system", "content": system_prompt})
-
-        # History
-        messages.extend(history)
-
-        # Current message (with optional image attachments)
-        user_content = self._build_user_content(current_message, media)
-        messages.append({"role": "user", "content": user_content})
-
-        return messages
+        return sections
 
     def _build_user_content(self, text: str, media: list[str] | None) -> str | list[dict[str, Any]]:
-        """Build user message content with optional base64-encoded images."""
+        """
+        Build user message content with optional base64-encoded images.
+        
+        Images go through ``self.media`` (downscaled, cached by content hash);
+        await ``self.media.prepare(media)`` first to encode them off the loop.
+        """
         if not media:
             return text
         
-        images = []
-        for path in media:
-            p = Path(path)
-            mime, _ = mimetypes.guess_type(path)
-            if not p.is_file() or not mime or not mime.startswith("image/"):
-                continue
-            b64 = base64.b64encode(p.read_bytes()).decode()
-            images.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}})
+        images = [block for block in map(self.media.encode, media) if block]
         
         if not images:
             return text
         return images + [{"type": "text", "text": text}]
     
+    def add_user_message(
+        self,
+        messages: list[dict[str, Any]],
+        content: str,
+        media: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Add a user message to the message list (e.g. one arriving mid-turn).
+        
+        Args:
+            messages: Current message list.
+            content: Message text.
+            media: Optional list of local file paths for images.
+        
+        Returns:
+            Updated message list.
+        """
+        messages.append({"role": "user", "content": self._build_user_content(content, media)})
+        return messages
+    
     def add_tool_result(
         self,
         messages: list[dict[str, Any]],
         tool_call_id: str,
         tool_name: str,
-        result: str
+        result: str,
+        budget: ToolResultBudget | None = None,
     ) -> list[dict[str, Any]]:
         """
         Add a tool result to the message list.
@@ -205,10 +401,14 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
             tool_call_id: ID of the tool call.
             tool_name: Name of the tool.
             result: Tool execution result.
+            budget: Turn's tool result budget; oversized results are
+                head/tail-sampled to fit it.
         
         Returns:
             Updated message list.
         """
+        if budget is not None:
+            result = budget.fit(tool_name, result)
         messages.append({
             "role": "tool",
             "tool_call_id": tool_call_id,
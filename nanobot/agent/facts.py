@@ -0,0 +1,256 @@
+"""Structured long-term memory: a SQLite store of keyed facts."""
+
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from nanobot.agent.memory_index import chunk_markdown, index_terms
+from nanobot.agent.tokens import heuristic_tokens
+
+# Section bodies of the onboarding MEMORY.md template, not worth importing
+_PLACEHOLDER = re.compile(r"^\(.*\)$|^This file stores important information", re.DOTALL)
+
+# Values this long are specific enough that a match under another key is the same fact
+VALUE_DEDUP_MIN_CHARS = 40
+
+
+@dataclass
+class Fact:
+    """One remembered fact."""
+    key: str
+    value: str
+    session_key: str | None
+    created_at: float
+    updated_at: float
+    accessed_at: float
+    access_count: int
+    importance: int  # 1 (trivia) .. 5 (core facts, pruned last)
+
+    def tokens(self) -> int:
+        """Estimated tokens of the fact as rendered in MEMORY.md."""
+        return heuristic_tokens(f"- **{self.key}**: {self.value}\n")
+
+
+def normalize(text: str) -> str:
+    """Canonical form used to detect duplicate keys and values."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class FactStore:
+    """
+    SQLite-backed store of facts, the source of truth for long-term memory.
+
+    Facts are deduplicated on insert: a fact whose key matches an existing
+    one (ignoring case and whitespace) updates that row instead of adding a
+    new one. So does a fact whose value matches, once the value has at least
+    ``VALUE_DEDUP_MIN_CHARS`` characters; short values such as "Max" or
+    "Berlin" can belong to unrelated facts. Once the rendered facts exceed ``max_tokens``, the
+    least important and least recently used facts are pruned.
+    """
+
+    _COLUMNS = "key, value, session_key, created_at, updated_at, accessed_at, access_count, importance"
+
+    def __init__(self, db_path: Path, max_tokens: int = 2000):
+        self.db_path = db_path
+        self.max_tokens = max_tokens
+        self._db = sqlite3.connect(db_path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS facts (
+                norm_key TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                norm_value TEXT NOT NULL,
+                session_key TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                access_count INTEGER NOT NULL DEFAULT 0,
+                importance INTEGER NOT NULL DEFAULT 3
+            );
+            CREATE INDEX IF NOT EXISTS facts_norm_value ON facts (norm_value);
+            """
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+
+    def remember(
+        self,
+        key: str,
+        value: str,
+        session_key: str | None = None,
+        importance: int = 3,
+    ) -> tuple[str, list[Fact]]:
+        """
+        Store a fact, merging it with an existing one with the same key (or long value).
+
+        Args:
+            key: Short name of the fact, e.g. "user's birthday".
+            value: The fact itself.
+            session_key: Session the fact was learned in.
+            importance: 1-5; higher values survive pruning longer.
+
+        Returns:
+            ("added" | "updated" | "unchanged", facts pruned to stay under the
+            cap). The fact just stored is never pruned.
+        """
+        status = self._upsert(key, value, session_key, importance)
+        return status, self.prune(keep=normalize(key))
+
+    def _upsert(self, key: str, value: str, session_key: str | None, importance: int) -> str:
+        """Insert or merge one fact (see ``remember``) without pruning."""
+        key, value = key.strip(), value.strip()
+        norm_key, norm_value = normalize(key), normalize(value)
+        importance = min(max(importance, 1), 5)
+        # NULL never compares equal, so short values only merge on their key
+        dedup_value = norm_value if len(norm_value) >= VALUE_DEDUP_MIN_CHARS else None
+        now = time.time()
+
+        with self._db:
+            row = self._db.execute(
+                "SELECT norm_key, norm_value, importance FROM facts "
+                "WHERE norm_key = ? OR norm_value = ? ORDER BY norm_key = ? DESC LIMIT 1",
+                (norm_key, dedup_value, norm_key),
+            ).fetchone()
+            if row is None:
+                self._db.execute(
+                    "INSERT INTO facts (norm_key, key, value, norm_value, session_key, "
+                    "created_at, updated_at, accessed_at, importance) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (norm_key, key, value, norm_value, session_key, now, now, now, importance),
+                )
+                status = "added"
+            elif row[0] == norm_key and row[1] == norm_value and row[2] >= importance:
+                self._db.execute("UPDATE facts SET accessed_at = ? WHERE norm_key = ?", (now, row[0]))
+                status = "unchanged"
+            else:
+                # Same key: new value. Same value under another key: keep the newer key.
+                self._db.execute(
+                    "DELETE FROM facts WHERE norm_key != ? AND (norm_key = ? OR norm_value = ?)",
+                    (row[0], norm_key, dedup_value),
+                )
+                self._db.execute(
+                    "UPDATE facts SET norm_key = ?, key = ?, value = ?, norm_value = ?, "
+                    "session_key = COALESCE(?, session_key), updated_at = ?, accessed_at = ?, "
+                    "importance = MAX(importance, ?) WHERE norm_key = ?",
+                    (norm_key, key, value, norm_value, session_key, now, now, importance, row[0]),
+                )
+                status = "updated"
+        return status
+
+    def forget(self, key: str) -> bool:
+        """Delete the fact with this key. Returns whether one existed."""
+        with self._db:
+            cur = self._db.execute("DELETE FROM facts WHERE norm_key = ?", (normalize(key),))
+        return cur.rowcount > 0
+
+    def get(self, key: str) -> Fact | None:
+        row = self._db.execute(
+            f"SELECT {self._COLUMNS} FROM facts WHERE norm_key = ?", (normalize(key),)
+        ).fetchone()
+        return Fact(*row) if row else None
+
+    def all(self) -> list[Fact]:
+        """All facts, most important first, then alphabetically by key."""
+        rows = self._db.execute(
+            f"SELECT {self._COLUMNS} FROM facts ORDER BY importance DESC, norm_key"
+        ).fetchall()
+        return [Fact(*row) for row in rows]
+
+    def recall(self, query: str, limit: int = 10) -> list[Fact]:
+        """
+        Find facts sharing terms with ``query`` and mark them as used.
+
+        Facts are ranked by the fraction of query terms they contain, then
+        by importance. An empty query returns the most important facts.
+        """
+        terms = set(index_terms(query))
+        scored = []
+        for fact in self.all():
+            if terms:
+                fact_terms = set(index_terms(f"{fact.key} {fact.value}"))
+                score = len(terms & fact_terms) / len(terms)
+                if score == 0:
+                    continue
+            else:
+                score = 0.0
+            scored.append((score, fact.importance, fact))
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        hits = [fact for _, _, fact in scored[:limit]]
+
+        if hits:
+            now = time.time()
+            with self._db:
+                self._db.executemany(
+                    "UPDATE facts SET accessed_at = ?, access_count = access_count + 1 "
+                    "WHERE norm_key = ?",
+                    [(now, normalize(fact.key)) for fact in hits],
+                )
+        return hits
+
+    def prune(self, keep: str | None = None) -> list[Fact]:
+        """
+        Drop facts until the rendered store fits in ``max_tokens``.
+
+        The victims are the least important facts, least recently used
+        (remembered or recalled) first. The fact whose normalized key is
+        ``keep`` is never dropped, even if the store stays over the cap.
+
+        Returns:
+            The facts that were removed.
+        """
+        if self.max_tokens <= 0:
+            return []
+        rows = self._db.execute(
+            f"SELECT {self._COLUMNS} FROM facts ORDER BY importance ASC, accessed_at ASC"
+        ).fetchall()
+        facts = [Fact(*row) for row in rows]
+        total = sum(fact.tokens() for fact in facts)
+        removed = []
+        for fact in facts:
+            if total <= self.max_tokens:
+                break
+            if normalize(fact.key) == keep:
+                continue
+            removed.append(fact)
+            total -= fact.tokens()
+        if removed:
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM facts WHERE norm_key = ?", [(normalize(f.key),) for f in removed]
+                )
+        return removed
+
+    def import_markdown(self, text: str) -> int:
+        """
+        Seed the store from a free-form MEMORY.md, one fact per section.
+
+        Sections that share a heading (including untitled ones, imported as
+        "Notes", and the parts of a long section) get numbered keys so none
+        overwrites another. The store is pruned once, after the import.
+
+        Returns:
+            Number of facts imported.
+        """
+        count = 0
+        seen: dict[str, int] = {}
+        for heading, body in chunk_markdown(text, max_chars=10_000):
+            if _PLACEHOLDER.match(body):
+                continue
+            if not heading or heading.lower() in ("long-term memory", "memory"):
+                heading = "Notes"
+            n = seen[normalize(heading)] = seen.get(normalize(heading), 0) + 1
+            key = heading if n == 1 else f"{heading} ({n})"
+            count += self._upsert(key, body, None, 3) == "added"
+        self.prune()
+        return count
+
+    def render(self) -> str:
+        """Render all facts as markdown (the content of MEMORY.md)."""
+        lines = [f"- **{fact.key}**: {fact.value}" for fact in self.all()]
+        return "\n".join(lines)
@@ -3,25 +3,55 @@
 import asyncio
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, TYPE_CHECKING
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
+from nanobot.providers.base import ERROR_FINISH_REASONS, LLMProvider, LLMResponse
+from nanobot.agent.budget import ToolResultBudget
 from nanobot.agent.context import ContextBuilder
+from nanobot.agent.media import ImageEncoder
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.tools.base import ToolContext
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.tools.memory import ForgetTool, MemorySearchTool, RecallTool, RememberTool
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.spawn import SpawnTool
 from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.tools.sticker import StickerTool
+from nanobot.agent.scheduler import TurnScheduler
+from nanobot.agent.streaming import ReplyStreamer
 from nanobot.agent.subagent import SubagentManager
 from nanobot.agent.summarizer import Summarizer
+from nanobot.agent.tokens import TokenEstimator
 from nanobot.session.manager import SessionManager
+from nanobot.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from nanobot.session.manager import Session
+
+# Commands that cancel the running turn of a session
+STOP_COMMANDS = {"/stop"}
+
+# Recorded as the assistant reply of a turn that was cancelled
+INTERRUPTED_REPLY = "(Stopped before finishing this reply.)"
+
+# Sent when a turn fails with an unexpected error
+ERROR_REPLY = "Sorry, I encountered an error: {error}"
+
+# Used when neither config nor model metadata give a context window
+DEFAULT_CONTEXT_WINDOW = 32768
+
+# After a context overflow, the prompt is compacted to this fraction of its estimate
+COMPACT_RATIO = 0.75
+
+# On shutdown, turns already accepted get this long to finish before they are cancelled
+SHUTDOWN_GRACE_S = 10.0
 
 
 class AgentLoop:
@@ -51,10 +81,33 @@ class AgentLoop:
         allowed_paths: list[str] | None = None,
         protected_paths: list[str] | None = None,
         reasoning_effort: str | None = None,
-        context_window: int = 32768,
+        context_window: int | None = None,
         summarize_threshold: float = 0.6,
         message_buffer_min: int = 10,
         summary_model: str | None = None,
+        summary_chunk_tokens: int = 8000,
+        summary_concurrency: int = 4,
+        summary_incremental: bool = True,
+        max_concurrent_turns: int = 4,
+        max_queued_turns_per_session: int = 4,
+        max_queued_turns: int = 64,
+        stream_replies: bool = False,
+        stream_interval_ms: int = 1000,
+        turn_preemption: str = "queue",
+        tool_result_max_tokens: int = 4000,
+        tool_result_turn_tokens: int = 16000,
+        tool_result_limits: dict[str, int] | None = None,
+        prompt_layout: str = "inline",
+        image_max_dimension: int = 1568,
+        image_quality: int = 85,
+        max_tokens: int = 4096,
+        memory_inline_tokens: int = 2000,
+        memory_pinned_tokens: int = 500,
+        memory_top_k: int = 5,
+        memory_fsync_every: int = 0,
+        memory_archive_days: int = 31,
+        memory_facts: bool = False,
+        memory_facts_max_tokens: int = 2000,
     ):
         from nanobot.config.schema import ExecToolConfig
         from nanobot.cron.service import CronService
@@ -68,19 +121,51 @@ class AgentLoop:
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
         self.reasoning_effort = reasoning_effort
+        self.max_tokens = max_tokens
+        self.stream_replies = stream_replies
+        self.stream_interval_ms = stream_interval_ms
+        self.turn_preemption = turn_preemption
         self.allowed_paths = [Path(p).expanduser().resolve() for p in (allowed_paths or [])]
         self.protected_paths = [Path(p).resolve() for p in (protected_paths or [])]
         
         # Summarization settings
-        self.context_window = context_window
+        self.context_window = (
+            context_window or provider.get_context_window(self.model) or DEFAULT_CONTEXT_WINDOW
+        )
         self.summarize_threshold = summarize_threshold
         self.message_buffer_min = message_buffer_min
         self.summarizer = Summarizer(
             provider=provider,
             model=summary_model or self.model,
+            tokens=TokenEstimator(summary_model or self.model),
+            chunk_tokens=summary_chunk_tokens,
+            max_concurrency=summary_concurrency,
+            incremental=summary_incremental,
         )
         
-        self.context = ContextBuilder(workspace)
+        # Template for each turn's tool result budget (see ToolResultBudget)
+        self.tool_budget = ToolResultBudget(
+            max_tokens=tool_result_max_tokens,
+            turn_tokens=tool_result_turn_tokens,
+            per_tool=tool_result_limits,
+        )
+        
+        self.context = ContextBuilder(
+            workspace,
+            layout=prompt_layout,
+            media=ImageEncoder(max_dimension=image_max_dimension, quality=image_quality),
+            tokens=TokenEstimator(self.model),
+            memory=MemoryStore(
+                workspace,
+                inline_tokens=memory_inline_tokens,
+                pinned_tokens=memory_pinned_tokens,
+                top_k=memory_top_k,
+                fsync_every=memory_fsync_every,
+                archive_days=memory_archive_days,
+                use_facts=memory_facts,
+                facts_max_tokens=memory_facts_max_tokens,
+            ),
+        )
         self.sessions = session_manager or SessionManager(workspace)
         self.tools = ToolRegistry()
         self.subagents = SubagentManager(
@@ -93,8 +178,19 @@ class AgentLoop:
             restrict_to_workspace=restrict_to_workspace,
             allowed_paths=self.allowed_paths,
             protected_paths=self.protected_paths,
+            tool_budget=self.tool_budget,
         )
         
+        # Turns for the same session stay ordered; different sessions run in parallel
+        self.scheduler = TurnScheduler(
+            self._handle_inbound,
+            max_concurrent=max_concurrent_turns,
+            max_pending_per_session=max_queued_turns_per_session,
+            max_pending=max_queued_turns,
+        )
+        # session key -> messages folded into its running turn ("fold" preemption)
+        self._turn_inboxes: dict[str, list[InboundMessage]] = {}
+        
         self._running = False
         self._register_default_tools()
     
@@ -109,8 +205,9 @@ class AgentLoop:
         # File tools (protected_paths only on write/edit to allow reading)
         protected = self.protected_paths or None
         self.tools.register(ReadFileTool(allowed_dirs=allowed_dirs))
-        self.tools.register(WriteFileTool(allowed_dirs=allowed_dirs, protected_paths=protected))
-        self.tools.register(EditFileTool(allowed_dirs=allowed_dirs, protected_paths=protected))
+        on_write = self.context.invalidate
+        self.tools.register(WriteFileTool(allowed_dirs=allowed_dirs, protected_paths=protected, on_write=on_write))
+        self.tools.register(EditFileTool(allowed_dirs=allowed_dirs, protected_paths=protected, on_write=on_write))
         self.tools.register(ListDirTool(allowed_dirs=allowed_dirs))
         
         # Shell tool
@@ -126,6 +223,13 @@ class AgentLoop:
         self.tools.register(WebSearchTool(api_key=self.brave_api_key))
         self.tools.register(WebFetchTool())
         
+        # Memory search tool
+        self.tools.register(MemorySearchTool(self.context.memory))
+        if self.context.memory.use_facts:
+            self.tools.register(RememberTool(self.context.memory))
+            self.tools.register(ForgetTool(self.context.memory))
+            self.tools.register(RecallTool(self.context.memory))
+        
         # Message tool
         message_tool = MessageTool(send_callback=self.bus.publish_outbound)
         self.tools.register(message_tool)
@@ -153,43 +257,141 @@ class AgentLoop:
         
         while self._running:
             try:
+                # Leave the backlog on the bus (bounded) while the scheduler is full
+                await asyncio.wait_for(self.scheduler.wait_for_capacity(), timeout=1.0)
                 # Wait for next message
                 msg = await asyncio.wait_for(
                     self.bus.consume_inbound(),
                     timeout=1.0
                 )
-                
-                # Process it
-                try:
-                    response = await self._process_message(msg)
-                    if response:
-                        await self.bus.publish_outbound(response)
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
             except asyncio.TimeoutError:
                 continue
+            
+            await self._dispatch(msg)
+        
+        # Sessions saved by the last turns may still be queued for writing
+        await self.flush()
+    
+    async def flush(self) -> None:
+        """Write out pending session saves and fsync batched memory notes."""
+        await self.sessions.flush()
+        self.context.memory.sync()
+    
+    async def drain(self, timeout: float = SHUTDOWN_GRACE_S) -> None:
+        """
+        Stop consuming and finish the work already accepted (call on shutdown).
+        
+        Messages still on the bus are handed to the scheduler, and queued and
+        running turns get up to ``timeout`` seconds to finish before they are
+        cancelled. Pending session writes and memory notes are flushed last.
+        """
+        self.stop()
+        while self.bus.inbound_size:
+            await self._dispatch(await self.bus.consume_inbound())
+        try:
+            await asyncio.wait_for(self.scheduler.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Cancelling {self.scheduler.active_sessions} unfinished sessions at shutdown")
+            self.scheduler.cancel_all()
+            await self.scheduler.join()
+        await self.flush()
+    
+    async def _dispatch(self, msg: InboundMessage) -> None:
+        """Route one consumed message to its session's turn queue."""
+        key = self._session_key(msg)
+        
+        # /stop and preemption act on the running turn, so they skip the queue
+        if msg.channel != "system":
+            if msg.content.strip().lower() in STOP_COMMANDS:
+                await self._handle_stop(msg, key)
+                return
+            if self.scheduler.is_running(key):
+                if self.turn_preemption == "fold" and self._fold_into_turn(key, msg):
+                    return
+                if self.turn_preemption == "cancel":
+                    self.scheduler.cancel(key)
+        
+        # Hand it to the scheduler; the turn runs in a per-session worker
+        self.scheduler.submit(key, msg)
+    
+    @staticmethod
+    def _session_key(msg: InboundMessage) -> str:
+        """Session a message belongs to (and is ordered under).
+
+        System messages (subagent announces) carry the origin "channel:chat_id"
+        in chat_id, so they are serialized with the conversation they report to.
+        """
+        if msg.channel == "system":
+            return msg.chat_id if ":" in msg.chat_id else f"cli:{msg.chat_id}"
+        return msg.session_key
+    
+    async def _handle_stop(self, msg: InboundMessage, key: str) -> None:
+        """Cancel the session's running turn, queued turns and subagents."""
+        cancelled = self.scheduler.cancel(key, drop_pending=True)
+        subagents = self.subagents.cancel_for_session(key)
+        logger.info(f"/stop for {key}: turn cancelled={cancelled}, subagents cancelled={subagents}")
+        await self.bus.publish_outbound(OutboundMessage(
+            channel=msg.channel,
+            chat_id=msg.chat_id,
+            content="⏹ Stopped." if cancelled or subagents else "Nothing to stop.",
+            metadata=msg.metadata or {},
+        ))
+    
+    def _fold_into_turn(self, key: str, msg: InboundMessage) -> bool:
+        """Hand a message to the session's running turn; False if it can't take it."""
+        inbox = self._turn_inboxes.get(key)
+        if inbox is None:
+            return False
+        inbox.append(msg)
+        logger.info(f"Folded message into running turn for {key}")
+        return True
+    
+    async def _handle_inbound(self, msg: InboundMessage) -> None:
+        """Process one inbound message and publish the response (scheduler handler)."""
+        try:
+            response = await self._process_message(msg, stream=self.stream_replies)
+            if response:
+                await self.bus.publish_outbound(response)
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+            # Send error response
+            await self.bus.publish_outbound(OutboundMessage(
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                content=ERROR_REPLY.format(error=e)
+            ))
     
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
         logger.info("Agent loop stopping")
     
-    async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
+    async def _process_message(
+        self, msg: InboundMessage, stream: bool = False
+    ) -> OutboundMessage | None:
         """
         Process a single inbound message.
         
         Args:
             msg: The inbound message to process.
+            stream: Publish partial replies to the bus while the LLM generates
+                (channels that support editing update one message in place).
         
         Returns:
             The response message, or None if no response needed.
         """
+        # Keep the session cached until the turn has saved it
+        with self.sessions.pinned(self._session_key(msg)), get_tracer().start_trace(
+            "turn", channel=msg.channel, chat_id=msg.chat_id, sender_id=msg.sender_id
+        ) as span:
+            if span.trace_id:
+                logger.debug(f"Turn {span.trace_id} started for {msg.channel}:{msg.chat_id}")
+            return await self._process_turn(msg, stream=stream)
+    
+    async def _process_turn(
+        self, msg: InboundMessage, stream: bool = False
+    ) -> OutboundMessage | None:
+        """Process one inbound message inside its turn span (see _process_message)."""
         # Handle system messages (subagent announces)
         # The chat_id contains the original "channel:chat_id" to route back to
         if msg.channel == "system":
@@ -204,75 +406,72 @@ class AgentLoop:
             return await self._handle_reset_command(msg)
         
         # Get or create session
-        session = self.sessions.get_or_create(msg.session_key)
-        
-        # Update tool contexts
-        message_tool = self.tools.get("message")
-        if isinstance(message_tool, MessageTool):
-            message_tool.set_context(msg.channel, msg.chat_id)
-        
-        spawn_tool = self.tools.get("spawn")
-        if isinstance(spawn_tool, SpawnTool):
-            spawn_tool.set_context(msg.channel, msg.chat_id)
-        
-        cron_tool = self.tools.get("cron")
-        if isinstance(cron_tool, CronTool):
-            cron_tool.set_context(msg.channel, msg.chat_id)
-        
-        sticker_tool = self.tools.get("sticker")
-        if isinstance(sticker_tool, StickerTool):
-            sticker_tool.set_context(msg.channel, msg.chat_id, metadata=msg.metadata)
+        session = await self.sessions.get_or_create_async(msg.session_key)
         
-        # Build initial messages (use get_history for LLM-formatted messages)
-        messages = self.context.build_messages(
-            history=session.get_history(),
-            current_message=msg.content,
-            media=msg.media if msg.media else None,
+        # Per-turn tool context (routes message/spawn/cron/sticker back to this chat)
+        tool_context = ToolContext(
             channel=msg.channel,
             chat_id=msg.chat_id,
-            summary=session.summary or None,
+            metadata=msg.metadata or {},
         )
         
-        # Agent loop
-        iteration = 0
-        final_content = None
-        last_response = None
+        # Build initial messages (use get_history for LLM-formatted messages)
+        await self.context.media.prepare(msg.media)
+        with get_tracer().span("context.build", history_messages=len(session.messages)):
+            messages = self.context.build_messages(
+                history=session.get_history(max_messages=None),
+                current_message=msg.content,
+                media=msg.media if msg.media else None,
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                summary=session.summary or None,
+                token_budget=self._prompt_budget(),
+            )
         
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            # Call LLM
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model,
-                reasoning_effort=self.reasoning_effort,
+        streamer = None
+        if stream:
+            streamer = ReplyStreamer(
+                self.bus.publish_outbound,
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                metadata=msg.metadata or {},
+                interval_s=self.stream_interval_ms / 1000,
             )
-            last_response = response
-            
-            # Handle tool calls
-            if response.has_tool_calls:
-                # Use raw assistant message from provider to preserve
-                # provider-specific fields (e.g. Gemini thought_signature)
-                messages = self.context.add_raw_assistant_message(
-                    messages, response.raw_assistant_message,
-                    content=response.content,
-                    tool_calls=response.tool_calls,
-                    reasoning_content=response.reasoning_content,
-                )
-                
-                # Execute tools
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                    logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                # No tool calls, we're done
-                final_content = response.content
-                break
+        
+        # Messages for this session that arrive mid-turn may be folded in
+        inbox: list[InboundMessage] = []
+        self._turn_inboxes[msg.session_key] = inbox
+        
+        # Agent loop
+        try:
+            final_content, last_response = await self._run_agent_loop(
+                messages, tool_context, streamer=streamer, inbox=inbox
+            )
+        except asyncio.CancelledError:
+            # Keep the request in history so a follow-up message has context
+            self._save_turn(session, msg, inbox, INTERRUPTED_REPLY)
+            if streamer and streamer.started:
+                await self.bus.publish_outbound(streamer.finish(OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content=f"{streamer.text}\n\n⏹ Stopped.".strip(),
+                    metadata=msg.metadata or {},
+                )))
+            raise
+        except Exception as e:
+            if not (streamer and streamer.started):
+                raise
+            # Close the partial reply with the error instead of leaving it half-written
+            logger.error(f"Error processing message: {e}")
+            return streamer.finish(OutboundMessage(
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                content=f"{streamer.text}\n\n{ERROR_REPLY.format(error=e)}".strip(),
+                metadata=msg.metadata or {},
+            ))
+        finally:
+            if self._turn_inboxes.get(msg.session_key) is inbox:
+                del self._turn_inboxes[msg.session_key]
         
         if final_content is None:
             final_content = "I've completed processing but have no response to give."
@@ -282,24 +481,37 @@ class AgentLoop:
         logger.info(f"Response to {msg.channel}:{msg.sender_id}: {preview}")
         
         # Save to session
-        session.add_message("user", msg.content)
-        session.add_message("assistant", final_content)
-        self.sessions.save(session)
+        self._save_turn(session, msg, inbox, final_content)
         
         # Check if summarization should be triggered based on token usage
         self._maybe_trigger_summarization(session, last_response)
         
-        return OutboundMessage(
+        response_msg = OutboundMessage(
             channel=msg.channel,
             chat_id=msg.chat_id,
             content=final_content,
             metadata=msg.metadata or {},  # Pass through for channel-specific needs (e.g. Slack thread_ts)
         )
+        return streamer.finish(response_msg) if streamer else response_msg
+    
+    def _save_turn(
+        self,
+        session: "Session",
+        msg: InboundMessage,
+        folded: list[InboundMessage],
+        reply: str,
+    ) -> None:
+        """Append a turn's user message(s) and reply to the session and persist it."""
+        session.add_message("user", msg.content)
+        for extra in folded:
+            session.add_message("user", extra.content)
+        session.add_message("assistant", reply)
+        self.sessions.save(session)
     
     async def _handle_reset_command(self, msg: InboundMessage) -> OutboundMessage:
         """Handle /reset, /clear, /new commands by clearing session history."""
         session_key = msg.session_key
-        session = self.sessions.get_or_create(session_key)
+        session = await self.sessions.get_or_create_async(session_key)
         msg_count = len(session.messages)
         session.clear()
         self.sessions.save(session)
@@ -322,75 +534,27 @@ class AgentLoop:
         logger.info(f"Processing system message from {msg.sender_id}")
         
         # Parse origin from chat_id (format: "channel:chat_id")
-        if ":" in msg.chat_id:
-            parts = msg.chat_id.split(":", 1)
-            origin_channel = parts[0]
-            origin_chat_id = parts[1]
-        else:
-            # Fallback
-            origin_channel = "cli"
-            origin_chat_id = msg.chat_id
+        origin_channel, origin_chat_id = self._session_key(msg).split(":", 1)
         
         # Use the origin session for context
         session_key = f"{origin_channel}:{origin_chat_id}"
-        session = self.sessions.get_or_create(session_key)
+        session = await self.sessions.get_or_create_async(session_key)
         
-        # Update tool contexts
-        message_tool = self.tools.get("message")
-        if isinstance(message_tool, MessageTool):
-            message_tool.set_context(origin_channel, origin_chat_id)
-        
-        spawn_tool = self.tools.get("spawn")
-        if isinstance(spawn_tool, SpawnTool):
-            spawn_tool.set_context(origin_channel, origin_chat_id)
-        
-        cron_tool = self.tools.get("cron")
-        if isinstance(cron_tool, CronTool):
-            cron_tool.set_context(origin_channel, origin_chat_id)
+        tool_context = ToolContext(channel=origin_channel, chat_id=origin_chat_id)
         
         # Build messages with the announce content
-        messages = self.context.build_messages(
-            history=session.get_history(),
-            current_message=msg.content,
-            channel=origin_channel,
-            chat_id=origin_chat_id,
-            summary=session.summary or None,
-        )
-        
-        # Agent loop (limited for announce handling)
-        iteration = 0
-        final_content = None
-        last_response = None
-        
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model,
-                reasoning_effort=self.reasoning_effort,
+        with get_tracer().span("context.build", history_messages=len(session.messages)):
+            messages = self.context.build_messages(
+                history=session.get_history(max_messages=None),
+                current_message=msg.content,
+                channel=origin_channel,
+                chat_id=origin_chat_id,
+                summary=session.summary or None,
+                token_budget=self._prompt_budget(),
             )
-            last_response = response
-            
-            if response.has_tool_calls:
-                messages = self.context.add_raw_assistant_message(
-                    messages, response.raw_assistant_message,
-                    content=response.content,
-                    tool_calls=response.tool_calls,
-                    reasoning_content=response.reasoning_content,
-                )
-                
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                    logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                final_content = response.content
-                break
+        
+        # Agent loop (announce handling)
+        final_content, last_response = await self._run_agent_loop(messages, tool_context)
         
         if final_content is None:
             final_content = "Background task completed."
@@ -409,6 +573,157 @@ class AgentLoop:
             content=final_content
         )
     
+    async def _run_agent_loop(
+        self,
+        messages: list[dict[str, Any]],
+        tool_context: ToolContext,
+        streamer: ReplyStreamer | None = None,
+        inbox: list[InboundMessage] | None = None,
+    ) -> tuple[str | None, LLMResponse | None]:
+        """
+        Run the LLM ↔ tool iteration loop for one turn.
+        
+        Args:
+            messages: Initial messages (system prompt, history, user message).
+            tool_context: Per-turn context passed to every tool call.
+            streamer: If given, LLM calls are streamed and partial text is
+                published through it.
+            inbox: Messages from the same session that arrive during the turn
+                are appended here; they are added as user messages before the
+                next LLM call, and a reply is only final once none are unseen.
+        
+        Returns:
+            Tuple of (final content or None if the iteration limit was hit,
+            last LLM response).
+        """
+        iteration = 0
+        last_response = None
+        inbox = inbox if inbox is not None else []
+        folded_seen = 0
+        budget = self.tool_budget.fork()
+        turn_start = len(messages) - self.context.tail_length()
+        compacted = False
+        
+        while iteration < self.max_iterations:
+            iteration += 1
+            
+            for extra in inbox[folded_seen:]:
+                await self.context.media.prepare(extra.media)
+                messages = self.context.add_user_message(messages, extra.content, extra.media or None)
+            folded_seen = len(inbox)
+            
+            # Call LLM
+            tools = self.tools.get_definitions()
+            estimated_messages = self.context.tokens.count_messages(messages)
+            estimated = estimated_messages + self.context.tokens.count_tools(tools)
+            with get_tracer().span(
+                "llm.chat", model=self.model, iteration=iteration, streamed=streamer is not None,
+                estimated_prompt_tokens=estimated,
+            ) as span:
+                if streamer:
+                    response = await self._chat_streamed(messages, streamer)
+                else:
+                    response = await self.provider.chat(
+                        messages=messages,
+                        tools=tools,
+                        model=self.model,
+                        max_tokens=self.max_tokens,
+                        reasoning_effort=self.reasoning_effort,
+                    )
+                for key, value in response.usage.items():
+                    span.set_attribute(f"usage.{key}", value)
+                self.context.tokens.calibrate(estimated, response.usage.get("prompt_tokens", 0))
+                if response.usage.get("cached_tokens"):
+                    logger.debug(
+                        f"Prompt cache hit: {response.usage['cached_tokens']}/"
+                        f"{response.usage.get('prompt_tokens', 0)} prompt tokens"
+                    )
+                span.set_attribute("finish_reason", response.finish_reason)
+                if response.finish_reason in ERROR_FINISH_REASONS:
+                    span.set_error(response.content or "error")
+            last_response = response
+            
+            if response.finish_reason == "context_length" and not compacted:
+                # Our estimate was too low: compact once and retry this call
+                compacted = True
+                if estimated <= self.context_window - self.max_tokens:
+                    # We thought it fit, so we undercount for this model
+                    self.context.tokens.calibrate(estimated, int(estimated / COMPACT_RATIO))
+                target = int(min(estimated_messages, self._prompt_budget()) * COMPACT_RATIO)
+                messages, turn_start = self.context.compact(messages, turn_start, target)
+                logger.warning(
+                    f"Prompt exceeded the context window (~{estimated} tokens estimated); "
+                    f"retrying with {len(messages)} messages compacted to ~{target} tokens"
+                )
+                iteration -= 1
+                continue
+            
+            if not response.has_tool_calls:
+                if len(inbox) > folded_seen:
+                    # New messages arrived during this call: answer them too
+                    messages = self.context.add_assistant_message(messages, response.content)
+                    continue
+                # No tool calls, we're done
+                return response.content, last_response
+            
+            # Use raw assistant message from provider to preserve
+            # provider-specific fields (e.g. Gemini thought_signature)
+            messages = self.context.add_raw_assistant_message(
+                messages, response.raw_assistant_message,
+                content=response.content,
+                tool_calls=response.tool_calls,
+                reasoning_content=response.reasoning_content,
+            )
+            
+            # Execute tools (read-only calls in parallel, results kept in call order)
+            for tool_call in response.tool_calls:
+                args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
+                logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
+            results = await self.tools.execute_batch(
+                [(tc.name, tc.arguments) for tc in response.tool_calls],
+                context=tool_context,
+            )
+            for tool_call, result in zip(response.tool_calls, results):
+                messages = self.context.add_tool_result(
+                    messages, tool_call.id, tool_call.name, result, budget=budget
+                )
+            if budget.elided_tokens:
+                logger.debug(
+                    f"Tool result budget: {budget.used_tokens} tokens kept, "
+                    f"~{budget.elided_tokens} elided this turn"
+                )
+        
+        return None, last_response
+    
+    async def _chat_streamed(
+        self, messages: list[dict[str, Any]], streamer: ReplyStreamer
+    ) -> LLMResponse:
+        """Call the LLM in streaming mode, forwarding content deltas to the streamer."""
+        streamer.begin_iteration()
+        response = None
+        async for delta in self.provider.chat_stream(
+            messages=messages,
+            tools=self.tools.get_definitions(),
+            model=self.model,
+            max_tokens=self.max_tokens,
+            reasoning_effort=self.reasoning_effort,
+        ):
+            if delta.content:
+                await streamer.feed(delta.content)
+            if delta.response is not None:
+                response = delta.response
+        if response is None:
+            return LLMResponse(
+                content="Error calling LLM: stream ended without a response",
+                finish_reason="error",
+            )
+        return response
+    
+    def _prompt_budget(self) -> int:
+        """Prompt tokens left for messages: context window minus tool schemas and reserved output."""
+        tools_tokens = self.context.tokens.count_tools(self.tools.get_definitions())
+        return self.context_window - self.max_tokens - tools_tokens
+    
     def _maybe_trigger_summarization(
         self, session: "Session", last_response: "LLMResponse | None"
     ) -> None:
@@ -444,12 +759,14 @@ class AgentLoop:
             f"  Current messages: {len(session.messages)}\n"
             f"  Will keep: {self.message_buffer_min} recent messages after summarization"
         )
+        # The task loads the full history itself (off the turn's path) and
+        # clears the flag however it ends
         session.summary_in_progress = True
         self.summarizer.fire_and_forget(
             session=session,
             session_manager=self.sessions,
-            messages_snapshot=list(session.messages),
-            previous_summary=session.summary,
+            messages_snapshot=None,
+            previous_summary=None,
             min_keep=self.message_buffer_min,
         )
 
@@ -0,0 +1,122 @@
+"""Image preprocessing for multimodal prompts: downscale, recompress, cache."""
+
+import asyncio
+import base64
+import hashlib
+import io
+import mimetypes
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+try:
+    from PIL import Image, ImageOps
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Formats vision APIs accept as-is; anything else (HEIC, BMP, TIFF...) is re-encoded
+PASSTHROUGH_MIME_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+
+class ImageEncoder:
+    """
+    Turns image files into ``image_url`` content blocks for the LLM.
+
+    Images whose longest side exceeds ``max_dimension`` are downscaled and
+    recompressed (JPEG at ``quality``, or PNG when they have transparency).
+    Encoded data URLs are cached by content hash, and file stats map to
+    hashes, so an image that is re-sent or retried is neither re-read nor
+    re-encoded. Without Pillow, images are sent unchanged.
+
+    Encoding is CPU-bound: call ``prepare()`` from async code to run it in a
+    worker thread, after which ``encode()`` is a cache hit.
+    """
+
+    def __init__(self, max_dimension: int = 1568, quality: int = 85, cache_size: int = 64):
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.cache_size = cache_size
+        self._urls: OrderedDict[str, str] = OrderedDict()  # content hash -> data URL
+        self._digests: dict[tuple, str] = {}  # (path, mtime_ns, size) -> content hash
+        self._lock = threading.Lock()  # prepare() fills the caches from worker threads
+
+    async def prepare(self, paths: list[str] | None) -> None:
+        """Encode images in a worker thread so later ``encode()`` calls hit the cache."""
+        if paths:
+            await asyncio.to_thread(lambda: [self.encode(p) for p in paths])
+
+    def encode(self, path: str) -> dict[str, Any] | None:
+        """
+        Build an ``image_url`` content block for an image file.
+
+        Args:
+            path: Local file path.
+
+        Returns:
+            The content block, or None if the path is not a readable image.
+        """
+        p = Path(path)
+        mime, _ = mimetypes.guess_type(path)
+        if not mime or not mime.startswith("image/"):
+            return None
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        if not p.is_file():
+            return None
+
+        stat_key = (str(p), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+            url = self._urls.get(digest) if digest else None
+        if url is None:
+            data = p.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            with self._lock:
+                url = self._urls.get(digest)
+            if url is None:
+                url = self._to_data_url(data, mime)
+
+        with self._lock:
+            self._digests[stat_key] = digest
+            self._urls[digest] = url
+            self._urls.move_to_end(digest)
+            while len(self._urls) > self.cache_size:
+                self._urls.popitem(last=False)
+            if len(self._digests) > self.cache_size * 4:
+                self._digests.clear()
+        return {"type": "image_url", "image_url": {"url": url}}
+
+    def _to_data_url(self, data: bytes, mime: str) -> str:
+        if PIL_AVAILABLE and self.max_dimension > 0:
+            try:
+                data, mime = self._shrink(data, mime)
+            except Exception as e:
+                logger.warning(f"Could not preprocess image ({mime}), sending original: {e}")
+        return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+    def _shrink(self, data: bytes, mime: str) -> tuple[bytes, str]:
+        """Downscale and recompress if the image is too large or in an unsupported format."""
+        with Image.open(io.BytesIO(data)) as img:
+            too_large = max(img.size) > self.max_dimension
+            if not too_large and mime in PASSTHROUGH_MIME_TYPES:
+                return data, mime
+
+            img = ImageOps.exif_transpose(img)
+            if too_large:
+                img.thumbnail((self.max_dimension, self.max_dimension), Image.Resampling.LANCZOS)
+
+            out = io.BytesIO()
+            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                img.save(out, format="PNG", optimize=True)
+                mime = "image/png"
+            else:
+                img.convert("RGB").save(out, format="JPEG", quality=self.quality, optimize=True)
+                mime = "image/jpeg"
+        return out.getvalue(), mime
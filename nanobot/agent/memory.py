@@ -1,25 +1,133 @@
 """Memory system for persistent agent memory."""
 
+import os
+import re
+import sqlite3
+import threading
+import zipfile
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from loguru import logger
+
+from nanobot.agent.facts import Fact, FactStore
+from nanobot.agent.memory_index import MemoryHit, MemoryIndex
+from nanobot.agent.tokens import CHARS_PER_TOKEN
 from nanobot.utils.helpers import ensure_dir, today_date
 
+_DAY_FILE = re.compile(r"^(\d{4}-\d{2})-\d{2}\.md$")
+
+# First lines of a MEMORY.md rendered from the fact store
+_FACTS_HEADER = (
+    "# Long-term Memory\n\n"
+    "<!-- Generated from memory/facts.db. Use the remember/forget tools to change it. -->\n\n"
+)
+
 
 class MemoryStore:
     """
     Memory system for the agent.
     
     Supports daily notes (memory/YYYY-MM-DD.md) and long-term memory (MEMORY.md).
+    
+    While MEMORY.md plus today's notes fit in ``inline_tokens`` they go into
+    the prompt whole. Beyond that, only a pinned core (the top
+    ``pinned_tokens`` of MEMORY.md) is always included, and the ``top_k``
+    chunks of ``memory/*.md`` most relevant to the current message are
+    retrieved from a local full-text index.
+    
+    Daily notes are append-only: ``append_today`` opens the file in append
+    mode under a lock, and fsyncs every ``fsync_every`` appends (or on
+    ``sync()``). When the month changes, day files of months that ended more
+    than ``archive_days`` ago are bundled into ``memory/archive/YYYY-MM.zip`` so the memory
+    directory stays small; the retrieval index still covers the bundles.
+    
+    With ``use_facts``, long-term memory is a ``FactStore`` (``memory/facts.db``)
+    edited through ``remember``/``forget``, and MEMORY.md is re-rendered from
+    it after every change, capped at ``facts_max_tokens``. An existing
+    hand-written MEMORY.md is imported once and kept as MEMORY.md.bak.
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        inline_tokens: int = 2000,
+        pinned_tokens: int = 500,
+        top_k: int = 5,
+        fsync_every: int = 0,
+        archive_days: int = 31,
+        use_facts: bool = False,
+        facts_max_tokens: int = 2000,
+    ):
         self.workspace = workspace
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
+        self.archive_dir = self.memory_dir / "archive"
+        self.inline_tokens = inline_tokens
+        self.pinned_tokens = pinned_tokens
+        self.top_k = top_k
+        self.fsync_every = fsync_every
+        self.archive_days = archive_days
+        self.use_facts = use_facts
+        self.facts_max_tokens = facts_max_tokens
+        self._facts: FactStore | None = None
+        self._index: MemoryIndex | None = None
+        self._index_failed = False
+        self._append_lock = threading.Lock()
+        self._unsynced = 0
+        self._unsynced_file: Path | None = None
+        self._checked_month: str | None = None
+    
+    @property
+    def index(self) -> MemoryIndex | None:
+        """Retrieval index over memory/*.md and the archive (None if SQLite lacks FTS5)."""
+        if self._index is None and not self._index_failed:
+            try:
+                self._index = MemoryIndex(self.memory_dir)
+            except sqlite3.Error as e:
+                logger.warning(f"Memory index unavailable, using whole memory files: {e}")
+                self._index_failed = True
+        return self._index
+    
+    @property
+    def facts(self) -> FactStore:
+        """Structured long-term memory (opened and seeded from MEMORY.md on first use)."""
+        if self._facts is None:
+            self._facts = FactStore(self.memory_dir / "facts.db", max_tokens=self.facts_max_tokens)
+            existing = self.read_long_term()
+            if existing.strip() and not existing.startswith(_FACTS_HEADER) and not len(self._facts):
+                backup = self.memory_file.with_suffix(".md.bak")
+                backup.write_text(existing, encoding="utf-8")
+                count = self._facts.import_markdown(existing)
+                logger.info(f"Imported {count} facts from MEMORY.md (original kept as {backup.name})")
+                self.render_long_term()
+        return self._facts
+    
+    def remember(
+        self, key: str, value: str, session_key: str | None = None, importance: int = 3
+    ) -> tuple[str, list[Fact]]:
+        """Store a fact and re-render MEMORY.md (see ``FactStore.remember``)."""
+        status, pruned = self.facts.remember(key, value, session_key, importance)
+        if status != "unchanged" or pruned:
+            self.render_long_term()
+        return status, pruned
+    
+    def forget(self, key: str) -> bool:
+        """Delete a fact and re-render MEMORY.md."""
+        removed = self.facts.forget(key)
+        if removed:
+            self.render_long_term()
+        return removed
+    
+    def render_long_term(self) -> None:
+        """Rewrite MEMORY.md from the fact store (atomically)."""
+        tmp = self.memory_file.with_suffix(".md.tmp")
+        tmp.write_text(_FACTS_HEADER + self.facts.render() + "\n", encoding="utf-8")
+        os.replace(tmp, self.memory_file)
     
     def get_today_file(self) -> Path:
         """Get path to today's memory file."""
+        self._maybe_roll_over()
         return self.memory_dir / f"{today_date()}.md"
     
     def read_today(self) -> str:
@@ -30,18 +138,99 @@ class MemoryStore:
         return ""
     
     def append_today(self, content: str) -> None:
-        """Append content to today's memory notes."""
-        today_file = self.get_today_file()
+        """
+        Append content to today's memory notes.
         
-        if today_file.exists():
-            existing = today_file.read_text(encoding="utf-8")
-            content = existing + "\n" + content
-        else:
-            # Add header for new day
-            header = f"# {today_date()}\n\n"
-            content = header + content
+        Only the new text is written, so the cost does not grow with the
+        size of the file and a crash cannot truncate earlier notes.
+        """
+        with self._append_lock:
+            today_file = self.get_today_file()
+            with open(today_file, "a", encoding="utf-8") as f:
+                if f.tell() == 0:
+                    # Add header for new day
+                    f.write(f"# {today_date()}\n\n{content}")
+                else:
+                    f.write("\n" + content)
+                self._unsynced += 1
+                self._unsynced_file = today_file
+                if self.fsync_every and self._unsynced >= self.fsync_every:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self._unsynced = 0
+    
+    def sync(self) -> None:
+        """Fsync the notes file with pending appends (see ``fsync_every``); call on shutdown."""
+        with self._append_lock:
+            path = self._unsynced_file
+            if self._unsynced and path is not None and path.exists():
+                with open(path, "rb") as f:
+                    os.fsync(f.fileno())
+            self._unsynced = 0
+    
+    def _maybe_roll_over(self) -> None:
+        """Archive old day files once per month (first use of the month)."""
+        month = today_date()[:7]
+        if month != self._checked_month:
+            self._checked_month = month
+            try:
+                self.archive_old_notes()
+            except OSError as e:
+                logger.warning(f"Failed to archive old memory notes: {e}")
+    
+    def archive_old_notes(self) -> list[Path]:
+        """
+        Bundle day files of finished months into ``archive/YYYY-MM.zip``.
+        
+        A month is archived once its last day is more than ``archive_days``
+        ago. Day files are added to the month's bundle (merging with an
+        existing one), which is written to a temp file and swapped in before
+        the originals are deleted.
         
-        today_file.write_text(content, encoding="utf-8")
+        Returns:
+            Paths of the bundles written.
+        """
+        if self.archive_days <= 0:
+            return []
+        cutoff = (datetime.now().date() - timedelta(days=self.archive_days)).strftime("%Y-%m")
+        months: dict[str, list[Path]] = {}
+        for path in self.memory_dir.glob("????-??-??.md"):
+            match = _DAY_FILE.match(path.name)
+            # Months up to the cutoff month may still hold recent days
+            if match and match.group(1) < cutoff:
+                months.setdefault(match.group(1), []).append(path)
+        
+        written = []
+        for month, paths in sorted(months.items()):
+            bundle = ensure_dir(self.archive_dir) / f"{month}.zip"
+            tmp = bundle.with_suffix(".zip.tmp")
+            names = {p.name for p in paths}
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as out:
+                if bundle.exists():
+                    with zipfile.ZipFile(bundle) as old:
+                        for name in old.namelist():
+                            if name not in names:
+                                out.writestr(name, old.read(name))
+                for path in sorted(paths):
+                    out.write(path, arcname=path.name)
+            os.replace(tmp, bundle)
+            for path in paths:
+                path.unlink()
+            written.append(bundle)
+            logger.info(f"Archived {len(paths)} memory notes into {bundle.name}")
+        return written
+    
+    def read_day(self, date_str: str) -> str:
+        """Read one day's notes (YYYY-MM-DD), from its file or the month's archive."""
+        file_path = self.memory_dir / f"{date_str}.md"
+        if file_path.exists():
+            return file_path.read_text(encoding="utf-8")
+        bundle = self.archive_dir / f"{date_str[:7]}.zip"
+        if bundle.exists():
+            with zipfile.ZipFile(bundle) as zf:
+                if f"{date_str}.md" in zf.namelist():
+                    return zf.read(f"{date_str}.md").decode("utf-8")
+        return ""
     
     def read_long_term(self) -> str:
         """Read long-term memory (MEMORY.md)."""
@@ -63,24 +252,19 @@ class MemoryStore:
         Returns:
             Combined memory content.
         """
-        from datetime import timedelta
-        
         memories = []
         today = datetime.now().date()
         
         for i in range(days):
             date = today - timedelta(days=i)
-            date_str = date.strftime("%Y-%m-%d")
-            file_path = self.memory_dir / f"{date_str}.md"
-            
-            if file_path.exists():
-                content = file_path.read_text(encoding="utf-8")
+            content = self.read_day(date.strftime("%Y-%m-%d"))
+            if content:
                 memories.append(content)
         
         return "\n\n---\n\n".join(memories)
     
     def list_memory_files(self) -> list[Path]:
-        """List all memory files sorted by date (newest first)."""
+        """List unarchived day files sorted by date (newest first)."""
         if not self.memory_dir.exists():
             return []
         
@@ -107,3 +291,54 @@ class MemoryStore:
             parts.append("## Today's Notes\n" + today)
         
         return "\n\n".join(parts) if parts else ""
+    
+    def uses_retrieval(self) -> bool:
+        """Whether memory is too large to include whole (see ``inline_tokens``)."""
+        size = sum(p.stat().st_size for p in (self.memory_file, self.get_today_file()) if p.exists())
+        return size > self.inline_tokens * CHARS_PER_TOKEN and self.index is not None
+    
+    def get_pinned_context(self) -> str:
+        """Get the always-included core of long-term memory (top of MEMORY.md)."""
+        long_term = self.read_long_term()
+        max_chars = self.pinned_tokens * CHARS_PER_TOKEN
+        if len(long_term) > max_chars:
+            cut = long_term.rfind("\n", 0, max_chars)
+            long_term = long_term[:cut if cut > 0 else max_chars].rstrip()
+        parts = []
+        if long_term:
+            parts.append("## Long-term Memory (top)\n" + long_term)
+        parts.append(
+            "Only the top of long-term memory is shown here. Memories relevant to the "
+            "current message are listed under Relevant Memory; use the memory_search "
+            "tool to look up anything else."
+        )
+        return "\n\n".join(parts)
+    
+    def search(self, query: str, k: int | None = None) -> list[MemoryHit]:
+        """
+        Search memory files for chunks relevant to a query.
+        
+        Args:
+            query: Free-text query.
+            k: Maximum number of results (defaults to ``top_k``).
+        
+        Returns:
+            Matching chunks, best first (empty if the index is unavailable).
+        """
+        index = self.index
+        if index is None:
+            return []
+        index.refresh()
+        return index.search(query, k or self.top_k)
+    
+    def get_relevant_context(self, query: str) -> str:
+        """Get memory chunks relevant to the current message, excluding the pinned core."""
+        pinned = self.get_pinned_context()
+        hits = [hit for hit in self.search(query) if hit.text not in pinned]
+        return "\n\n".join(format_hit(hit) for hit in hits)
+
+
+def format_hit(hit: MemoryHit) -> str:
+    """Render a retrieved chunk with its source."""
+    title = f"{hit.path} — {hit.heading}" if hit.heading else hit.path
+    return f"### {title}\n{hit.text}"
@@ -0,0 +1,182 @@
+"""Full-text retrieval index over the workspace memory files."""
+
+import re
+import sqlite3
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+# Latin words/numbers, or runs of CJK characters (indexed as overlapping bigrams)
+_TERM = re.compile(r"[a-z0-9_]+|[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff]+")
+
+# Max characters per indexed chunk (paragraphs are merged up to this size)
+CHUNK_CHARS = 1200
+
+
+@dataclass
+class MemoryHit:
+    """One retrieved memory chunk."""
+    path: str  # relative to the workspace, e.g. "memory/MEMORY.md"
+    heading: str
+    text: str
+    score: float  # bm25, lower is better
+
+
+def index_terms(text: str) -> list[str]:
+    """Split text into search terms: lowercase words plus CJK bigrams."""
+    terms = []
+    for token in _TERM.findall(text.lower()):
+        if token[0].isascii() or len(token) == 1:
+            terms.append(token)
+        else:
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return terms
+
+
+def chunk_markdown(text: str, max_chars: int = CHUNK_CHARS) -> list[tuple[str, str]]:
+    """
+    Split markdown into (heading, body) chunks.
+
+    A chunk never spans two headings; long sections are split at line
+    boundaries once they exceed ``max_chars``.
+    """
+    chunks: list[tuple[str, str]] = []
+    heading = ""
+    lines: list[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal lines, size
+        body = "\n".join(lines).strip()
+        if body:
+            chunks.append((heading, body))
+        lines, size = [], 0
+
+    for line in text.splitlines():
+        if line.startswith("#"):
+            flush()
+            heading = line.lstrip("#").strip()
+            continue
+        if size + len(line) > max_chars:
+            flush()
+        lines.append(line)
+        size += len(line) + 1
+    flush()
+    return chunks
+
+
+class MemoryIndex:
+    """
+    SQLite FTS5 index over ``memory/*.md``, ranked with bm25.
+
+    The index lives next to the memory files (``memory/.index.db``) and is
+    refreshed incrementally: ``refresh()`` stats the files and re-indexes
+    only those whose mtime or size changed. Month bundles in
+    ``memory/archive/*.zip`` are indexed too, one chunk path per day file
+    (``memory/archive/YYYY-MM.zip/YYYY-MM-DD.md``), so archived notes stay
+    searchable. Text is pre-split by ``index_terms`` so CJK notes are
+    searchable too.
+
+    Raises:
+        sqlite3.OperationalError: If SQLite was built without FTS5.
+    """
+
+    def __init__(self, memory_dir: Path, db_path: Path | None = None):
+        self.memory_dir = memory_dir
+        self.db_path = db_path or memory_dir / ".index.db"
+        self._db = sqlite3.connect(self.db_path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                terms, path UNINDEXED, heading UNINDEXED, body UNINDEXED
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the memory files.
+
+        Returns:
+            Number of files (re)indexed or removed.
+        """
+        current = {}
+        for path in self.memory_dir.glob("*.md"):
+            st = path.stat()
+            current[f"{self.memory_dir.name}/{path.name}"] = (path, st.st_mtime_ns, st.st_size)
+        for path in (self.memory_dir / "archive").glob("*.zip"):
+            st = path.stat()
+            current[f"{self.memory_dir.name}/archive/{path.name}"] = (path, st.st_mtime_ns, st.st_size)
+        indexed = {
+            row[0]: (row[1], row[2])
+            for row in self._db.execute("SELECT path, mtime_ns, size FROM files")
+        }
+
+        changed = 0
+        with self._db:
+            for rel in indexed.keys() - current.keys():
+                self._drop(rel)
+                self._db.execute("DELETE FROM files WHERE path = ?", (rel,))
+                changed += 1
+            for rel, (path, mtime_ns, size) in current.items():
+                if indexed.get(rel) == (mtime_ns, size):
+                    continue
+                self._drop(rel)
+                self._db.executemany(
+                    "INSERT INTO chunks (terms, path, heading, body) VALUES (?, ?, ?, ?)",
+                    [
+                        (" ".join(index_terms(f"{heading}\n{body}")), chunk_path, heading, body)
+                        for chunk_path, text in self._read(rel, path)
+                        for heading, body in chunk_markdown(text)
+                    ],
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                    (rel, mtime_ns, size),
+                )
+                changed += 1
+        return changed
+
+    def _drop(self, rel: str) -> None:
+        """Delete the chunks of one file (or of every day in an archive bundle)."""
+        if rel.endswith(".zip"):
+            self._db.execute("DELETE FROM chunks WHERE path LIKE ?", (f"{rel}/%",))
+        else:
+            self._db.execute("DELETE FROM chunks WHERE path = ?", (rel,))
+
+    @staticmethod
+    def _read(rel: str, path: Path) -> list[tuple[str, str]]:
+        """Return (chunk path, text) pairs for a memory file or archive bundle."""
+        if not rel.endswith(".zip"):
+            return [(rel, path.read_text(encoding="utf-8"))]
+        with zipfile.ZipFile(path) as zf:
+            return [
+                (f"{rel}/{name}", zf.read(name).decode("utf-8"))
+                for name in zf.namelist()
+                if name.endswith(".md")
+            ]
+
+    def search(self, query: str, k: int = 5) -> list[MemoryHit]:
+        """
+        Return the ``k`` chunks most relevant to ``query``.
+
+        Args:
+            query: Free text; any shared term is a match, ranked by bm25.
+            k: Maximum number of hits.
+        """
+        terms = list(dict.fromkeys(index_terms(query)))[:32]
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        rows = self._db.execute(
+            "SELECT path, heading, body, bm25(chunks) FROM chunks WHERE chunks MATCH ? "
+            "ORDER BY bm25(chunks) LIMIT ?",
+            (match, k),
+        ).fetchall()
+        return [MemoryHit(*row) for row in rows]
@@ -0,0 +1,177 @@
+"""Session-affine turn scheduler for the agent loop."""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage
+
+
+class TurnScheduler:
+    """
+    Schedules agent turns with per-session ordering and a global cap.
+
+    Turns that share a session key run strictly one after another, in the
+    order they were submitted. Turns for different sessions run concurrently,
+    but never more than ``max_concurrent`` at a time.
+
+    Each session with pending work gets a short-lived worker task that drains
+    its queue and exits once the queue is empty.
+    
+    Each turn runs in its own task so that ``cancel`` can stop one session's
+    in-flight turn without disturbing its worker or other sessions.
+    
+    Each session's backlog is bounded by ``max_pending_per_session`` (0 means
+    unbounded). Once a session has that many turns queued, a new message from
+    it is merged into its last queued turn instead (content joined by
+    newlines, media concatenated), so one busy chat cannot grow an unbounded
+    backlog while ``submit`` never blocks and other sessions keep flowing.
+    
+    The total backlog is bounded by ``max_pending``: ``wait_for_capacity``
+    blocks the producer while that many turns are queued, so a flood across
+    many sessions stays on the message bus where admission control applies.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[InboundMessage], Awaitable[None]],
+        max_concurrent: int = 4,
+        max_pending_per_session: int = 4,
+        max_pending: int = 64,
+    ):
+        self._handler = handler
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_pending_per_session = max_pending_per_session
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._queues: dict[str, deque[InboundMessage]] = {}
+        self._workers: dict[str, asyncio.Task[None]] = {}
+        self._turns: dict[str, asyncio.Task[None]] = {}  # key -> running turn
+        self._cancelled: set[asyncio.Task[None]] = set()
+        self._active = 0
+        self._pending = 0
+        self._has_capacity = asyncio.Event()
+        self._has_capacity.set()
+        self.coalesced_count = 0
+
+    def submit(self, key: str, msg: InboundMessage) -> None:
+        """Queue a message for the given session key."""
+        queue = self._queues.setdefault(key, deque())
+        if not self._coalesce(queue, msg):
+            queue.append(msg)
+            self._count_pending(1)
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key))
+    
+    async def wait_for_capacity(self) -> None:
+        """Wait until fewer than ``max_pending`` turns are queued (0 = never wait)."""
+        await self._has_capacity.wait()
+    
+    def _count_pending(self, delta: int) -> None:
+        self._pending += delta
+        if 0 < self.max_pending <= self._pending:
+            self._has_capacity.clear()
+        else:
+            self._has_capacity.set()
+    
+    def _coalesce(self, queue: deque[InboundMessage], msg: InboundMessage) -> bool:
+        """Merge ``msg`` into the last queued turn if the session's backlog is full."""
+        if not 0 < self.max_pending_per_session <= len(queue):
+            return False
+        target = queue[-1]
+        # System messages (subagent announces) are never merged with chat messages
+        if msg.channel == "system" or target.channel == "system":
+            return False
+        if msg.content:
+            target.content = f"{target.content}\n{msg.content}" if target.content else msg.content
+        target.media.extend(msg.media)
+        target.metadata.update(msg.metadata)
+        self.coalesced_count += 1
+        logger.info(f"Backlog full for {msg.session_key}: merged message into its last queued turn")
+        return True
+
+    async def _drain(self, key: str) -> None:
+        """Process queued turns for one session until its queue is empty."""
+        queue = self._queues[key]
+        try:
+            while queue:
+                async with self._slots:
+                    # Still pending while waiting for a slot; /stop may have emptied the queue
+                    if not queue:
+                        break
+                    msg = queue.popleft()
+                    self._count_pending(-1)
+                    self._active += 1
+                    turn = asyncio.create_task(self._handler(msg))
+                    self._turns[key] = turn
+                    try:
+                        await turn
+                    except asyncio.CancelledError:
+                        if turn not in self._cancelled:
+                            raise
+                        logger.info(f"Turn for {key} cancelled")
+                    except Exception as e:
+                        logger.error(f"Unhandled error in turn for {key}: {e}")
+                    finally:
+                        self._active -= 1
+                        self._turns.pop(key, None)
+                        self._cancelled.discard(turn)
+        finally:
+            # No await between the empty check and removal, so a concurrent
+            # submit() either lands in this queue before exit or starts a new worker.
+            # A cancelled worker leaves its remaining turns behind.
+            self._count_pending(-len(queue))
+            self._queues.pop(key, None)
+            self._workers.pop(key, None)
+
+    async def join(self) -> None:
+        """Wait until every queued and running turn has finished."""
+        while self._workers:
+            await asyncio.gather(*list(self._workers.values()), return_exceptions=True)
+
+    def is_running(self, key: str) -> bool:
+        """Whether a turn for the session key is currently executing."""
+        return key in self._turns
+    
+    def cancel(self, key: str, drop_pending: bool = False) -> bool:
+        """
+        Cancel the running turn of a session.
+        
+        Args:
+            key: Session key.
+            drop_pending: Also discard turns queued behind it.
+        
+        Returns:
+            True if a running turn was cancelled.
+        """
+        if drop_pending and key in self._queues:
+            self._count_pending(-len(self._queues[key]))
+            self._queues[key].clear()
+        turn = self._turns.get(key)
+        if turn is None or turn.done():
+            return False
+        self._cancelled.add(turn)
+        turn.cancel()
+        return True
+    
+    def cancel_all(self) -> None:
+        """Cancel all session workers, dropping any queued turns."""
+        for task in self._workers.values():
+            task.cancel()
+
+    @property
+    def active_turns(self) -> int:
+        """Number of turns currently executing."""
+        return self._active
+
+    @property
+    def pending_turns(self) -> int:
+        """Number of turns queued but not yet started."""
+        return self._pending
+
+    @property
+    def active_sessions(self) -> int:
+        """Number of sessions with queued or running turns."""
+        return len(self._workers)
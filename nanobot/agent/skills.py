@@ -6,6 +6,8 @@ import re
 import shutil
 from pathlib import Path
 
+from nanobot.utils.helpers import stat_signature
+
 # Default builtin skills directory (relative to this file)
 BUILTIN_SKILLS_DIR = Path(__file__).parent.parent / "skills"
 
@@ -16,12 +18,86 @@ class SkillsLoader:
     
     Skills are markdown files (SKILL.md) that teach the agent how to use
     specific tools or perform certain tasks.
+    
+    Directory listings, SKILL.md contents and ``shutil.which`` lookups are
+    cached and revalidated with ``stat`` (see ``signature``), so unchanged
+    skills are never re-read.
     """
     
     def __init__(self, workspace: Path, builtin_skills_dir: Path | None = None):
         self.workspace = workspace
         self.workspace_skills = workspace / "skills"
         self.builtin_skills = builtin_skills_dir or BUILTIN_SKILLS_DIR
+        self._candidates: tuple[tuple, list[tuple[str, Path, str]]] | None = None
+        self._files: dict[str, tuple[tuple, str]] = {}  # path -> (stat key, content)
+        self._bins: dict[str, bool] = {}
+        self._bins_key: tuple | None = None
+    
+    def signature(self) -> tuple:
+        """
+        Change-detection key for everything the skills prompt sections use.
+        
+        Stats every SKILL.md and the PATH directories (installing a binary
+        changes its directory's mtime), and includes each skill's missing
+        requirements so env var changes are noticed too.
+        """
+        self._refresh_bins()
+        files = stat_signature(path for _, path, _ in self._skill_candidates())
+        missing = tuple(
+            self._get_missing_requirements(self._get_skill_meta(s["name"]))
+            for s in self.list_skills(filter_unavailable=False)
+        )
+        return files, self._bins_key, missing
+    
+    def invalidate(self) -> None:
+        """Drop all cached listings, file contents and binary lookups."""
+        self._candidates = None
+        self._files.clear()
+        self._bins.clear()
+        self._bins_key = None
+    
+    def _skill_candidates(self) -> list[tuple[str, Path, str]]:
+        """(name, SKILL.md path, source) per skill directory, workspace first; cached on dir mtimes."""
+        roots = [(self.workspace_skills, "workspace")]
+        if self.builtin_skills:
+            roots.append((self.builtin_skills, "builtin"))
+        key = stat_signature(root for root, _ in roots)
+        if self._candidates is None or self._candidates[0] != key:
+            found = []
+            for root, source in roots:
+                if root.exists():
+                    for skill_dir in root.iterdir():
+                        if skill_dir.is_dir():
+                            found.append((skill_dir.name, skill_dir / "SKILL.md", source))
+            self._candidates = (key, found)
+        return self._candidates[1]
+    
+    def _read(self, path: Path) -> str | None:
+        """Read a file, reusing the cached content while its mtime and size are unchanged."""
+        key = stat_signature([path])[0]
+        if key[1] is None:
+            return None
+        cached = self._files.get(key[0])
+        if cached and cached[0] == key:
+            return cached[1]
+        content = path.read_text(encoding="utf-8")
+        self._files[key[0]] = (key, content)
+        return content
+    
+    def _refresh_bins(self) -> None:
+        """Forget binary lookups if PATH or any directory on it changed."""
+        path_env = os.environ.get("PATH", "")
+        key = (path_env, stat_signature(Path(p) for p in path_env.split(os.pathsep) if p))
+        if key != self._bins_key:
+            self._bins.clear()
+            self._bins_key = key
+    
+    def _has_bin(self, name: str) -> bool:
+        if self._bins_key is None:
+            self._refresh_bins()
+        if name not in self._bins:
+            self._bins[name] = shutil.which(name) is not None
+        return self._bins[name]
     
     def list_skills(self, filter_unavailable: bool = True) -> list[dict[str, str]]:
         """
@@ -34,22 +110,14 @@ class SkillsLoader:
             List of skill info dicts with 'name', 'path', 'source'.
         """
         skills = []
+        seen: set[str] = set()
         
-        # Workspace skills (highest priority)
-        if self.workspace_skills.exists():
-            for skill_dir in self.workspace_skills.iterdir():
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists():
-                        skills.append({"name": skill_dir.name, "path": str(skill_file), "source": "workspace"})
-        
-        # Built-in skills
-        if self.builtin_skills and self.builtin_skills.exists():
-            for skill_dir in self.builtin_skills.iterdir():
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists() and not any(s["name"] == skill_dir.name for s in skills):
-                        skills.append({"name": skill_dir.name, "path": str(skill_file), "source": "builtin"})
+        # Workspace skills come first and shadow built-in skills of the same name
+        for name, skill_file, source in self._skill_candidates():
+            if name in seen or not skill_file.exists():
+                continue
+            seen.add(name)
+            skills.append({"name": name, "path": str(skill_file), "source": source})
         
         # Filter by requirements
         if filter_unavailable:
@@ -67,15 +135,13 @@ class SkillsLoader:
             Skill content or None if not found.
         """
         # Check workspace first
-        workspace_skill = self.workspace_skills / name / "SKILL.md"
-        if workspace_skill.exists():
-            return workspace_skill.read_text(encoding="utf-8")
+        content = self._read(self.workspace_skills / name / "SKILL.md")
+        if content is not None:
+            return content
         
         # Check built-in
         if self.builtin_skills:
-            builtin_skill = self.builtin_skills / name / "SKILL.md"
-            if builtin_skill.exists():
-                return builtin_skill.read_text(encoding="utf-8")
+            return self._read(self.builtin_skills / name / "SKILL.md")
         
         return None
     
@@ -144,7 +210,7 @@ class SkillsLoader:
         missing = []
         requires = skill_meta.get("requires", {})
         for b in requires.get("bins", []):
-            if not shutil.which(b):
+            if not self._has_bin(b):
                 missing.append(f"CLI: {b}")
         for env in requires.get("env", []):
             if not os.environ.get(env):
@@ -178,7 +244,7 @@ class SkillsLoader:
         """Check if skill requirements are met (bins, env vars)."""
         requires = skill_meta.get("requires", {})
         for b in requires.get("bins", []):
-            if not shutil.which(b):
+            if not self._has_bin(b):
                 return False
         for env in requires.get("env", []):
             if not os.environ.get(env):
@@ -0,0 +1,68 @@
+"""Progressive reply streaming from the agent loop to channels."""
+
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from nanobot.bus.events import OutboundMessage
+
+
+class ReplyStreamer:
+    """
+    Publishes a reply to the bus while the LLM is still generating it.
+    
+    Every update carries the full text so far (not a delta) under a shared
+    ``stream_id``, so channels can edit a single message in place and may
+    safely skip intermediate updates. The first update goes out immediately
+    (time-to-first-token); later ones at most every ``interval_s`` seconds.
+    """
+    
+    def __init__(
+        self,
+        publish: Callable[[OutboundMessage], Awaitable[None]],
+        channel: str,
+        chat_id: str,
+        metadata: dict[str, Any] | None = None,
+        interval_s: float = 1.0,
+    ):
+        self._publish = publish
+        self.channel = channel
+        self.chat_id = chat_id
+        self.metadata = metadata or {}
+        self.interval_s = interval_s
+        self.stream_id = uuid.uuid4().hex[:12]
+        self._text = ""
+        self._last_publish = 0.0
+        self.started = False
+    
+    @property
+    def text(self) -> str:
+        """Text accumulated in the current LLM call."""
+        return self._text
+    
+    def begin_iteration(self) -> None:
+        """Start a new LLM call; its text replaces whatever was streamed before."""
+        self._text = ""
+    
+    async def feed(self, delta: str) -> None:
+        """Append a content delta and publish if the throttle allows."""
+        self._text += delta
+        now = time.monotonic()
+        if self.started and now - self._last_publish < self.interval_s:
+            return
+        self._last_publish = now
+        self.started = True
+        await self._publish(OutboundMessage(
+            channel=self.channel,
+            chat_id=self.chat_id,
+            content=self._text,
+            metadata=self.metadata,
+            stream_id=self.stream_id,
+        ))
+    
+    def finish(self, msg: OutboundMessage) -> OutboundMessage:
+        """Mark the final reply as the closing update of this stream (if any was sent)."""
+        if self.started:
+            msg.stream_id = self.stream_id
+            msg.stream_done = True
+        return msg
@@ -11,6 +11,7 @@ from loguru import logger
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
+from nanobot.agent.budget import ToolResultBudget
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
@@ -37,6 +38,7 @@ class SubagentManager:
         restrict_to_workspace: bool = False,
         allowed_paths: list[Path] | None = None,
         protected_paths: list[Path] | None = None,
+        tool_budget: ToolResultBudget | None = None,
     ):
         from nanobot.config.schema import ExecToolConfig
         self.provider = provider
@@ -48,7 +50,9 @@ class SubagentManager:
         self.restrict_to_workspace = restrict_to_workspace
         self.allowed_paths = allowed_paths or []
         self.protected_paths = protected_paths or []
+        self.tool_budget = tool_budget or ToolResultBudget()
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        self._task_origins: dict[str, str] = {}  # task_id -> "channel:chat_id"
     
     async def spawn(
         self,
@@ -82,9 +86,13 @@ class SubagentManager:
             self._run_subagent(task_id, task, display_label, origin)
         )
         self._running_tasks[task_id] = bg_task
+        self._task_origins[task_id] = f"{origin_channel}:{origin_chat_id}"
         
         # Cleanup when done
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
+        def _cleanup(_: asyncio.Task[None]) -> None:
+            self._running_tasks.pop(task_id, None)
+            self._task_origins.pop(task_id, None)
+        bg_task.add_done_callback(_cleanup)
         
         logger.info(f"Spawned subagent [{task_id}]: {display_label}")
         return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
@@ -131,6 +139,7 @@ class SubagentManager:
             max_iterations = 15
             iteration = 0
             final_result: str | None = None
+            budget = self.tool_budget.fork()
             
             while iteration < max_iterations:
                 iteration += 1
@@ -160,16 +169,19 @@ class SubagentManager:
                         "tool_calls": tool_call_dicts,
                     })
                     
-                    # Execute tools
+                    # Execute tools (read-only calls in parallel, results kept in call order)
                     for tool_call in response.tool_calls:
                         args_str = json.dumps(tool_call.arguments)
                         logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
+                    results = await tools.execute_batch(
+                        [(tc.name, tc.arguments) for tc in response.tool_calls]
+                    )
+                    for tool_call, result in zip(response.tool_calls, results):
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
                             "name": tool_call.name,
-                            "content": result,
+                            "content": budget.fit(tool_call.name, result),
                         })
                 else:
                     final_result = response.content
@@ -249,6 +261,24 @@ Your workspace is at: {self.workspace}
 
 When you have completed the task, provide a clear summary of your findings or actions."""
     
+    def cancel_for_session(self, session_key: str) -> int:
+        """
+        Cancel running subagents that report back to a session.
+        
+        Args:
+            session_key: Origin "channel:chat_id" of the subagents.
+        
+        Returns:
+            Number of subagents cancelled.
+        """
+        cancelled = 0
+        for task_id, origin in list(self._task_origins.items()):
+            task = self._running_tasks.get(task_id)
+            if origin == session_key and task and not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+    
     def get_running_count(self) -> int:
         """Return the number of currently running subagents."""
         return len(self._running_tasks)
@@ -1,11 +1,14 @@
 """Background conversation summarizer for context window management."""
 
 import asyncio
+import hashlib
 from typing import Any
 
 from loguru import logger
 
-from nanobot.providers.base import LLMProvider
+from nanobot.agent.tokens import CHARS_PER_TOKEN, TokenEstimator
+from nanobot.providers.base import ERROR_FINISH_REASONS, LLMProvider
+from nanobot.tracing import get_tracer
 
 SUMMARY_SYSTEM_PROMPT = """The following messages are being evicted from the conversation window.
 Write a concise summary that captures what happened in these messages.
@@ -21,6 +24,26 @@ and avoid losing track of long-term context.
 
 Keep your summary under 200 words. Only output the summary."""
 
+CHUNK_SYSTEM_PROMPT = """The following is one part of a longer conversation that is being evicted from the conversation window.
+Summarize this part: what happened, specific names, data or facts that were discussed, and anything
+left unfinished. Other parts are summarized separately and merged afterwards.
+
+Keep your summary under 150 words. Only output the summary."""
+
+MERGE_SYSTEM_PROMPT = """The following are summaries of consecutive parts of a conversation that is being evicted
+from the conversation window, in order. Merge them into one concise summary.
+
+This summary will be provided as background context for future conversations. Include:
+
+1. **What happened**: The conversations, tasks, and exchanges that took place.
+2. **Important details**: Specific names, data, or facts that were discussed.
+3. **Ongoing context**: Any unfinished tasks, pending questions, or commitments made.
+
+If there is a previous summary provided, incorporate it to maintain continuity
+and avoid losing track of long-term context.
+
+Keep your summary under 200 words. Only output the summary."""
+
 
 class Summarizer:
     """
@@ -29,27 +52,55 @@ class Summarizer:
     When the conversation context approaches the token limit, this service
     generates a summary of older messages asynchronously (fire-and-forget)
     so the main agent loop is never blocked.
+
+    Evicted messages that fit in ``chunk_tokens`` (with the previous
+    summary) are summarized in one request. Longer ones are split into
+    chunks of at most ``chunk_tokens``, which are summarized in parallel
+    (at most ``max_concurrency`` requests at a time) and then merged with
+    the previous summary, in several rounds if the chunk summaries are too
+    long to merge at once. In ``incremental`` mode chunk summaries are kept
+    until the summary that uses them is committed, so a retry after a
+    failed request only summarizes chunks it has not seen.
     """
 
-    def __init__(self, provider: LLMProvider, model: str):
+    def __init__(
+        self,
+        provider: LLMProvider,
+        model: str,
+        tokens: TokenEstimator | None = None,
+        chunk_tokens: int = 8000,
+        max_concurrency: int = 4,
+        incremental: bool = True,
+    ):
         self.provider = provider
         self.model = model
+        self.tokens = tokens or TokenEstimator(model)
+        self.chunk_tokens = chunk_tokens
+        self.max_concurrency = max_concurrency
+        self.incremental = incremental
+        # session key -> chunk text digest -> chunk summary
+        self._chunk_summaries: dict[str, dict[str, str]] = {}
 
     def fire_and_forget(
         self,
         session: "Session",
         session_manager: "SessionManager",
-        messages_snapshot: list[dict[str, Any]],
-        previous_summary: str,
+        messages_snapshot: list[dict[str, Any]] | None,
+        previous_summary: str | None,
         min_keep: int,
     ) -> None:
         """Launch a background task to summarize evicted messages.
 
+        The caller sets ``session.summary_in_progress``; the task always
+        clears it, whether it commits, fails or is cancelled.
+
         Args:
             session: The live Session object (will be mutated on completion).
             session_manager: Used to persist the session after summarization.
-            messages_snapshot: A *copy* of session.messages at trigger time.
-            previous_summary: The existing summary to incorporate.
+            messages_snapshot: A *copy* of session.messages at trigger time, or
+                None to load the full history in the task and snapshot it there.
+            previous_summary: The existing summary to incorporate (None: the
+                session's summary when the snapshot is taken).
             min_keep: Number of recent messages to retain after summarization.
         """
         task = asyncio.create_task(
@@ -71,45 +122,51 @@ class Summarizer:
         self,
         session: "Session",
         session_manager: "SessionManager",
-        messages_snapshot: list[dict[str, Any]],
-        previous_summary: str,
+        messages_snapshot: list[dict[str, Any]] | None,
+        previous_summary: str | None,
         min_keep: int,
     ) -> None:
-        """Generate a summary and update the session."""
+        """Generate a summary and update the session.
+
+        Only the snapshot's messages older than its ``min_keep`` newest are
+        summarized, and the commit drops exactly those (by seq), so turns
+        may keep adding messages while the LLM call is in flight.
+        """
         try:
+            if messages_snapshot is None:
+                # The summary must cover the whole history, not just the loaded tail
+                await session_manager.load_full(session)
+                messages_snapshot = list(session.messages)
+            if previous_summary is None:
+                previous_summary = session.summary
+            evicted = messages_snapshot[:-min_keep] if min_keep else messages_snapshot
+            if not evicted:
+                logger.debug(f"[Summarizer] Nothing to evict for {session.key}")
+                return
+            upto = evicted[-1]["seq"]
             logger.info(
                 f"[Summarizer] Starting summarization for {session.key}: "
-                f"{len(messages_snapshot)} messages → keeping {min_keep} recent"
+                f"{len(evicted)} messages up to seq {upto} → keeping {min_keep} recent"
             )
             
-            transcript = self._format_transcript(messages_snapshot, previous_summary)
-
-            llm_messages: list[dict[str, Any]] = [
-                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
-                {"role": "user", "content": transcript},
-            ]
-
             logger.info(f"[Summarizer] Calling LLM for summary (model: {self.model})...")
-            response = await self.provider.chat(
-                messages=llm_messages,
-                tools=None,
-                model=self.model,
-                max_tokens=1024,
-                temperature=0.3,
-            )
+            with get_tracer().span(
+                "summarize", session=session.key, messages=len(evicted), model=self.model
+            ) as span:
+                summary_text = await self.summarize(session.key, evicted, previous_summary)
+                span.set_attribute("summary_chars", len(summary_text))
 
-            summary_text = (response.content or "").strip()
-            if not summary_text or response.finish_reason == "error":
+            if not summary_text:
                 logger.warning("Summarizer returned empty or error response, skipping update")
                 return
 
-            # Update session atomically (single-threaded asyncio, safe at await boundaries)
+            # Commit atomically (no await in between): messages added since the snapshot stay
             messages_before = len(session.messages)
-            session.summary = summary_text
-            session.messages = session.messages[-min_keep:]
+            session.commit_summary(summary_text, upto)
             messages_after = len(session.messages)
             session.summary_in_progress = False
             session_manager.save(session)
+            self._chunk_summaries.pop(session.key, None)
 
             preview = summary_text[:120] + "..." if len(summary_text) > 120 else summary_text
             logger.info(
@@ -123,6 +180,140 @@ class Summarizer:
         finally:
             session.summary_in_progress = False
 
+    async def summarize(
+        self, key: str, messages: list[dict[str, Any]], previous_summary: str
+    ) -> str:
+        """
+        Summarize messages on top of a previous summary.
+
+        Args:
+            key: Session key (scopes cached chunk summaries).
+            messages: The messages to summarize, oldest first.
+            previous_summary: The summary they continue.
+
+        Returns:
+            The new summary, or "" if a request failed.
+        """
+        chunks = self._chunk([self._format_message(msg) for msg in messages])
+        if len(chunks) <= 1:
+            transcript = self._format_transcript(messages, previous_summary)
+            if self.tokens.count(transcript) <= self.chunk_tokens:
+                return await self._call(SUMMARY_SYSTEM_PROMPT, transcript, stage="single")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        cache = self._chunk_summaries.setdefault(key, {}) if self.incremental else {}
+
+        async def summarize_chunk(chunk: str) -> str:
+            digest = hashlib.sha1(chunk.encode()).hexdigest()
+            if digest in cache:
+                return cache[digest]
+            async with semaphore:
+                text = await self._call(CHUNK_SYSTEM_PROMPT, chunk, stage="chunk")
+            if text:
+                cache[digest] = text
+            return text
+
+        logger.info(f"[Summarizer] Summarizing {len(chunks)} chunks for {key}")
+        parts = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+        if not all(parts):
+            return ""
+        return await self._merge(list(parts), previous_summary, semaphore)
+
+    async def _merge(self, parts: list[str], previous_summary: str, semaphore: asyncio.Semaphore) -> str:
+        """Merge chunk summaries (and the previous summary), in rounds while too long for one request."""
+        while True:
+            if len(parts) == 1 and not previous_summary:
+                return parts[0]
+            text = self._format_parts(parts, previous_summary)
+            if len(parts) <= 2 or self.tokens.count(text) <= self.chunk_tokens:
+                return await self._call(MERGE_SYSTEM_PROMPT, text, stage="merge")
+            # Merge groups of consecutive summaries first; each group takes at least two
+            groups: list[list[str]] = [[]]
+            size = 0
+            for part in parts:
+                tokens = self.tokens.count(self._format_parts([part], ""))
+                if len(groups[-1]) >= 2 and size + tokens > self.chunk_tokens:
+                    groups.append([])
+                    size = 0
+                groups[-1].append(part)
+                size += tokens
+
+            async def merge_group(group: list[str]) -> str:
+                if len(group) == 1:
+                    return group[0]
+                async with semaphore:
+                    return await self._call(MERGE_SYSTEM_PROMPT, self._format_parts(group, ""), stage="merge")
+
+            parts = list(await asyncio.gather(*(merge_group(group) for group in groups)))
+            if not all(parts):
+                return ""
+
+    async def _call(self, system_prompt: str, content: str, stage: str) -> str:
+        """One summarization request. Returns "" on an empty or error response."""
+        with get_tracer().span("summarize.call", stage=stage, model=self.model) as span:
+            response = await self.provider.chat(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": content},
+                ],
+                tools=None,
+                model=self.model,
+                max_tokens=1024,
+                temperature=0.3,
+            )
+            for key, value in response.usage.items():
+                span.set_attribute(f"usage.{key}", value)
+        if response.finish_reason in ERROR_FINISH_REASONS:
+            return ""
+        return (response.content or "").strip()
+
+    def _chunk(self, lines: list[str]) -> list[str]:
+        """Pack transcript lines into chunks of at most ``chunk_tokens``, splitting oversized lines."""
+        chunks: list[str] = []
+        current: list[str] = []
+        size = 0
+        for line in lines:
+            tokens = self.tokens.count(line)
+            if tokens > self.chunk_tokens:
+                # A huge message (pasted log, imported history): split it by characters
+                step = max(len(line) * self.chunk_tokens // tokens, CHARS_PER_TOKEN)
+                pieces = [line[i:i + step] for i in range(0, len(line), step)]
+            else:
+                pieces = [line]
+            for piece in pieces:
+                piece_tokens = tokens if len(pieces) == 1 else self.tokens.count(piece)
+                if current and size + piece_tokens > self.chunk_tokens:
+                    chunks.append("\n".join(current))
+                    current, size = [], 0
+                current.append(piece)
+                size += piece_tokens
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
+    @staticmethod
+    def _format_parts(parts: list[str], previous_summary: str) -> str:
+        """Format chunk summaries (and a previous summary) for a merge request."""
+        sections: list[str] = []
+        if previous_summary:
+            sections.append(f"--- Previous Summary ---\n{previous_summary}\n--- End Previous Summary ---\n")
+        for i, part in enumerate(parts, 1):
+            sections.append(f"--- Part {i} ---\n{part}")
+        return "\n".join(sections)
+
+    @staticmethod
+    def _format_message(msg: dict[str, Any]) -> str:
+        """One transcript line: ``role: text`` (text parts only for multi-modal content)."""
+        role = msg.get("role", "unknown")
+        content = msg.get("content", "")
+        if isinstance(content, list):
+            # Multi-modal content: extract text parts only
+            text_parts = [
+                item.get("text", "") for item in content if isinstance(item, dict) and item.get("type") == "text"
+            ]
+            content = " ".join(text_parts)
+        return f"{role}: {content}"
+
     @staticmethod
     def _format_transcript(
         messages: list[dict[str, Any]], previous_summary: str
@@ -136,16 +327,7 @@ class Summarizer:
             parts.append("--- End Previous Summary ---\n")
 
         parts.append("--- Conversation Transcript ---")
-        for msg in messages:
-            role = msg.get("role", "unknown")
-            content = msg.get("content", "")
-            if isinstance(content, list):
-                # Multi-modal content: extract text parts only
-                text_parts = [
-                    item.get("text", "") for item in content if isinstance(item, dict) and item.get("type") == "text"
-                ]
-                content = " ".join(text_parts)
-            parts.append(f"{role}: {content}")
+        parts.extend(Summarizer._format_message(msg) for msg in messages)
         parts.append("--- End Transcript ---")
 
         return "\n".join(parts)
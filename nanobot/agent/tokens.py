@@ -0,0 +1,107 @@
+"""Local token estimation for sizing prompts before they are sent."""
+
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Any, Callable
+
+from loguru import logger
+
+# Rough chars-per-token ratio used wherever text is sized without a tokenizer
+CHARS_PER_TOKEN = 4
+# Fixed cost per image block; a ~1.5k px image is 1-1.6k tokens on Claude / GPT-4o
+IMAGE_TOKENS = 1600
+# Role markers and separators added around each message
+MESSAGE_OVERHEAD = 4
+# CJK and similar scripts encode to about one token per character
+_WIDE_CHARS = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+
+def heuristic_tokens(text: str) -> int:
+    """Tokenizer-free estimate: ~4 chars per token, one token per CJK character."""
+    wide = len(_WIDE_CHARS.findall(text))
+    return math.ceil((len(text) - wide) / CHARS_PER_TOKEN) + wide
+
+
+class TokenEstimator:
+    """
+    Counts prompt tokens locally, before a request is sent.
+
+    Uses litellm's tokenizer for ``model`` when it can be loaded and falls
+    back to ``heuristic_tokens`` otherwise. Neither matches every provider
+    exactly, so ``calibrate()`` feeds back the provider's reported
+    ``prompt_tokens`` and estimates are scaled by the running ratio.
+    """
+
+    def __init__(self, model: str | None = None, use_tokenizer: bool = True):
+        self.model = model
+        self.use_tokenizer = use_tokenizer
+        self.scale = 1.0
+        self._encode: Callable[[str], int] | None = None
+        self._loaded = False
+        self._count_raw = lru_cache(maxsize=4096)(self._count_uncached)
+
+    def _tokenizer(self) -> Callable[[str], int] | None:
+        if not self._loaded:
+            self._loaded = True
+            if self.use_tokenizer:
+                try:
+                    from litellm import encode
+
+                    model = self.model or "gpt-4o"
+                    encode(model=model, text="warm up")
+                    self._encode = lambda text: len(encode(model=model, text=text))
+                except Exception as e:
+                    logger.debug(f"Tokenizer unavailable for {self.model}, using heuristic: {e}")
+        return self._encode
+
+    def _count_uncached(self, text: str) -> int:
+        encode = self._tokenizer()
+        if encode is not None:
+            try:
+                return encode(text)
+            except Exception:
+                pass
+        return heuristic_tokens(text)
+
+    def count(self, text: str) -> int:
+        """Estimated tokens of a piece of text."""
+        if not text:
+            return 0
+        return math.ceil(self._count_raw(text) * self.scale)
+
+    def count_messages(self, messages: list[dict[str, Any]]) -> int:
+        """Estimated prompt tokens of chat messages (content, tool calls, images)."""
+        total = 0
+        for msg in messages:
+            total += MESSAGE_OVERHEAD
+            content = msg.get("content")
+            if isinstance(content, str):
+                total += self.count(content)
+            elif isinstance(content, list):
+                for block in content:
+                    if block.get("type") == "image_url":
+                        total += IMAGE_TOKENS
+                    else:
+                        total += self.count(block.get("text", ""))
+            for tool_call in msg.get("tool_calls") or []:
+                total += self.count(json.dumps(tool_call.get("function", {}), ensure_ascii=False))
+        return total
+
+    def count_tools(self, tools: list[dict[str, Any]] | None) -> int:
+        """Estimated prompt tokens of tool definitions."""
+        return self.count(json.dumps(tools, ensure_ascii=False)) if tools else 0
+
+    def calibrate(self, estimated: int, actual: int) -> None:
+        """
+        Adjust the scale from one request's estimate and reported usage.
+
+        Args:
+            estimated: Scaled estimate made before the request.
+            actual: ``prompt_tokens`` reported by the provider.
+        """
+        if estimated <= 0 or actual <= 0:
+            return
+        ratio = actual / (estimated / self.scale)
+        self.scale = min(max(0.7 * self.scale + 0.3 * ratio, 0.5), 3.0)
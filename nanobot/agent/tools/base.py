@@ -1,9 +1,31 @@
 """Base class for agent tools."""
 
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any
 
 
+@dataclass
+class ToolContext:
+    """
+    Per-turn routing context for tools.
+    
+    Each agent turn carries its own context so that concurrent turns never
+    see each other's channel/chat (e.g. a reply sent by the message tool
+    always goes back to the chat that triggered the turn).
+    """
+    
+    channel: str = ""
+    chat_id: str = ""
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+# Bound by ToolRegistry.execute for the duration of a single tool call.
+# ContextVar values are task-local, so concurrent turns are isolated.
+_current_context: ContextVar[ToolContext | None] = ContextVar("tool_context", default=None)
+
+
 class Tool(ABC):
     """
     Abstract base class for agent tools.
@@ -39,6 +61,21 @@ class Tool(ABC):
         """JSON Schema for tool parameters."""
         pass
     
+    @property
+    def read_only(self) -> bool:
+        """
+        Whether the tool is free of side effects.
+        
+        Read-only tools may run concurrently with other read-only calls from
+        the same LLM response; everything else runs one call at a time.
+        """
+        return False
+    
+    @property
+    def context(self) -> ToolContext | None:
+        """Context of the turn currently executing this tool (None outside a turn)."""
+        return _current_context.get()
+    
     @abstractmethod
     async def execute(self, **kwargs: Any) -> str:
         """
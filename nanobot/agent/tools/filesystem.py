@@ -1,7 +1,7 @@
 """File system tools: read, write, edit."""
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from nanobot.agent.tools.base import Tool
 
@@ -52,6 +52,10 @@ class ReadFileTool(Tool):
     def name(self) -> str:
         return "read_file"
     
+    @property
+    def read_only(self) -> bool:
+        return True
+    
     @property
     def description(self) -> str:
         return "Read the contents of a file at the given path."
@@ -87,9 +91,15 @@ class ReadFileTool(Tool):
 class WriteFileTool(Tool):
     """Tool to write content to a file."""
     
-    def __init__(self, allowed_dirs: list[Path] | None = None, protected_paths: list[Path] | None = None):
+    def __init__(
+        self,
+        allowed_dirs: list[Path] | None = None,
+        protected_paths: list[Path] | None = None,
+        on_write: Callable[[Path], None] | None = None,
+    ):
         self._allowed_dirs = allowed_dirs
         self._protected_paths = protected_paths
+        self._on_write = on_write  # e.g. invalidate cached prompt sections
 
     @property
     def name(self) -> str:
@@ -121,6 +131,8 @@ class WriteFileTool(Tool):
             file_path = _resolve_path(path, self._allowed_dirs, self._protected_paths)
             file_path.parent.mkdir(parents=True, exist_ok=True)
             file_path.write_text(content, encoding="utf-8")
+            if self._on_write:
+                self._on_write(file_path)
             return f"Successfully wrote {len(content)} bytes to {path}"
         except PermissionError as e:
             return f"Error: {e}"
@@ -130,9 +142,15 @@ class WriteFileTool(Tool):
 class EditFileTool(Tool):
     """Tool to edit a file by replacing text."""
     
-    def __init__(self, allowed_dirs: list[Path] | None = None, protected_paths: list[Path] | None = None):
+    def __init__(
+        self,
+        allowed_dirs: list[Path] | None = None,
+        protected_paths: list[Path] | None = None,
+        on_write: Callable[[Path], None] | None = None,
+    ):
         self._allowed_dirs = allowed_dirs
         self._protected_paths = protected_paths
+        self._on_write = on_write  # e.g. invalidate cached prompt sections
 
     @property
     def name(self) -> str:
@@ -181,6 +199,8 @@ class EditFileTool(Tool):
             
             new_content = content.replace(old_text, new_text, 1)
             file_path.write_text(new_content, encoding="utf-8")
+            if self._on_write:
+                self._on_write(file_path)
             
             return f"Successfully edited {path}"
         except PermissionError as e:
@@ -199,6 +219,10 @@ class ListDirTool(Tool):
     def name(self) -> str:
         return "list_dir"
     
+    @property
+    def read_only(self) -> bool:
+        return True
+    
     @property
     def description(self) -> str:
         return "List the contents of a directory."
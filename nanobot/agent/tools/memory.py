@@ -0,0 +1,184 @@
+"""Memory tools: search the memory files and edit the long-term fact store."""
+
+from typing import Any
+
+from nanobot.agent.memory import MemoryStore, format_hit
+from nanobot.agent.tools.base import Tool
+
+
+class MemorySearchTool(Tool):
+    """Tool to search long-term memory and daily notes."""
+    
+    def __init__(self, memory: MemoryStore):
+        self._memory = memory
+    
+    @property
+    def name(self) -> str:
+        return "memory_search"
+    
+    @property
+    def read_only(self) -> bool:
+        return True
+    
+    @property
+    def description(self) -> str:
+        return (
+            "Search long-term memory (MEMORY.md) and daily notes (memory/YYYY-MM-DD.md, "
+            "including archived months) for passages relevant to a query. "
+            "Returns the best matching passages with their file."
+        )
+    
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Keywords or a question to look up"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum passages to return (default 5)",
+                    "minimum": 1,
+                    "maximum": 20
+                }
+            },
+            "required": ["query"]
+        }
+    
+    async def execute(self, query: str, limit: int = 5, **kwargs: Any) -> str:
+        if self._memory.index is None:
+            return "Error: Memory search is unavailable (SQLite FTS5 missing); read the memory files instead."
+        hits = self._memory.search(query, limit)
+        if not hits:
+            return f"No memories found for: {query}"
+        return "\n\n".join(format_hit(hit) for hit in hits)
+
+
+class RememberTool(Tool):
+    """Tool to store a fact in long-term memory."""
+    
+    def __init__(self, memory: MemoryStore):
+        self._memory = memory
+    
+    @property
+    def name(self) -> str:
+        return "remember"
+    
+    @property
+    def description(self) -> str:
+        return (
+            "Save a fact to long-term memory under a short key. Saving an existing key (or the "
+            "same fact under another key) updates it instead of adding a duplicate."
+        )
+    
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "key": {
+                    "type": "string",
+                    "description": "Short name of the fact, e.g. 'user birthday'"
+                },
+                "value": {
+                    "type": "string",
+                    "description": "The fact to remember"
+                },
+                "importance": {
+                    "type": "integer",
+                    "description": "1 (trivia) to 5 (core fact); less important facts are dropped first when memory is full (default 3)",
+                    "minimum": 1,
+                    "maximum": 5
+                }
+            },
+            "required": ["key", "value"]
+        }
+    
+    async def execute(self, key: str, value: str, importance: int = 3, **kwargs: Any) -> str:
+        ctx = self.context
+        session_key = f"{ctx.channel}:{ctx.chat_id}" if ctx and ctx.channel else None
+        status, pruned = self._memory.remember(key, value, session_key, importance)
+        result = {"added": "Remembered", "updated": "Updated", "unchanged": "Already remembered"}[status]
+        result += f": {key}"
+        if pruned:
+            result += f" (memory full, dropped: {', '.join(fact.key for fact in pruned)})"
+        return result
+
+
+class ForgetTool(Tool):
+    """Tool to delete a fact from long-term memory."""
+    
+    def __init__(self, memory: MemoryStore):
+        self._memory = memory
+    
+    @property
+    def name(self) -> str:
+        return "forget"
+    
+    @property
+    def description(self) -> str:
+        return "Delete a fact from long-term memory by its key."
+    
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "key": {
+                    "type": "string",
+                    "description": "Key of the fact to delete"
+                }
+            },
+            "required": ["key"]
+        }
+    
+    async def execute(self, key: str, **kwargs: Any) -> str:
+        if self._memory.forget(key):
+            return f"Forgot: {key}"
+        return f"Error: No fact with key: {key}"
+
+
+class RecallTool(Tool):
+    """Tool to look up facts in long-term memory."""
+    
+    def __init__(self, memory: MemoryStore):
+        self._memory = memory
+    
+    @property
+    def name(self) -> str:
+        return "recall"
+    
+    @property
+    def read_only(self) -> bool:
+        return True
+    
+    @property
+    def description(self) -> str:
+        return "Look up facts in long-term memory that match a query."
+    
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Keywords to look up"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum facts to return (default 10)",
+                    "minimum": 1,
+                    "maximum": 50
+                }
+            },
+            "required": ["query"]
+        }
+    
+    async def execute(self, query: str, limit: int = 10, **kwargs: Any) -> str:
+        facts = self._memory.facts.recall(query, limit)
+        if not facts:
+            return f"No facts found for: {query}"
+        return "\n".join(f"- {fact.key}: {fact.value}" for fact in facts)
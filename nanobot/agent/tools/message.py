@@ -19,11 +19,6 @@ class MessageTool(Tool):
         self._default_channel = default_channel
         self._default_chat_id = default_chat_id
     
-    def set_context(self, channel: str, chat_id: str) -> None:
-        """Set the current message context."""
-        self._default_channel = channel
-        self._default_chat_id = chat_id
-    
     def set_send_callback(self, callback: Callable[[OutboundMessage], Awaitable[None]]) -> None:
         """Set the callback for sending messages."""
         self._send_callback = callback
@@ -64,8 +59,9 @@ class MessageTool(Tool):
         chat_id: str | None = None,
         **kwargs: Any
     ) -> str:
-        channel = channel or self._default_channel
-        chat_id = chat_id or self._default_chat_id
+        ctx = self.context
+        channel = channel or (ctx and ctx.channel) or self._default_channel
+        chat_id = chat_id or (ctx and ctx.chat_id) or self._default_chat_id
         
         if not channel or not chat_id:
             return "Error: No target channel/chat specified"
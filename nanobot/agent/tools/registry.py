@@ -1,8 +1,10 @@
 """Tool registry for dynamic tool management."""
 
+import asyncio
 from typing import Any
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext, _current_context
+from nanobot.tracing import get_tracer
 
 
 class ToolRegistry:
@@ -35,13 +37,20 @@ class ToolRegistry:
         """Get all tool definitions in OpenAI format."""
         return [tool.to_schema() for tool in self._tools.values()]
     
-    async def execute(self, name: str, params: dict[str, Any]) -> str:
+    async def execute(
+        self,
+        name: str,
+        params: dict[str, Any],
+        context: ToolContext | None = None,
+    ) -> str:
         """
         Execute a tool by name with given parameters.
         
         Args:
             name: Tool name.
             params: Tool parameters.
+            context: Per-turn context (channel/chat) visible to the tool as
+                ``tool.context`` while it runs.
         
         Returns:
             Tool execution result as string.
@@ -53,13 +62,64 @@ class ToolRegistry:
         if not tool:
             return f"Error: Tool '{name}' not found"
 
-        try:
-            errors = tool.validate_params(params)
-            if errors:
-                return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
-            return await tool.execute(**params)
-        except Exception as e:
-            return f"Error executing {name}: {str(e)}"
+        token = _current_context.set(context) if context is not None else None
+        with get_tracer().span(f"tool.{name}", tool=name) as span:
+            try:
+                errors = tool.validate_params(params)
+                if errors:
+                    result = f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
+                else:
+                    result = await tool.execute(**params)
+            except Exception as e:
+                result = f"Error executing {name}: {str(e)}"
+            finally:
+                if token is not None:
+                    _current_context.reset(token)
+            if result.startswith("Error"):
+                span.set_error(result[:200])
+            span.set_attribute("result_chars", len(result))
+            return result
+    
+    async def execute_batch(
+        self,
+        calls: list[tuple[str, dict[str, Any]]],
+        context: ToolContext | None = None,
+    ) -> list[str]:
+        """
+        Execute the tool calls of one LLM response.
+        
+        Consecutive read-only calls run concurrently; any other call acts as
+        a barrier and runs alone, so side effects keep their original order.
+        
+        Args:
+            calls: (name, params) pairs in the order the model issued them.
+            context: Per-turn context passed to every call.
+        
+        Returns:
+            Results in the same order as ``calls``.
+        """
+        results: list[str] = []
+        group: list[tuple[str, dict[str, Any]]] = []
+        
+        async def flush() -> None:
+            if len(group) == 1:
+                results.append(await self.execute(*group[0], context=context))
+            elif group:
+                results.extend(await asyncio.gather(
+                    *(self.execute(name, params, context=context) for name, params in group)
+                ))
+            group.clear()
+        
+        for name, params in calls:
+            tool = self._tools.get(name)
+            if tool is not None and tool.read_only:
+                group.append((name, params))
+                continue
+            await flush()
+            results.append(await self.execute(name, params, context=context))
+        await flush()
+        
+        return results
     
     @property
     def tool_names(self) -> list[str]:
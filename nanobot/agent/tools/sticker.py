@@ -25,9 +25,6 @@ class StickerTool(Tool):
     ):
         self._workspace = workspace
         self._send_callback = send_callback
-        self._default_channel = ""
-        self._default_chat_id = ""
-        self._default_metadata: dict[str, Any] = {}
         self._stickers: dict[str, str] = {}
         self._load_stickers()
 
@@ -52,14 +49,6 @@ class StickerTool(Tool):
         self._stickers.clear()
         self._load_stickers()
 
-    def set_context(
-        self, channel: str, chat_id: str, metadata: dict[str, Any] | None = None
-    ) -> None:
-        """Set the current message context for routing sticker messages."""
-        self._default_channel = channel
-        self._default_chat_id = chat_id
-        self._default_metadata = metadata or {}
-
     @property
     def name(self) -> str:
         return "sticker"
@@ -99,16 +88,16 @@ class StickerTool(Tool):
             available = ", ".join(self._stickers.keys())
             return f"Sticker '{name}' not found. Available: [{available}]"
 
-        channel = self._default_channel
-        chat_id = self._default_chat_id
-        if not channel or not chat_id:
+        ctx = self.context
+        if not ctx or not ctx.channel or not ctx.chat_id:
             return "Error: No target channel/chat specified for sticker"
 
         if not self._send_callback:
             return "Error: Message sending not configured"
 
+        channel, chat_id = ctx.channel, ctx.chat_id
         sticker_metadata = {
-            **self._default_metadata,
+            **ctx.metadata,
             "msg_type": "image",
             "photo_url": photo_url,
         }
@@ -0,0 +1,114 @@
+"""Inbound debounce stage: merges bursts of messages from one sender into one turn."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from nanobot.bus.events import InboundMessage
+
+
+@dataclass
+class _Pending:
+    """A buffered (merged) message waiting for its session to go quiet."""
+    msg: InboundMessage
+    first_at: float
+    last_at: float
+    count: int = 1
+    timer: asyncio.Task | None = field(default=None, repr=False)
+
+
+class InboundDebouncer:
+    """
+    Holds inbound messages per session until the sender stops typing.
+
+    A message is released once no further message arrived for the session
+    within ``quiet_ms``, or ``max_wait_ms`` after the first buffered message,
+    whichever comes first. Consecutive messages from the same sender are
+    merged into one ``InboundMessage`` (content joined by newlines, media
+    concatenated, metadata of the latest message).
+
+    A message from a different sender, or a slash command, releases the
+    buffered message first so ordering and sender attribution are kept.
+    Commands themselves are never delayed.
+    """
+
+    def __init__(
+        self,
+        release: Callable[[InboundMessage], Awaitable[bool]],
+        quiet_ms: int,
+        max_wait_ms: int,
+    ):
+        self._release = release
+        self.quiet_s = max(0, quiet_ms) / 1000
+        self.max_wait_s = max(quiet_ms, max_wait_ms) / 1000
+        self._pending: dict[str, _Pending] = {}
+        self.merged_count = 0
+
+    async def submit(self, msg: InboundMessage) -> bool:
+        """
+        Buffer a message (or release it directly if it must not wait).
+
+        Returns:
+            True if the message was buffered, merged or accepted downstream;
+            False if it was released immediately and refused downstream.
+        """
+        key = msg.session_key
+        pending = self._pending.get(key)
+
+        if msg.content.lstrip().startswith("/"):
+            if pending:
+                await self._flush(key)
+            return await self._release(msg)
+
+        now = time.monotonic()
+        if pending and pending.msg.sender_id == msg.sender_id:
+            self._merge(pending, msg)
+            pending.last_at = now
+            return True
+
+        if pending:
+            await self._flush(key)
+
+        pending = _Pending(msg=msg, first_at=now, last_at=now)
+        self._pending[key] = pending
+        pending.timer = asyncio.create_task(self._flush_when_quiet(key, pending))
+        return True
+
+    def _merge(self, pending: _Pending, msg: InboundMessage) -> None:
+        target = pending.msg
+        if msg.content:
+            target.content = f"{target.content}\n{msg.content}" if target.content else msg.content
+        target.media.extend(msg.media)
+        target.metadata.update(msg.metadata)
+        pending.count += 1
+        target.metadata["buffered_count"] = pending.count
+        self.merged_count += 1
+
+    async def _flush_when_quiet(self, key: str, pending: _Pending) -> None:
+        while self._pending.get(key) is pending:
+            deadline = min(pending.last_at + self.quiet_s, pending.first_at + self.max_wait_s)
+            delay = deadline - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        if self._pending.get(key) is pending:
+            await self._flush(key)
+
+    async def _flush(self, key: str) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        if pending.timer and pending.timer is not asyncio.current_task():
+            pending.timer.cancel()
+        await self._release(pending.msg)
+
+    async def flush_all(self) -> None:
+        """Release every buffered message now (e.g. on shutdown)."""
+        for key in list(self._pending):
+            await self._flush(key)
+
+    @property
+    def pending_sessions(self) -> int:
+        """Number of sessions with a buffered message."""
+        return len(self._pending)
@@ -33,5 +33,7 @@ class OutboundMessage:
     reply_to: str | None = None
     media: list[str] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
+    stream_id: str | None = None  # Set on every update of a progressively streamed reply
+    stream_done: bool = False  # True on the final update of a stream (content is complete)
 
 
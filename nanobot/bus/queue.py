@@ -1,12 +1,17 @@
 """Async message queue for decoupled channel-agent communication."""
 
 import asyncio
+from collections import deque
 from typing import Callable, Awaitable
 
 from loguru import logger
 
+from nanobot.bus.debounce import InboundDebouncer
 from nanobot.bus.events import InboundMessage, OutboundMessage
 
+# What publish_inbound does when a bound is reached
+OVERFLOW_POLICIES = ("drop_oldest", "reject", "coalesce")
+
 
 class MessageBus:
     """
@@ -14,21 +19,143 @@ class MessageBus:
     
     Channels push messages to the inbound queue, and the agent processes
     them and pushes responses to the outbound queue.
+    
+    The inbound queue can be bounded globally (``max_inbound``) and per
+    channel (``max_inbound_per_channel``, overridable in ``channel_limits``);
+    0 means unbounded. When a bound is hit, ``overflow_policy`` decides:
+    
+    - ``drop_oldest``: evict the oldest queued message (of that channel if its
+      own bound was hit) and accept the new one.
+    - ``reject``: refuse the new message.
+    - ``coalesce``: merge the new message into a queued one from the same
+      session; refuse it if there is none.
+    
+    Internal ``system`` messages (subagent announces) are never shed.
+    
+    With ``debounce_ms`` > 0, channel messages first pass through an
+    ``InboundDebouncer`` that merges bursts from one sender into a single
+    message before admission; a burst refused at that point is only counted.
     """
     
-    def __init__(self):
-        self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
+    def __init__(
+        self,
+        max_inbound: int = 0,
+        max_inbound_per_channel: int = 0,
+        channel_limits: dict[str, int] | None = None,
+        overflow_policy: str = "drop_oldest",
+        debounce_ms: int = 0,
+        debounce_max_wait_ms: int = 5000,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy '{overflow_policy}', expected one of {OVERFLOW_POLICIES}"
+            )
+        self.max_inbound = max_inbound
+        self.max_inbound_per_channel = max_inbound_per_channel
+        self.channel_limits = channel_limits or {}
+        self.overflow_policy = overflow_policy
+        self._inbound: deque[InboundMessage] = deque()
+        self._inbound_ready = asyncio.Event()
+        self._channel_counts: dict[str, int] = {}
+        self.shed_counts: dict[str, int] = {}  # channel -> messages dropped or refused
+        self.coalesced_count = 0
+        self.debouncer = (
+            InboundDebouncer(self._enqueue, debounce_ms, debounce_max_wait_ms)
+            if debounce_ms > 0 else None
+        )
         self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
         self._running = False
     
-    async def publish_inbound(self, msg: InboundMessage) -> None:
-        """Publish a message from a channel to the agent."""
-        await self.inbound.put(msg)
+    async def publish_inbound(self, msg: InboundMessage) -> bool:
+        """
+        Publish a message from a channel to the agent.
+        
+        Returns:
+            True if the message was queued (or merged into a queued or
+            debounced message), False if it was refused because the queue
+            is full.
+        """
+        if self.debouncer and msg.channel != "system":
+            return await self.debouncer.submit(msg)
+        return await self._enqueue(msg)
+    
+    async def _enqueue(self, msg: InboundMessage) -> bool:
+        """Apply admission control and queue the message."""
+        if msg.channel != "system":
+            channel_limit = self._channel_limit(msg.channel)
+            channel_full = 0 < channel_limit <= self._channel_counts.get(msg.channel, 0)
+            global_full = 0 < self.max_inbound <= len(self._inbound)
+            if channel_full or global_full:
+                if not self._admit_overflow(msg, channel_full):
+                    self._record_shed(msg, "refused")
+                    return False
+                if self.overflow_policy == "coalesce":
+                    return True
+        
+        self._inbound.append(msg)
+        self._channel_counts[msg.channel] = self._channel_counts.get(msg.channel, 0) + 1
+        self._inbound_ready.set()
+        return True
+    
+    def _channel_limit(self, channel: str) -> int:
+        return self.channel_limits.get(channel, self.max_inbound_per_channel)
+    
+    def _admit_overflow(self, msg: InboundMessage, channel_full: bool) -> bool:
+        """Apply the overflow policy; returns True if ``msg`` is admitted."""
+        if self.overflow_policy == "drop_oldest":
+            victim = next(
+                (
+                    m for m in self._inbound
+                    if m.channel != "system" and (not channel_full or m.channel == msg.channel)
+                ),
+                None,
+            )
+            if victim is None:
+                return False
+            self._remove_inbound(victim)
+            self._record_shed(victim, "dropped")
+            return True
+        
+        if self.overflow_policy == "coalesce":
+            target = next(
+                (m for m in reversed(self._inbound) if m.session_key == msg.session_key),
+                None,
+            )
+            if target is None:
+                return False
+            target.content = f"{target.content}\n{msg.content}" if target.content else msg.content
+            target.media.extend(msg.media)
+            target.metadata.update(msg.metadata)
+            self.coalesced_count += 1
+            return True
+        
+        return False
+    
+    def _remove_inbound(self, msg: InboundMessage) -> None:
+        self._inbound.remove(msg)
+        self._channel_counts[msg.channel] -= 1
+    
+    def _record_shed(self, msg: InboundMessage, action: str) -> None:
+        self.shed_counts[msg.channel] = self.shed_counts.get(msg.channel, 0) + 1
+        logger.warning(
+            f"Inbound queue full: {action} message from {msg.channel}:{msg.sender_id} "
+            f"(queued={len(self._inbound)}, shed total={self.shed_total})"
+        )
+    
+    async def flush_debounced(self) -> None:
+        """Release messages held by the debouncer into the inbound queue now (e.g. on shutdown)."""
+        if self.debouncer:
+            await self.debouncer.flush_all()
     
     async def consume_inbound(self) -> InboundMessage:
         """Consume the next inbound message (blocks until available)."""
-        return await self.inbound.get()
+        while not self._inbound:
+            self._inbound_ready.clear()
+            await self._inbound_ready.wait()
+        msg = self._inbound.popleft()
+        self._channel_counts[msg.channel] -= 1
+        return msg
     
     async def publish_outbound(self, msg: OutboundMessage) -> None:
         """Publish a response from the agent to channels."""
@@ -73,7 +200,12 @@ class MessageBus:
     @property
     def inbound_size(self) -> int:
         """Number of pending inbound messages."""
-        return self.inbound.qsize()
+        return len(self._inbound)
+    
+    @property
+    def shed_total(self) -> int:
+        """Number of inbound messages dropped or refused so far."""
+        return sum(self.shed_counts.values())
     
     @property
     def outbound_size(self) -> int:
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import time
 from abc import ABC, abstractmethod
 from typing import Any, TYPE_CHECKING
 
@@ -16,6 +17,9 @@ if TYPE_CHECKING:
 # Commands that trigger a conversation reset
 RESET_COMMANDS = {"/reset", "/clear", "/new"}
 
+# Sent when the message bus refuses a message because its queue is full
+BUSY_REPLY = "⏳ I'm handling a lot of messages right now. Please try again in a moment."
+
 class BaseChannel(ABC):
     """
     Abstract base class for chat channel implementations.
@@ -26,6 +30,12 @@ class BaseChannel(ABC):
     
     name: str = "base"
     
+    # Channels that can edit a sent message set this and implement
+    # _stream_start/_stream_edit to render streamed replies progressively.
+    supports_streaming: bool = False
+    # Minimum seconds between edits of one streamed message (platform rate limit)
+    stream_min_interval: float = 1.0
+    
     def __init__(self, config: Any, bus: MessageBus):
         """
         Initialize the channel.
@@ -37,7 +47,11 @@ class BaseChannel(ABC):
         self.config = config
         self.bus = bus
         self.session_manager: SessionManager | None = None
-        self._running = False    
+        self._running = False
+        self._stream_handles: dict[str, Any] = {}  # stream_id -> platform message handle
+        self._stream_last_edit: dict[str, float] = {}  # stream_id -> monotonic time of last edit
+    
+
     @abstractmethod
     async def start(self) -> None:
         """
@@ -65,6 +79,53 @@ class BaseChannel(ABC):
         """
         pass
     
+    async def send_stream(self, msg: OutboundMessage) -> None:
+        """
+        Render one update of a streamed reply by editing a single message.
+        
+        The first update creates the platform message, later updates edit it
+        (throttled to ``stream_min_interval``; updates carry the full text so
+        skipping some loses nothing), and the ``stream_done`` update always
+        goes through with the final content.
+        
+        Args:
+            msg: Outbound message with ``stream_id`` set.
+        """
+        stream_id = msg.stream_id or ""
+        now = time.monotonic()
+        if not msg.stream_done:
+            last = self._stream_last_edit.get(stream_id)
+            if last is not None and now - last < self.stream_min_interval:
+                return
+        self._stream_last_edit[stream_id] = now
+        
+        handle = self._stream_handles.get(stream_id)
+        if msg.stream_done:
+            self._stream_handles.pop(stream_id, None)
+            self._stream_last_edit.pop(stream_id, None)
+        
+        try:
+            if handle is None:
+                if msg.stream_done:
+                    # Nothing was shown yet (e.g. first update failed): plain send
+                    await self.send(msg)
+                    return
+                handle = await self._stream_start(msg)
+                if handle is not None:
+                    self._stream_handles[stream_id] = handle
+            else:
+                await self._stream_edit(handle, msg)
+        except Exception as e:
+            logger.warning(f"Stream update failed on {self.name}: {e}")
+    
+    async def _stream_start(self, msg: OutboundMessage) -> Any:
+        """Send the first message of a stream; return a handle used for later edits."""
+        raise NotImplementedError
+    
+    async def _stream_edit(self, handle: Any, msg: OutboundMessage) -> None:
+        """Replace the content of a streamed message (final formatting when msg.stream_done)."""
+        raise NotImplementedError
+    
     def is_allowed(self, sender_id: str) -> bool:
         """
         Check if a sender is allowed to use this bot.
@@ -102,7 +163,8 @@ class BaseChannel(ABC):
         Handle an incoming message from the chat platform.
         
         This method checks permissions, intercepts reset commands,
-        and forwards normal messages to the bus.
+        and forwards normal messages to the bus (replying with a busy notice
+        if the bus refuses the message).
         
         Args:
             sender_id: The sender's identifier.
@@ -133,7 +195,25 @@ class BaseChannel(ABC):
             metadata=metadata or {}
         )
         
-        await self.bus.publish_inbound(msg)
+        if not await self.bus.publish_inbound(msg):
+            await self._handle_refused(msg)
+    
+    async def _handle_refused(self, msg: InboundMessage) -> None:
+        """
+        Tell the sender their message was not accepted (inbound queue full).
+        
+        Args:
+            msg: The refused message.
+        """
+        try:
+            await self.send(OutboundMessage(
+                channel=self.name,
+                chat_id=msg.chat_id,
+                content=BUSY_REPLY,
+                metadata=msg.metadata,
+            ))
+        except Exception as e:
+            logger.error(f"Failed to send busy reply on {self.name}: {e}")
     
     async def _handle_reset(self, chat_id: str, metadata: dict[str, Any] | None = None) -> None:
         """
@@ -155,7 +235,7 @@ class BaseChannel(ABC):
             ))
             return
         
-        session = self.session_manager.get_or_create(session_key)
+        session = await self.session_manager.get_or_create_async(session_key)
         msg_count = len(session.messages)
         session.clear()
         self.session_manager.save(session)
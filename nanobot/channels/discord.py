@@ -23,6 +23,8 @@ class DiscordChannel(BaseChannel):
     """Discord channel using Gateway websocket."""
 
     name = "discord"
+    supports_streaming = True
+    stream_min_interval = 1.0  # Message edits are limited to 5 per 5 seconds per channel
 
     def __init__(self, config: DiscordConfig, bus: MessageBus):
         super().__init__(config, bus)
@@ -107,6 +109,34 @@ class DiscordChannel(BaseChannel):
         finally:
             await self._stop_typing(msg.chat_id)
 
+    async def _stream_start(self, msg: OutboundMessage) -> str | None:
+        """Post the first chunk of a streamed reply; returns the Discord message ID."""
+        if not self._http:
+            return None
+        await self._stop_typing(msg.chat_id)
+        url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages"
+        headers = {"Authorization": f"Bot {self.config.token}"}
+        response = await self._http.post(url, headers=headers, json={"content": msg.content})
+        response.raise_for_status()
+        return response.json().get("id")
+
+    async def _stream_edit(self, message_id: str, msg: OutboundMessage) -> None:
+        """PATCH a streamed reply, retrying the final update if rate limited."""
+        if not self._http:
+            return
+        url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages/{message_id}"
+        headers = {"Authorization": f"Bot {self.config.token}"}
+        for _ in range(3):
+            response = await self._http.patch(url, headers=headers, json={"content": msg.content})
+            if response.status_code == 429 and msg.stream_done:
+                retry_after = float(response.json().get("retry_after", 1.0))
+                await asyncio.sleep(retry_after)
+                continue
+            if response.status_code == 429:
+                return  # Skip this partial; a later update carries the full text
+            response.raise_for_status()
+            return
+
     async def _gateway_loop(self) -> None:
         """Main gateway loop: identify, heartbeat, dispatch events."""
         if not self._ws:
@@ -23,6 +23,8 @@ try:
         CreateMessageReactionRequestBody,
         Emoji,
         P2ImMessageReceiveV1,
+        PatchMessageRequest,
+        PatchMessageRequestBody,
     )
     FEISHU_AVAILABLE = True
 except ImportError:
@@ -52,6 +54,7 @@ class FeishuChannel(BaseChannel):
     """
     
     name = "feishu"
+    supports_streaming = True
     
     def __init__(self, config: FeishuConfig, bus: MessageBus):
         super().__init__(config, bus)
@@ -202,31 +205,8 @@ class FeishuChannel(BaseChannel):
             return
         
         try:
-            # Determine receive_id_type based on chat_id format
-            # open_id starts with "ou_", chat_id starts with "oc_"
-            if msg.chat_id.startswith("oc_"):
-                receive_id_type = "chat_id"
-            else:
-                receive_id_type = "open_id"
-            
             # Build card with markdown + table support
-            elements = self._build_card_elements(msg.content)
-            card = {
-                "config": {"wide_screen_mode": True},
-                "elements": elements,
-            }
-            content = json.dumps(card, ensure_ascii=False)
-            
-            request = CreateMessageRequest.builder() \
-                .receive_id_type(receive_id_type) \
-                .request_body(
-                    CreateMessageRequestBody.builder()
-                    .receive_id(msg.chat_id)
-                    .msg_type("interactive")
-                    .content(content)
-                    .build()
-                ).build()
-            
+            request = self._build_create_request(msg.chat_id, self._build_card(msg.content))
             response = self._client.im.v1.message.create(request)
             
             if not response.success():
@@ -240,6 +220,60 @@ class FeishuChannel(BaseChannel):
         except Exception as e:
             logger.error(f"Error sending Feishu message: {e}")
     
+    async def _stream_start(self, msg: OutboundMessage) -> str | None:
+        """Send the first chunk of a streamed reply as an updatable card."""
+        if not self._client:
+            return None
+        request = self._build_create_request(
+            msg.chat_id, self._build_card(msg.content, updatable=True)
+        )
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, self._client.im.v1.message.create, request)
+        if not response.success():
+            raise RuntimeError(f"create failed: code={response.code}, msg={response.msg}")
+        return response.data.message_id
+    
+    async def _stream_edit(self, message_id: str, msg: OutboundMessage) -> None:
+        """Patch the card of a streamed reply with the latest content."""
+        if not self._client:
+            return
+        request = PatchMessageRequest.builder() \
+            .message_id(message_id) \
+            .request_body(
+                PatchMessageRequestBody.builder()
+                .content(self._build_card(msg.content, updatable=True))
+                .build()
+            ).build()
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, self._client.im.v1.message.patch, request)
+        if not response.success():
+            raise RuntimeError(f"patch failed: code={response.code}, msg={response.msg}")
+    
+    def _build_card(self, content: str, updatable: bool = False) -> str:
+        """Serialize an interactive card for the given markdown content."""
+        config: dict[str, Any] = {"wide_screen_mode": True}
+        if updatable:
+            # Cards can only be patched after sending when update_multi is set
+            config["update_multi"] = True
+        card = {"config": config, "elements": self._build_card_elements(content)}
+        return json.dumps(card, ensure_ascii=False)
+    
+    @staticmethod
+    def _build_create_request(chat_id: str, card: str) -> "CreateMessageRequest":
+        """Build a create-message request for an interactive card."""
+        # Determine receive_id_type based on chat_id format
+        # open_id starts with "ou_", chat_id starts with "oc_"
+        receive_id_type = "chat_id" if chat_id.startswith("oc_") else "open_id"
+        return CreateMessageRequest.builder() \
+            .receive_id_type(receive_id_type) \
+            .request_body(
+                CreateMessageRequestBody.builder()
+                .receive_id(chat_id)
+                .msg_type("interactive")
+                .content(card)
+                .build()
+            ).build()
+    
     def _on_message_sync(self, data: "P2ImMessageReceiveV1") -> None:
         """
         Sync handler for incoming messages (called from WebSocket thread).
@@ -206,7 +206,12 @@ class ChannelManager:
                 channel = self.channels.get(msg.channel)
                 if channel:
                     try:
-                        await channel.send(msg)
+                        if msg.stream_id and channel.supports_streaming:
+                            await channel.send_stream(msg)
+                        elif msg.stream_id and not msg.stream_done:
+                            continue  # Partial updates need message editing
+                        else:
+                            await channel.send(msg)
                     except Exception as e:
                         logger.error(f"Error sending to {msg.channel}: {e}")
                 else:
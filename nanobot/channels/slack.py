@@ -20,6 +20,8 @@ class SlackChannel(BaseChannel):
     """Slack channel using Socket Mode."""
 
     name = "slack"
+    supports_streaming = True
+    stream_min_interval = 1.2  # chat.update is Tier 3 (~50 calls per minute)
 
     def __init__(self, config: SlackConfig, bus: MessageBus):
         super().__init__(config, bus)
@@ -77,19 +79,41 @@ class SlackChannel(BaseChannel):
             logger.warning("Slack client not running")
             return
         try:
-            slack_meta = msg.metadata.get("slack", {}) if msg.metadata else {}
-            thread_ts = slack_meta.get("thread_ts")
-            channel_type = slack_meta.get("channel_type")
-            # Only reply in thread for channel/group messages; DMs don't use threads
-            use_thread = thread_ts and channel_type != "im"
             await self._web_client.chat_postMessage(
                 channel=msg.chat_id,
                 text=msg.content or "",
-                thread_ts=thread_ts if use_thread else None,
+                thread_ts=self._reply_thread_ts(msg),
             )
         except Exception as e:
             logger.error(f"Error sending Slack message: {e}")
 
+    async def _stream_start(self, msg: OutboundMessage) -> str | None:
+        """Post the first chunk of a streamed reply; returns its ts for chat.update."""
+        if not self._web_client:
+            return None
+        response = await self._web_client.chat_postMessage(
+            channel=msg.chat_id,
+            text=msg.content or "",
+            thread_ts=self._reply_thread_ts(msg),
+        )
+        return response.get("ts")
+
+    async def _stream_edit(self, ts: str, msg: OutboundMessage) -> None:
+        """Replace the text of a streamed reply."""
+        if not self._web_client:
+            return
+        await self._web_client.chat_update(channel=msg.chat_id, ts=ts, text=msg.content or "")
+
+    @staticmethod
+    def _reply_thread_ts(msg: OutboundMessage) -> str | None:
+        """Thread to reply in, if any."""
+        slack_meta = msg.metadata.get("slack", {}) if msg.metadata else {}
+        thread_ts = slack_meta.get("thread_ts")
+        channel_type = slack_meta.get("channel_type")
+        # Only reply in thread for channel/group messages; DMs don't use threads
+        use_thread = thread_ts and channel_type != "im"
+        return thread_ts if use_thread else None
+
     async def _on_socket_request(
         self,
         client: SocketModeClient,
@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING
 
 from loguru import logger
 from telegram import BotCommand, Update
+from telegram.error import BadRequest
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 
 from nanobot.bus.events import OutboundMessage
@@ -90,11 +91,14 @@ class TelegramChannel(BaseChannel):
     """
     
     name = "telegram"
+    supports_streaming = True
+    stream_min_interval = 1.0  # Telegram tolerates about one edit per second per chat
     
     # Commands registered with Telegram's command menu
     BOT_COMMANDS = [
         BotCommand("start", "Start the bot"),
         BotCommand("reset", "Reset conversation history"),
+        BotCommand("stop", "Stop the current reply"),
         BotCommand("help", "Show available commands"),
     ]
     
@@ -130,6 +134,7 @@ class TelegramChannel(BaseChannel):
         # Add command handlers
         self._app.add_handler(CommandHandler("start", self._on_start))
         self._app.add_handler(CommandHandler("reset", self._on_reset))
+        self._app.add_handler(CommandHandler("stop", self._on_stop))
         self._app.add_handler(CommandHandler("help", self._on_help))
         
         # Add message handler for text, photos, voice, documents
@@ -214,6 +219,43 @@ class TelegramChannel(BaseChannel):
             except Exception as e2:
                 logger.error(f"Error sending Telegram message: {e2}")
     
+    async def _stream_start(self, msg: OutboundMessage) -> int | None:
+        """Send the first chunk of a streamed reply as plain text."""
+        if not self._app:
+            return None
+        self._stop_typing(msg.chat_id)
+        sent = await self._app.bot.send_message(chat_id=int(msg.chat_id), text=msg.content)
+        return sent.message_id
+    
+    async def _stream_edit(self, message_id: int, msg: OutboundMessage) -> None:
+        """Edit a streamed reply; the final update gets HTML formatting."""
+        if not self._app:
+            return
+        chat_id = int(msg.chat_id)
+        try:
+            if not msg.stream_done:
+                # Partial markdown would not survive HTML conversion; keep it plain
+                await self._app.bot.edit_message_text(
+                    chat_id=chat_id, message_id=message_id, text=msg.content
+                )
+                return
+            await self._app.bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=_markdown_to_telegram_html(msg.content),
+                parse_mode="HTML",
+            )
+        except BadRequest as e:
+            # Editing to identical text is rejected by Telegram; nothing to do
+            if "not modified" in str(e).lower():
+                return
+            if not msg.stream_done:
+                raise
+            logger.warning(f"HTML parse failed, falling back to plain text: {e}")
+            await self._app.bot.edit_message_text(
+                chat_id=chat_id, message_id=message_id, text=msg.content
+            )
+    
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
         if not update.message or not update.effective_user:
@@ -239,7 +281,7 @@ class TelegramChannel(BaseChannel):
             await update.message.reply_text("⚠️ Session management is not available.")
             return
         
-        session = self.session_manager.get_or_create(session_key)
+        session = await self.session_manager.get_or_create_async(session_key)
         msg_count = len(session.messages)
         session.clear()
         self.session_manager.save(session)
@@ -247,6 +289,33 @@ class TelegramChannel(BaseChannel):
         logger.info(f"Session reset for {session_key} (cleared {msg_count} messages)")
         await update.message.reply_text("🔄 Conversation history cleared. Let's start fresh!")
     
+    async def _on_stop(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle /stop command — forward it to the agent, which cancels this chat's turn."""
+        if not update.message or not update.effective_user:
+            return
+        
+        # Normalized: in groups the command arrives as "/stop@botname"
+        await self._handle_message(
+            sender_id=self._sender_id(update.effective_user),
+            chat_id=str(update.message.chat_id),
+            content="/stop",
+            metadata={
+                "message_id": update.message.message_id,
+                "user_id": update.effective_user.id,
+                "username": update.effective_user.username,
+                "first_name": update.effective_user.first_name,
+                "is_group": update.message.chat.type != "private"
+            }
+        )
+    
+    @staticmethod
+    def _sender_id(user) -> str:
+        """Stable numeric ID, with the username kept for allowlist compatibility."""
+        sender_id = str(user.id)
+        if user.username:
+            sender_id = f"{sender_id}|{user.username}"
+        return sender_id
+    
     async def _on_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /help command — show available commands."""
         if not update.message:
@@ -256,6 +325,7 @@ class TelegramChannel(BaseChannel):
             "🐈 <b>nanobot commands</b>\n\n"
             "/start — Start the bot\n"
             "/reset — Reset conversation history\n"
+            "/stop — Stop the current reply\n"
             "/help — Show this help message\n\n"
             "Just send me a text message to chat!"
         )
@@ -270,10 +340,7 @@ class TelegramChannel(BaseChannel):
         user = update.effective_user
         chat_id = message.chat_id
         
-        # Use stable numeric ID, but keep username for allowlist compatibility
-        sender_id = str(user.id)
-        if user.username:
-            sender_id = f"{sender_id}|{user.username}"
+        sender_id = self._sender_id(user)
         
         # Store chat_id for replies
         self._chat_ids[sender_id] = chat_id
@@ -314,9 +314,55 @@ def _make_provider(config):
         default_model=model,
         extra_headers=p.extra_headers if p else None,
         provider_name=config.get_provider_name(),
+        prompt_caching=config.agents.defaults.prompt_layout == "cache",
     )
 
 
+def _make_session_store(config, backend: str | None = None):
+    """Create the configured SessionStore (or the given backend's)."""
+    backend = backend or config.sessions.backend
+    if backend == "jsonl":
+        from nanobot.session.jsonl_store import JsonlSessionStore
+        return JsonlSessionStore(
+            Path.home() / ".nanobot" / "sessions",
+            mode=config.sessions.persistence,
+            compact_after=config.sessions.compact_after,
+            layout=config.sessions.layout,
+        )
+    if backend == "sqlite":
+        from nanobot.session.sqlite_store import SqliteSessionStore
+        return SqliteSessionStore(Path(config.sessions.db_path).expanduser())
+    console.print(f"[red]Error: Unknown session backend {backend!r} (expected jsonl or sqlite)[/red]")
+    raise typer.Exit(1)
+
+
+def _make_session_manager(config):
+    """Create SessionManager from config."""
+    from nanobot.session.manager import SessionManager
+    return SessionManager(
+        config.workspace_path,
+        store=_make_session_store(config),
+        cache_max_sessions=config.sessions.cache_max_sessions,
+        cache_max_bytes=config.sessions.cache_max_mb * 1024 * 1024,
+        cache_idle_ttl_s=config.sessions.cache_idle_minutes * 60,
+        load_tail=config.sessions.load_tail,
+        write_delay_s=config.sessions.write_delay_ms / 1000,
+        archive_after_days=config.sessions.archive_after_days,
+    )
+
+
+def _setup_tracing(config) -> None:
+    """Enable span tracing if configured."""
+    if not config.tracing.enabled:
+        return
+    from nanobot.tracing import JsonlSpanExporter, configure_tracing
+    configure_tracing(JsonlSpanExporter(
+        Path(config.tracing.path),
+        max_bytes=config.tracing.max_bytes,
+        backup_count=config.tracing.backup_count,
+    ))
+
+
 # ============================================================================
 # Gateway / Server
 # ============================================================================
@@ -332,10 +378,10 @@ def gateway(
     from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
     from nanobot.channels.manager import ChannelManager
-    from nanobot.session.manager import SessionManager
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from loguru import logger
     
     if verbose:
         import logging
@@ -344,9 +390,17 @@ def gateway(
     console.print(f"{__logo__} Starting nanobot gateway on port {port}...")
     
     config = load_config()
-    bus = MessageBus()
+    _setup_tracing(config)
+    bus = MessageBus(
+        max_inbound=config.bus.max_inbound,
+        max_inbound_per_channel=config.bus.max_inbound_per_channel,
+        channel_limits=config.bus.channel_limits,
+        overflow_policy=config.bus.overflow_policy,
+        debounce_ms=config.bus.debounce_ms,
+        debounce_max_wait_ms=config.bus.debounce_max_wait_ms,
+    )
     provider = _make_provider(config)
-    session_manager = SessionManager(config.workspace_path)
+    session_manager = _make_session_manager(config)
     
     # Create cron service first (callback set after agent creation)
     cron_store_path = get_data_dir() / "cron" / "jobs.json"
@@ -371,6 +425,29 @@ def gateway(
         summarize_threshold=config.agents.defaults.summarize_threshold,
         message_buffer_min=config.agents.defaults.message_buffer_min,
         summary_model=config.agents.defaults.summary_model,
+        summary_chunk_tokens=config.agents.defaults.summary_chunk_tokens,
+        summary_concurrency=config.agents.defaults.summary_concurrency,
+        summary_incremental=config.agents.defaults.summary_incremental,
+        max_concurrent_turns=config.agents.defaults.max_concurrent_turns,
+        max_queued_turns_per_session=config.agents.defaults.max_queued_turns_per_session,
+        max_queued_turns=config.agents.defaults.max_queued_turns,
+        stream_replies=config.agents.defaults.stream_replies,
+        stream_interval_ms=config.agents.defaults.stream_interval_ms,
+        turn_preemption=config.agents.defaults.turn_preemption,
+        tool_result_max_tokens=config.agents.defaults.tool_result_max_tokens,
+        tool_result_turn_tokens=config.agents.defaults.tool_result_turn_tokens,
+        tool_result_limits=config.agents.defaults.tool_result_limits,
+        prompt_layout=config.agents.defaults.prompt_layout,
+        image_max_dimension=config.agents.defaults.image_max_dimension,
+        image_quality=config.agents.defaults.image_quality,
+        max_tokens=config.agents.defaults.max_tokens,
+        memory_inline_tokens=config.agents.defaults.memory_inline_tokens,
+        memory_pinned_tokens=config.agents.defaults.memory_pinned_tokens,
+        memory_top_k=config.agents.defaults.memory_top_k,
+        memory_fsync_every=config.agents.defaults.memory_fsync_every,
+        memory_archive_days=config.agents.defaults.memory_archive_days,
+        memory_facts=config.agents.defaults.memory_facts,
+        memory_facts_max_tokens=config.agents.defaults.memory_facts_max_tokens,
     )
     
     # Set cron callback (needs agent)
@@ -418,6 +495,15 @@ def gateway(
     
     console.print(f"[green]✓[/green] Heartbeat: every 30m")
     
+    async def archive_sessions():
+        # Daily sweep of idle sessions into the cold tier
+        while True:
+            try:
+                await session_manager.archive_idle()
+            except Exception as e:
+                logger.warning(f"Session archiving failed: {e}")
+            await asyncio.sleep(24 * 3600)
+    
     async def run():
         try:
             await cron.start()
@@ -425,13 +511,20 @@ def gateway(
             await asyncio.gather(
                 agent.run(),
                 channels.start_all(),
+                archive_sessions(),
             )
-        except KeyboardInterrupt:
+        finally:
+            # Ctrl+C cancels this task (CancelledError, not KeyboardInterrupt),
+            # so shut down here. Debounced bursts and queued messages still get
+            # their turn while channels can deliver replies; sessions still
+            # queued for writing go to disk last.
             console.print("\nShutting down...")
             heartbeat.stop()
             cron.stop()
-            agent.stop()
+            await bus.flush_debounced()
+            await agent.drain()
             await channels.stop_all()
+            await agent.flush()
     
     asyncio.run(run())
 
@@ -457,6 +550,7 @@ def agent(
     from loguru import logger
     
     config = load_config()
+    _setup_tracing(config)
     
     bus = MessageBus()
     provider = _make_provider(config)
@@ -470,6 +564,7 @@ def agent(
         bus=bus,
         provider=provider,
         workspace=config.workspace_path,
+        session_manager=_make_session_manager(config),
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
         restrict_to_workspace=config.tools.restrict_to_workspace,
@@ -480,6 +575,23 @@ def agent(
         summarize_threshold=config.agents.defaults.summarize_threshold,
         message_buffer_min=config.agents.defaults.message_buffer_min,
         summary_model=config.agents.defaults.summary_model,
+        summary_chunk_tokens=config.agents.defaults.summary_chunk_tokens,
+        summary_concurrency=config.agents.defaults.summary_concurrency,
+        summary_incremental=config.agents.defaults.summary_incremental,
+        tool_result_max_tokens=config.agents.defaults.tool_result_max_tokens,
+        tool_result_turn_tokens=config.agents.defaults.tool_result_turn_tokens,
+        tool_result_limits=config.agents.defaults.tool_result_limits,
+        prompt_layout=config.agents.defaults.prompt_layout,
+        image_max_dimension=config.agents.defaults.image_max_dimension,
+        image_quality=config.agents.defaults.image_quality,
+        max_tokens=config.agents.defaults.max_tokens,
+        memory_inline_tokens=config.agents.defaults.memory_inline_tokens,
+        memory_pinned_tokens=config.agents.defaults.memory_pinned_tokens,
+        memory_top_k=config.agents.defaults.memory_top_k,
+        memory_fsync_every=config.agents.defaults.memory_fsync_every,
+        memory_archive_days=config.agents.defaults.memory_archive_days,
+        memory_facts=config.agents.defaults.memory_facts,
+        memory_facts_max_tokens=config.agents.defaults.memory_facts_max_tokens,
     )
     
     # Show spinner when logs are off (no output to miss); skip when logs are on
@@ -494,6 +606,7 @@ def agent(
         async def run_once():
             with _thinking_ctx():
                 response = await agent_loop.process_direct(message, session_id)
+            await agent_loop.flush()
             _print_agent_response(response, render_markdown=markdown)
         
         asyncio.run(run_once())
@@ -502,17 +615,22 @@ def agent(
         _enable_line_editing()
         console.print(f"{__logo__} Interactive mode (type [bold]exit[/bold] or [bold]Ctrl+C[/bold] to quit)\n")
 
-        # input() runs in a worker thread that can't be cancelled.
-        # Without this handler, asyncio.run() would hang waiting for it.
-        def _exit_on_sigint(signum, frame):
+        async def _exit_after_flush():
+            await agent_loop.flush()
             _save_history()
             _restore_terminal()
             console.print("\nGoodbye!")
             os._exit(0)
-
-        signal.signal(signal.SIGINT, _exit_on_sigint)
         
         async def run_interactive():
+            # input() runs in a worker thread that can't be cancelled.
+            # Without this handler, asyncio.run() would hang waiting for it.
+            # The handler runs on the event loop, so pending session writes
+            # are flushed before the process exits.
+            exit_tasks: list[asyncio.Task] = []
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGINT, lambda: exit_tasks.append(asyncio.create_task(_exit_after_flush()))
+            )
             while True:
                 try:
                     _flush_pending_tty_input()
@@ -540,6 +658,7 @@ def agent(
                     _restore_terminal()
                     console.print("\nGoodbye!")
                     break
+            await agent_loop.flush()
         
         asyncio.run(run_interactive())
 
@@ -852,6 +971,172 @@ def cron_run(
         console.print(f"[red]Failed to run job {job_id}[/red]")
 
 
+# ============================================================================
+# Trace Commands
+# ============================================================================
+
+trace_app = typer.Typer(help="Inspect turn traces")
+app.add_typer(trace_app, name="trace")
+
+
+@trace_app.command("show")
+def trace_show(
+    turn_id: str = typer.Argument(..., help="Turn ID (trace ID or unique prefix)"),
+    width: int = typer.Option(40, "--width", "-w", help="Width of the waterfall bars"),
+):
+    """Show a turn's spans as a waterfall."""
+    from nanobot.config.loader import load_config
+    from nanobot.tracing import read_spans
+
+    config = load_config()
+    spans = read_spans(Path(config.tracing.path), turn_id)
+    if not spans:
+        console.print(f"[red]No spans found for turn {turn_id}[/red]")
+        raise typer.Exit(1)
+
+    trace_ids = {s["trace_id"] for s in spans}
+    if len(trace_ids) > 1:
+        console.print(f"[red]Turn ID prefix {turn_id} is ambiguous ({len(trace_ids)} traces)[/red]")
+        raise typer.Exit(1)
+
+    # Order spans depth-first so children follow their parent
+    by_id = {s["span_id"]: s for s in spans}
+    children: dict[str | None, list[dict]] = {}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in by_id else None
+        children.setdefault(parent, []).append(s)
+
+    ordered: list[tuple[int, dict]] = []
+
+    def walk(parent: str | None, depth: int) -> None:
+        for s in children.get(parent, []):
+            ordered.append((depth, s))
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+
+    t0 = min(s["start_ns"] for s in spans)
+    total = max(max(s["end_ns"] for s in spans) - t0, 1)
+
+    table = Table(title=f"Turn {spans[0]['trace_id']}")
+    table.add_column("Span")
+    table.add_column("Start", justify="right")
+    table.add_column("Duration", justify="right")
+    table.add_column("Waterfall", no_wrap=True)
+    table.add_column("Details", style="dim")
+
+    for depth, s in ordered:
+        offset = (s["start_ns"] - t0) / total
+        length = max((s["end_ns"] - s["start_ns"]) / total, 0)
+        lead = min(int(offset * width), width - 1)
+        bar_len = max(1, min(int(round(length * width)), width - lead))
+        color = "red" if s["error"] else "cyan"
+        bar = " " * lead + f"[{color}]" + "█" * bar_len + f"[/{color}]"
+        details = ", ".join(f"{k}={v}" for k, v in s["attributes"].items())
+        if s["error"]:
+            details = f"[red]{s['error']}[/red] {details}"
+        table.add_row(
+            "  " * depth + s["name"],
+            f"{(s['start_ns'] - t0) / 1e6:.0f}ms",
+            f"{(s['end_ns'] - s['start_ns']) / 1e6:.0f}ms",
+            bar,
+            details,
+        )
+
+    console.print(table)
+
+
+# ============================================================================
+# Session Commands
+# ============================================================================
+
+
+sessions_app = typer.Typer(help="Manage conversation sessions")
+app.add_typer(sessions_app, name="sessions")
+
+
+@sessions_app.command("list")
+def sessions_list(
+    channel: str = typer.Option(None, "--channel", "-c", help="Only sessions of this channel"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Maximum sessions to show (0 = all)"),
+):
+    """List sessions, most recently active first."""
+    from nanobot.config.loader import load_config
+
+    store = _make_session_store(load_config())
+    sessions = store.list_sessions(channel=channel, limit=limit or None)
+    store.close()
+
+    if not sessions:
+        console.print("No sessions.")
+        return
+
+    table = Table(title="Sessions")
+    table.add_column("Key", style="cyan")
+    table.add_column("Created")
+    table.add_column("Updated")
+    for s in sessions:
+        table.add_row(s["key"], (s.get("created_at") or "")[:16], (s.get("updated_at") or "")[:16])
+
+    console.print(table)
+
+
+@sessions_app.command("migrate")
+def sessions_migrate(
+    to: str = typer.Option("sqlite", "--to", help="Backend to copy sessions into: sqlite or jsonl"),
+):
+    """Copy all sessions from the other backend into this one."""
+    from nanobot.config.loader import load_config
+    from nanobot.session.store import migrate_sessions
+
+    if to not in ("sqlite", "jsonl"):
+        console.print(f"[red]Error: Unknown session backend {to!r} (expected jsonl or sqlite)[/red]")
+        raise typer.Exit(1)
+
+    config = load_config()
+    source = _make_session_store(config, "jsonl" if to == "sqlite" else "sqlite")
+    target = _make_session_store(config, to)
+    count = migrate_sessions(source, target)
+    source.close()
+    target.close()
+
+    console.print(f"[green]✓[/green] Copied {count} sessions into the {to} store")
+    if config.sessions.backend != to:
+        console.print(f'Set "sessions": {{"backend": "{to}"}} in ~/.nanobot/config.json to use it')
+
+
+@sessions_app.command("archive")
+def sessions_archive(
+    idle_days: int = typer.Option(None, "--idle-days", help="Archive sessions idle this many days (default: sessions.archiveAfterDays)"),
+):
+    """Compress idle sessions into the cold archive now."""
+    from datetime import datetime, timedelta
+
+    from nanobot.config.loader import load_config
+
+    config = load_config()
+    days = config.sessions.archive_after_days if idle_days is None else idle_days
+    store = _make_session_store(config)
+    count = store.archive_idle(datetime.now() - timedelta(days=days))
+    store.close()
+
+    console.print(f"[green]✓[/green] Archived {count} sessions idle for {days}+ days")
+
+
+@sessions_app.command("shard")
+def sessions_shard():
+    """Move JSONL session files into the sharded layout (one-time migration)."""
+    from nanobot.config.loader import load_config
+    from nanobot.session.jsonl_store import shard_sessions
+
+    config = load_config()
+    count = shard_sessions(Path.home() / ".nanobot" / "sessions", mode=config.sessions.persistence)
+
+    console.print(f"[green]✓[/green] Moved {count} sessions into the sharded layout")
+    if config.sessions.layout != "sharded":
+        console.print('Set "sessions": {"layout": "sharded"} in ~/.nanobot/config.json to use it')
+
+
 # ============================================================================
 # Status Commands
 # ============================================================================
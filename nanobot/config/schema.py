@@ -162,10 +162,32 @@ class AgentDefaults(BaseModel):
     temperature: float = 0.7
     max_tool_iterations: int = 20
     reasoning_effort: str | None = None  # Thinking depth for reasoning models (e.g. Gemini 3): "low", "medium", "high"
-    context_window: int = 32768  # Context window size in tokens
+    context_window: int | None = None  # Context window size in tokens (None = from the model's litellm metadata, else 32768)
     summarize_threshold: float = 0.6  # Trigger summarization when prompt_tokens reaches this fraction of context_window
     message_buffer_min: int = 10  # Minimum messages to retain after summarization
     summary_model: str | None = None  # Model for summarization (defaults to main model)
+    summary_chunk_tokens: int = 8000  # Split longer evicted history into chunks of this size, summarized in parallel and merged
+    summary_concurrency: int = 4  # Max parallel summarization requests per summary
+    summary_incremental: bool = True  # Keep chunk summaries until committed, so a retry only summarizes new chunks
+    max_concurrent_turns: int = 4  # Max turns processed in parallel across sessions (same session stays ordered)
+    max_queued_turns_per_session: int = 4  # Max turns queued behind one chat; further messages merge into its last queued turn (0 = unbounded)
+    max_queued_turns: int = 64  # Max turns queued across all chats; beyond it messages wait on the bus, where bus limits apply (0 = unbounded)
+    stream_replies: bool = False  # Stream replies by editing one message (Telegram, Slack, Discord, Feishu)
+    stream_interval_ms: int = 1000  # Minimum interval between streamed updates published by the agent
+    turn_preemption: str = "queue"  # New message while a turn runs: "queue" (wait), "cancel" (stop the running turn) or "fold" (add it to the running turn)
+    tool_result_max_tokens: int = 4000  # Max tokens of one tool result kept in the prompt; larger results keep head + tail (0 = no cap)
+    tool_result_turn_tokens: int = 16000  # Max tokens of tool results per turn across all calls (0 = no cap)
+    tool_result_limits: dict[str, int] = Field(default_factory=dict)  # Per-tool overrides of tool_result_max_tokens, e.g. {"web_fetch": 2000}
+    prompt_layout: str = "inline"  # "inline" (time/session/summary in the system prompt) or "cache" (stable system prompt + trailing runtime context, with provider cache breakpoints)
+    image_max_dimension: int = 1568  # Downscale attached images so the longest side is at most this many pixels (0 = send originals)
+    image_quality: int = 85  # JPEG quality used when re-encoding downscaled images
+    memory_inline_tokens: int = 2000  # MEMORY.md + today's notes up to this size go into the prompt whole; beyond it, memory is retrieved per message (0 = always retrieve)
+    memory_pinned_tokens: int = 500  # Top of MEMORY.md always included when memory is retrieved
+    memory_top_k: int = 5  # Memory chunks retrieved per message
+    memory_fsync_every: int = 0  # Fsync daily notes after this many appends (0 = leave flushing to the OS)
+    memory_archive_days: int = 31  # Bundle daily notes of months that ended this many days ago into memory/archive/YYYY-MM.zip (0 = never)
+    memory_facts: bool = False  # Keep long-term memory as structured facts (remember/forget/recall tools); MEMORY.md becomes a generated view
+    memory_facts_max_tokens: int = 2000  # Cap on rendered facts; least important, least recently used facts are pruned beyond it (0 = no cap)
 
 
 class AgentsConfig(BaseModel):
@@ -256,6 +278,39 @@ class ToolsConfig(BaseModel):
         return [str((root / f).resolve()) for f in self.protected_files]
 
 
+class BusConfig(BaseModel):
+    """Inbound message queue bounds and overflow handling."""
+    max_inbound: int = 1000  # Max queued inbound messages across all channels (0 = unbounded)
+    max_inbound_per_channel: int = 200  # Max queued inbound messages per channel (0 = unbounded)
+    channel_limits: dict[str, int] = Field(default_factory=dict)  # Per-channel overrides, e.g. {"mochat": 50}
+    overflow_policy: str = "drop_oldest"  # "drop_oldest", "reject" (reply busy) or "coalesce" (merge into queued message of same chat)
+    debounce_ms: int = 0  # Merge a sender's consecutive messages arriving within this quiet window into one turn (0 = off)
+    debounce_max_wait_ms: int = 5000  # Release a debounced burst at most this long after its first message
+
+
+class SessionsConfig(BaseModel):
+    """Conversation session persistence."""
+    backend: str = "jsonl"  # "jsonl" (one file per session in ~/.nanobot/sessions) or "sqlite" (one WAL-mode database)
+    db_path: str = "~/.nanobot/sessions.db"  # SQLite database used by the sqlite backend
+    persistence: str = "append"  # JSONL: "append" (write only new records per save) or "rewrite" (rewrite the whole file per save)
+    compact_after: int = 200  # JSONL: compact an appended session file in the background once it holds this many dead records
+    layout: str = "flat"  # JSONL: "flat" (sessions/<key>.jsonl) or "sharded" (sessions/ab/cd/<hash>.jsonl + manifest)
+    cache_max_sessions: int = 1000  # Max sessions kept in memory; least recently used are evicted (0 = unbounded)
+    cache_max_mb: int = 256  # Max estimated memory of cached sessions (0 = unbounded)
+    cache_idle_minutes: int = 60  # Evict cached sessions idle this long (0 = never)
+    load_tail: int = 200  # Load only this many newest messages of a session; older ones on demand (0 = all)
+    write_delay_ms: int = 50  # Save sessions in a background writer, coalescing saves within this window (0 = save inline)
+    archive_after_days: int = 30  # JSONL: compress sessions idle this long into a cold archive (0 = never)
+
+
+class TracingConfig(BaseModel):
+    """Turn-level span tracing configuration."""
+    enabled: bool = False
+    path: str = "~/.nanobot/traces/traces.jsonl"  # OTLP-shaped JSONL output, rotated by size
+    max_bytes: int = 10 * 1024 * 1024  # Rotate the trace file once it exceeds this size
+    backup_count: int = 3  # Number of rotated trace files to keep
+
+
 class Config(BaseSettings):
     """Root configuration for nanobot."""
     agents: AgentsConfig = Field(default_factory=AgentsConfig)
@@ -263,6 +318,9 @@ class Config(BaseSettings):
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    bus: BusConfig = Field(default_factory=BusConfig)
+    sessions: SessionsConfig = Field(default_factory=SessionsConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
     
     @property
     def workspace_path(self) -> Path:
@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, AsyncIterator
 
 
 @dataclass
@@ -13,12 +13,16 @@ class ToolCallRequest:
     arguments: dict[str, Any]
 
 
+# finish_reason values of a request that failed (content holds the error text, not a reply)
+ERROR_FINISH_REASONS = ("error", "context_length")
+
+
 @dataclass
 class LLMResponse:
     """Response from an LLM provider."""
     content: str | None
     tool_calls: list[ToolCallRequest] = field(default_factory=list)
-    finish_reason: str = "stop"
+    finish_reason: str = "stop"  # "error" / "context_length" when the request failed
     usage: dict[str, int] = field(default_factory=dict)
     reasoning_content: str | None = None  # Kimi, DeepSeek-R1 etc.
     raw_assistant_message: dict[str, Any] | None = None  # Preserve provider-specific fields (e.g. Gemini thought_signature)
@@ -29,6 +33,30 @@ class LLMResponse:
         return len(self.tool_calls) > 0
 
 
+@dataclass
+class ToolCallDelta:
+    """A fragment of a tool call from a streamed response."""
+    index: int
+    id: str | None = None
+    name: str | None = None
+    arguments: str = ""  # Raw JSON fragment, concatenated across deltas
+
+
+@dataclass
+class StreamDelta:
+    """
+    One incremental event from a streamed chat completion.
+    
+    The final event of every stream carries ``response``: the fully
+    assembled LLMResponse (content, tool calls, usage), identical in shape
+    to what ``chat()`` would have returned.
+    """
+    content: str | None = None
+    reasoning_content: str | None = None
+    tool_call: ToolCallDelta | None = None
+    response: LLMResponse | None = None
+
+
 class LLMProvider(ABC):
     """
     Abstract base class for LLM providers.
@@ -67,7 +95,43 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        reasoning_effort: str | None = None,
+    ) -> AsyncIterator[StreamDelta]:
+        """
+        Stream a chat completion as content and tool-call deltas.
+        
+        Takes the same arguments as ``chat()``. The default implementation
+        does not stream: it awaits ``chat()`` and yields the whole content
+        followed by the final response. Providers with native streaming
+        should override it.
+        
+        Yields:
+            StreamDelta events; the last one has ``response`` set.
+        """
+        response = await self.chat(
+            messages=messages,
+            tools=tools,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            reasoning_effort=reasoning_effort,
+        )
+        if response.content:
+            yield StreamDelta(content=response.content)
+        yield StreamDelta(response=response)
+    
     @abstractmethod
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
         pass
+    
+    def get_context_window(self, model: str | None = None) -> int | None:
+        """Max input tokens of a model, or None if unknown."""
+        return None
@@ -3,14 +3,33 @@
 import json
 import os
 import traceback
-from typing import Any
+from typing import Any, AsyncIterator
 
 import litellm
 from litellm import acompletion
 
-from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.base import (
+    LLMProvider,
+    LLMResponse,
+    StreamDelta,
+    ToolCallDelta,
+    ToolCallRequest,
+)
 from nanobot.providers.registry import find_by_model, find_gateway
 
+_EPHEMERAL = {"type": "ephemeral"}
+
+# Error text of context overflows from providers litellm doesn't map to ContextWindowExceededError
+_CONTEXT_ERROR_MARKERS = (
+    "context length",
+    "context_length_exceeded",
+    "maximum context",
+    "context window",
+    "prompt is too long",
+    "input is too long",
+    "too many tokens",
+)
+
 
 class LiteLLMProvider(LLMProvider):
     """
@@ -28,10 +47,14 @@ class LiteLLMProvider(LLMProvider):
         default_model: str = "anthropic/claude-opus-4-5",
         extra_headers: dict[str, str] | None = None,
         provider_name: str | None = None,
+        prompt_caching: bool = False,
     ):
         super().__init__(api_key, api_base)
         self.default_model = default_model
         self.extra_headers = extra_headers or {}
+        # Add cache_control breakpoints for providers that support them
+        # (pairs with the "cache" prompt layout, see ContextBuilder)
+        self.prompt_caching = prompt_caching
         
         # Detect gateway / local deployment.
         # provider_name (from config key) is the primary signal;
@@ -100,32 +123,16 @@ class LiteLLMProvider(LLMProvider):
                     kwargs.update(overrides)
                     return
     
-    async def chat(
+    def _build_kwargs(
         self,
         messages: list[dict[str, Any]],
-        tools: list[dict[str, Any]] | None = None,
-        model: str | None = None,
-        max_tokens: int = 4096,
-        temperature: float = 0.7,
-        reasoning_effort: str | None = None,
-    ) -> LLMResponse:
-        """
-        Send a chat completion request via LiteLLM.
-        
-        Args:
-            messages: List of message dicts with 'role' and 'content'.
-            tools: Optional list of tool definitions in OpenAI format.
-            model: Model identifier (e.g., 'anthropic/claude-sonnet-4-5').
-            max_tokens: Maximum tokens in response.
-            temperature: Sampling temperature.
-            reasoning_effort: Thinking depth for reasoning models ("low", "medium", "high").
-                LiteLLM maps this to provider-specific params (e.g. Gemini thinking_level).
-        
-        Returns:
-            LLMResponse with content and/or tool calls.
-        """
-        model = self._resolve_model(model or self.default_model)
-        
+        tools: list[dict[str, Any]] | None,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        reasoning_effort: str | None,
+    ) -> dict[str, Any]:
+        """Build acompletion() keyword arguments shared by chat and chat_stream."""
         kwargs: dict[str, Any] = {
             "model": model,
             "messages": messages,
@@ -155,57 +162,295 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
         
+        if self.prompt_caching and self._supports_cache_control(model):
+            kwargs["messages"] = self._add_cache_breakpoints(messages)
+            if tools:
+                kwargs["tools"] = tools[:-1] + [{**tools[-1], "cache_control": _EPHEMERAL}]
+        
+        return kwargs
+    
+    def _supports_cache_control(self, model: str) -> bool:
+        spec = self._gateway or find_by_model(model)
+        return bool(spec and spec.supports_cache_control)
+    
+    @staticmethod
+    def _add_cache_breakpoints(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Return a copy of ``messages`` with cache_control breakpoints.
+        
+        Breakpoints (with the tool definitions, the provider maximum of 4):
+        the system prompt, the end of the stored history (the last assistant
+        message followed by a user message, i.e. before this turn's runtime
+        context), and the last message, so later calls in the same turn reuse
+        everything before it.
+        """
+        marks = set()
+        if messages and messages[0].get("role") == "system":
+            marks.add(0)
+        for i in range(len(messages) - 2, 0, -1):
+            if messages[i].get("role") == "assistant" and messages[i + 1].get("role") == "user":
+                marks.add(i)
+                break
+        if messages:
+            marks.add(len(messages) - 1)
+        
+        result = list(messages)
+        for i in marks:
+            content = messages[i].get("content")
+            if isinstance(content, str) and content:
+                blocks = [{"type": "text", "text": content, "cache_control": _EPHEMERAL}]
+            elif isinstance(content, list) and content:
+                blocks = content[:-1] + [{**content[-1], "cache_control": _EPHEMERAL}]
+            else:
+                continue  # Empty text blocks are rejected; skip this breakpoint
+            result[i] = {**messages[i], "content": blocks}
+        return result
+    
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        reasoning_effort: str | None = None,
+    ) -> LLMResponse:
+        """
+        Send a chat completion request via LiteLLM.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'.
+            tools: Optional list of tool definitions in OpenAI format.
+            model: Model identifier (e.g., 'anthropic/claude-sonnet-4-5').
+            max_tokens: Maximum tokens in response.
+            temperature: Sampling temperature.
+            reasoning_effort: Thinking depth for reasoning models ("low", "medium", "high").
+                LiteLLM maps this to provider-specific params (e.g. Gemini thinking_level).
+        
+        Returns:
+            LLMResponse with content and/or tool calls.
+        """
+        model = self._resolve_model(model or self.default_model)
+        kwargs = self._build_kwargs(
+            messages, tools, model, max_tokens, temperature, reasoning_effort
+        )
+        
         try:
             response = await acompletion(**kwargs)
             return self._parse_response(response)
         except Exception as e:
-            from loguru import logger
+            return self._error_response(e, model)
+    
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        reasoning_effort: str | None = None,
+    ) -> AsyncIterator[StreamDelta]:
+        """
+        Stream a chat completion via LiteLLM.
+        
+        Content and tool-call fragments are yielded as they arrive; the final
+        delta carries the assembled LLMResponse (including usage when the
+        provider reports it).
+        """
+        model = self._resolve_model(model or self.default_model)
+        kwargs = self._build_kwargs(
+            messages, tools, model, max_tokens, temperature, reasoning_effort
+        )
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+        
+        content_parts: list[str] = []
+        reasoning_parts: list[str] = []
+        tool_parts: dict[int, dict[str, str]] = {}
+        finish_reason = "stop"
+        usage: dict[str, int] = {}
+        
+        try:
+            stream = await acompletion(**kwargs)
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = self._parse_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                delta = choice.delta
+                if delta is None:
+                    continue
+                
+                text = getattr(delta, "content", None)
+                if text:
+                    content_parts.append(text)
+                    yield StreamDelta(content=text)
+                
+                reasoning = getattr(delta, "reasoning_content", None)
+                if reasoning:
+                    reasoning_parts.append(reasoning)
+                    yield StreamDelta(reasoning_content=reasoning)
+                
+                for tc in getattr(delta, "tool_calls", None) or []:
+                    index = tc.index or 0
+                    part = tool_parts.setdefault(index, {"id": "", "name": "", "arguments": ""})
+                    name = tc.function.name if tc.function else None
+                    fragment = (tc.function.arguments if tc.function else None) or ""
+                    if tc.id:
+                        part["id"] = tc.id
+                    if name:
+                        part["name"] = name
+                    part["arguments"] += fragment
+                    yield StreamDelta(tool_call=ToolCallDelta(
+                        index=index, id=tc.id, name=name, arguments=fragment,
+                    ))
+        except Exception as e:
+            yield StreamDelta(response=self._error_response(e, model))
+            return
+        
+        yield StreamDelta(response=self._assemble_stream_response(
+            content_parts, reasoning_parts, tool_parts, finish_reason, usage,
+        ))
+    
+    def _assemble_stream_response(
+        self,
+        content_parts: list[str],
+        reasoning_parts: list[str],
+        tool_parts: dict[int, dict[str, str]],
+        finish_reason: str,
+        usage: dict[str, int],
+    ) -> LLMResponse:
+        """Build the final LLMResponse from accumulated stream fragments."""
+        content = "".join(content_parts) or None
+        reasoning_content = "".join(reasoning_parts) or None
+        
+        tool_calls = []
+        for index in sorted(tool_parts):
+            part = tool_parts[index]
+            try:
+                args = json.loads(part["arguments"]) if part["arguments"] else {}
+            except json.JSONDecodeError:
+                args = {"raw": part["arguments"]}
+            tool_calls.append(ToolCallRequest(
+                id=part["id"] or f"call_{index}",
+                name=part["name"],
+                arguments=args,
+            ))
+        
+        # Streams have no message object to model_dump(), so the raw assistant
+        # message is rebuilt here (add_raw_assistant_message expects one).
+        raw_assistant_message = None
+        if tool_calls:
+            raw_assistant_message = {
+                "role": "assistant",
+                "content": content or "",
+                "tool_calls": [
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {
+                            "name": tc.name,
+                            "arguments": tool_parts[index]["arguments"] or "{}",
+                        },
+                    }
+                    for index, tc in zip(sorted(tool_parts), tool_calls)
+                ],
+            }
+            if reasoning_content:
+                raw_assistant_message["reasoning_content"] = reasoning_content
+        
+        return LLMResponse(
+            content=content,
+            tool_calls=tool_calls,
+            finish_reason=finish_reason,
+            usage=usage,
+            reasoning_content=reasoning_content,
+            raw_assistant_message=raw_assistant_message,
+        )
+    
+    def _error_response(self, e: Exception, model: str) -> LLMResponse:
+        """Log a failed LLM call and convert it into an error LLMResponse."""
+        from loguru import logger
 
-            # Extract detailed error info from litellm exceptions
-            error_details = [f"Exception type: {type(e).__module__}.{type(e).__qualname__}"]
-            error_details.append(f"Message: {e}")
+        # Extract detailed error info from litellm exceptions
+        error_details = [f"Exception type: {type(e).__module__}.{type(e).__qualname__}"]
+        error_details.append(f"Message: {e}")
 
-            if hasattr(e, "status_code"):
-                error_details.append(f"HTTP status: {e.status_code}")
-            if hasattr(e, "llm_provider"):
-                error_details.append(f"Provider: {e.llm_provider}")
-            if hasattr(e, "model"):
-                error_details.append(f"Model: {e.model}")
+        if hasattr(e, "status_code"):
+            error_details.append(f"HTTP status: {e.status_code}")
+        if hasattr(e, "llm_provider"):
+            error_details.append(f"Provider: {e.llm_provider}")
+        if hasattr(e, "model"):
+            error_details.append(f"Model: {e.model}")
 
-            # litellm exceptions often have a .response with the raw API response body
-            response_body = None
-            if hasattr(e, "response") and e.response is not None:
-                try:
-                    if hasattr(e.response, "text"):
-                        response_body = e.response.text
-                    elif hasattr(e.response, "json"):
-                        response_body = json.dumps(e.response.json(), ensure_ascii=False)
-                    else:
-                        response_body = str(e.response)
-                except Exception:
-                    response_body = repr(e.response)
-                error_details.append(f"Response body: {response_body}")
+        # litellm exceptions often have a .response with the raw API response body
+        response_body = None
+        if hasattr(e, "response") and e.response is not None:
+            try:
+                if hasattr(e.response, "text"):
+                    response_body = e.response.text
+                elif hasattr(e.response, "json"):
+                    response_body = json.dumps(e.response.json(), ensure_ascii=False)
+                else:
+                    response_body = str(e.response)
+            except Exception:
+                response_body = repr(e.response)
+            error_details.append(f"Response body: {response_body}")
 
-            detail_str = "\n  ".join(error_details)
-            logger.error(
-                f"LLM call failed (model={model}):\n  {detail_str}\n"
-                f"  Traceback:\n{traceback.format_exc()}"
-            )
+        detail_str = "\n  ".join(error_details)
+        logger.error(
+            f"LLM call failed (model={model}):\n  {detail_str}\n"
+            f"  Traceback:\n{traceback.format_exc()}"
+        )
 
-            # Build a user-facing message that includes actionable info
-            user_message = f"Error calling LLM: {type(e).__qualname__}: {e}"
-            if hasattr(e, "status_code"):
-                user_message += f" (HTTP {e.status_code})"
-            if response_body:
-                body_preview = response_body[:500]
-                if len(response_body) > 500:
-                    body_preview += "..."
-                user_message += f"\nAPI response: {body_preview}"
+        # Build a user-facing message that includes actionable info
+        user_message = f"Error calling LLM: {type(e).__qualname__}: {e}"
+        if hasattr(e, "status_code"):
+            user_message += f" (HTTP {e.status_code})"
+        if response_body:
+            body_preview = response_body[:500]
+            if len(response_body) > 500:
+                body_preview += "..."
+            user_message += f"\nAPI response: {body_preview}"
 
-            return LLMResponse(
-                content=user_message,
-                finish_reason="error",
-            )
+        return LLMResponse(
+            content=user_message,
+            finish_reason="context_length" if self._is_context_length_error(e) else "error",
+        )
+    
+    @staticmethod
+    def _is_context_length_error(e: Exception) -> bool:
+        """Whether a failed call was rejected for exceeding the context window."""
+        if isinstance(e, litellm.ContextWindowExceededError):
+            return True
+        text = str(e).lower()
+        return any(marker in text for marker in _CONTEXT_ERROR_MARKERS)
+    
+    @staticmethod
+    def _parse_usage(usage: Any) -> dict[str, int]:
+        """
+        Convert a litellm usage object into a plain dict.
+        
+        Prompt cache activity is included when reported: ``cached_tokens``
+        (prompt tokens read from cache; OpenAI/DeepSeek ``prompt_tokens_details``
+        or Anthropic ``cache_read_input_tokens``) and ``cache_write_tokens``.
+        """
+        result = {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+        }
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or getattr(usage, "cache_read_input_tokens", None)
+        if isinstance(cached, int) and cached:
+            result["cached_tokens"] = cached
+        written = getattr(usage, "cache_creation_input_tokens", None)
+        if isinstance(written, int) and written:
+            result["cache_write_tokens"] = written
+        return result
     
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
@@ -231,11 +476,7 @@ class LiteLLMProvider(LLMProvider):
         
         usage = {}
         if hasattr(response, "usage") and response.usage:
-            usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            }
+            usage = self._parse_usage(response.usage)
         
         reasoning_content = getattr(message, "reasoning_content", None)
         
@@ -272,3 +513,16 @@ class LiteLLMProvider(LLMProvider):
     def get_default_model(self) -> str:
         """Get the default model."""
         return self.default_model
+    
+    def get_context_window(self, model: str | None = None) -> int | None:
+        """Max input tokens of a model from litellm's model metadata."""
+        model = model or self.default_model
+        for name in (self._resolve_model(model), model):
+            try:
+                info = litellm.get_model_info(name)
+            except Exception:
+                continue
+            window = info.get("max_input_tokens") or info.get("max_tokens")
+            if window:
+                return int(window)
+        return None
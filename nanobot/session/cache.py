@@ -0,0 +1,134 @@
+"""Bounded in-memory cache of loaded sessions."""
+
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from nanobot.session.manager import Session
+
+# Fixed per-message cost on top of the content (dict, role, timestamp strings)
+MESSAGE_OVERHEAD_BYTES = 200
+
+
+def estimate_session_bytes(session: "Session") -> int:
+    """Rough in-memory size of a session: content characters plus per-message overhead."""
+    size = len(session.summary)
+    for msg in session.messages:
+        content = msg.get("content")
+        size += MESSAGE_OVERHEAD_BYTES + (len(content) if isinstance(content, str) else 0)
+    return size
+
+
+class SessionCache:
+    """
+    LRU cache of sessions bounded by count, estimated bytes and idle time.
+
+    Entries idle for longer than ``idle_ttl_s`` are dropped, then the least
+    recently used entries until both ``max_sessions`` and ``max_bytes`` are
+    met. Pinned entries are never evicted: those with ``summary_in_progress``
+    and those passed to ``is_pinned`` (sessions in an active turn). Evicted
+    sessions are simply reloaded from the store on their next use, so only
+    sessions without unsaved changes may be unpinned.
+
+    Hit, miss and eviction counters are kept for sizing (see ``stats()``).
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+        idle_ttl_s: float = 3600,
+        is_pinned: Callable[[str], bool] | None = None,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_s = idle_ttl_s
+        self.is_pinned = is_pinned or (lambda key: False)
+        self._entries: OrderedDict[str, "Session"] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._last_used: dict[str, float] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> "Session | None":
+        """Look up a session, marking it as recently used."""
+        session = self._entries.get(key)
+        if session is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(key)
+        return session
+
+    def put(self, session: "Session") -> None:
+        """Insert or refresh a session (re-measuring its size), then enforce the bounds."""
+        key = session.key
+        self._entries[key] = session
+        size = estimate_session_bytes(session)
+        self.bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+        self._touch(key)
+        self.evict()
+
+    def pop(self, key: str) -> "Session | None":
+        session = self._entries.pop(key, None)
+        if session is not None:
+            self.bytes -= self._sizes.pop(key, 0)
+            self._last_used.pop(key, None)
+        return session
+
+    def _touch(self, key: str) -> None:
+        self._entries.move_to_end(key)
+        self._last_used[key] = time.monotonic()
+
+    def _pinned(self, key: str) -> bool:
+        return self._entries[key].summary_in_progress or self.is_pinned(key)
+
+    def evict(self) -> int:
+        """
+        Drop idle entries, then least recently used ones while over a bound.
+
+        Returns:
+            Number of sessions evicted.
+        """
+        evicted = 0
+        now = time.monotonic()
+        # Oldest first; stop at the first entry that is neither idle nor over a
+        # bound. The newest entry stays: its caller is about to use it.
+        for key in list(self._entries)[:-1]:
+            idle = self.idle_ttl_s > 0 and now - self._last_used[key] > self.idle_ttl_s
+            over = (
+                (self.max_sessions > 0 and len(self._entries) > self.max_sessions)
+                or (self.max_bytes > 0 and self.bytes > self.max_bytes)
+            )
+            if not (idle or over):
+                break
+            if self._pinned(key):
+                continue
+            self.pop(key)
+            evicted += 1
+        if evicted:
+            self.evictions += evicted
+            logger.debug(f"Evicted {evicted} sessions from cache: {self.stats()}")
+        return evicted
+
+    def stats(self) -> dict[str, Any]:
+        """Counters and current size, for sizing the cache."""
+        return {
+            "sessions": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
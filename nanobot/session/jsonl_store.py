@@ -0,0 +1,572 @@
+"""JSONL session store: one file per session in a directory."""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+from loguru import logger
+
+from nanobot.session.manager import Session
+from nanobot.session.manifest import SessionManifest
+from nanobot.session.store import (
+    SessionStore,
+    metadata_record,
+    same_metadata,
+    session_delta,
+    session_from_record,
+)
+from nanobot.tracing import get_tracer
+from nanobot.utils.helpers import ensure_dir, safe_filename
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Metadata records are written by metadata_record(), whose first key is "_type"
+_METADATA_PREFIX = b'{"_type": "metadata"'
+# Bytes read per step when scanning a file backwards
+_REVERSE_BLOCK = 64 * 1024
+# Archived sessions sit next to where their live file would be
+ARCHIVE_SUFFIX = ".archive"
+
+
+def _reverse_lines(path: Path) -> Iterator[bytes]:
+    """Yield the lines of a file from last to first, reading it in blocks from the end."""
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        partial = b""
+        while position > 0:
+            step = min(_REVERSE_BLOCK, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + partial).split(b"\n")
+            partial = lines.pop(0)
+            yield from reversed(lines)
+        yield partial
+
+
+def _compress(data: bytes) -> tuple[str, bytes]:
+    """Compress with zstd if installed, else gzip. Returns (codec, compressed)."""
+    if ZSTD_AVAILABLE:
+        return "zstd", zstandard.ZstdCompressor(level=19).compress(data)
+    return "gzip", gzip.compress(data, compresslevel=9)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Session archive is zstd-compressed; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class JsonlSessionStore(SessionStore):
+    """
+    Stores each session as a JSONL file: a metadata record followed by one
+    record per message.
+
+    In ``"rewrite"`` mode every save rewrites the whole file. In ``"append"``
+    mode a save only appends what changed since the last one: new messages,
+    a ``trim`` record when messages were dropped from the front (summary
+    eviction, /reset; ``keep`` is how many of the messages before it
+    survive) and a new metadata record when metadata or the summary
+    changed. Replay applies them in order, last metadata record winning.
+    ``load(key, tail=N)`` replays from the end of the file instead, parsing
+    only the newest N messages and the latest metadata record. Once
+    more than ``compact_after`` records are dead, the file is compacted in a
+    background thread (rewritten to a temp file and atomically renamed).
+
+    The ``"flat"`` layout names files after the key (``telegram_123.jsonl``).
+    The ``"sharded"`` layout names them after the SHA-256 of the key, two
+    directory levels deep (``ab/cd/abcd….jsonl``), so no directory grows
+    huge and distinct keys never share a file; a ``SessionManifest`` in
+    ``manifest.jsonl`` answers ``keys()`` and ``list_sessions()`` without
+    opening session files. ``shard_sessions()`` moves a flat directory over.
+
+    Sessions idle for long are moved to a cold tier by ``archive_idle()``:
+    the file is compacted and compressed (zstd if installed, else gzip) into
+    ``<name>.jsonl.archive``, behind a one-line JSON header holding the
+    metadata, summary and the newest ``archive_tail`` messages. Tail loads
+    are served from the header alone; the first save restores the live file.
+    """
+
+    MODES = ("append", "rewrite")
+    LAYOUTS = ("flat", "sharded")
+
+    def __init__(
+        self,
+        sessions_dir: Path,
+        mode: str = "append",
+        compact_after: int = 200,
+        layout: str = "flat",
+        archive_tail: int = 50,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown session persistence mode {mode!r}, expected one of {self.MODES}")
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown session layout {layout!r}, expected one of {self.LAYOUTS}")
+        self.sessions_dir = ensure_dir(sessions_dir)
+        self.mode = mode
+        self.compact_after = compact_after
+        self.layout = layout
+        self.archive_tail = archive_tail
+        self.manifest = SessionManifest(self.sessions_dir / "manifest.jsonl") if layout == "sharded" else None
+        self._file_locks: dict[str, threading.Lock] = {}
+        self._compactions: dict[str, threading.Thread] = {}
+
+    def _get_session_path(self, key: str) -> Path:
+        """Get the file path for a session."""
+        if self.layout == "sharded":
+            digest = hashlib.sha256(key.encode()).hexdigest()
+            return self.sessions_dir / digest[:2] / digest[2:4] / f"{digest}.jsonl"
+        safe_key = safe_filename(key.replace(":", "_"))
+        return self.sessions_dir / f"{safe_key}.jsonl"
+
+    def load(self, key: str, tail: int | None = None) -> Session | None:
+        """Load a session from disk, replaying append-mode control records."""
+        return self._load_path(key, self._get_session_path(key), tail)
+
+    def _archive_path(self, path: Path) -> Path:
+        return path.with_name(path.name + ARCHIVE_SUFFIX)
+
+    def _load_path(self, key: str, path: Path, tail: int | None = None) -> Session | None:
+        archive = self._archive_path(path)
+        if not path.exists() and not archive.exists():
+            return None
+
+        try:
+            replayed = None
+            if not path.exists():
+                # Rewrite-mode saves need every message, as for live files below
+                replayed = self._replay_archive(archive, tail if self.mode == "append" else None)
+            elif tail is not None and self.mode == "append":
+                replayed = self._replay_tail(path, tail)
+            if replayed is None:
+                replayed = self._replay(path)
+        except Exception as e:
+            logger.warning(f"Failed to load session {key}: {e}")
+            return None
+
+        header, messages, dead, complete = replayed
+        session = session_from_record(key, messages, header.get("created_at"), header.get("metadata") or {})
+        session._dead = dead
+        session._complete = complete
+        return session
+
+    def _replay(
+        self, path: Path, end: int | None = None
+    ) -> tuple[dict[str, Any], list[dict[str, Any]], int, bool]:
+        """
+        Replay a session file from the start (up to byte ``end``).
+
+        Returns:
+            (last metadata record, live messages, dead record count, True).
+        """
+        with open(path, "rb") as f:
+            data = f.read() if end is None else f.read(end)
+        return self._replay_data(data, path.name)
+
+    def _replay_data(
+        self, data: bytes, name: str
+    ) -> tuple[dict[str, Any], list[dict[str, Any]], int, bool]:
+        messages: list[dict[str, Any]] = []
+        header: dict[str, Any] = {}
+        meta_records = 0
+        dead = 0
+
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-append can leave a torn last record
+                logger.warning(f"Skipping unreadable record in {name}")
+                dead += 1
+                continue
+            record_type = record.get("_type")
+
+            if record_type == "metadata":
+                header = record
+                meta_records += 1
+            elif record_type == "trim":
+                before = len(messages)
+                if "keep" in record:
+                    messages = messages[len(messages) - record["keep"]:] if record["keep"] else []
+                else:
+                    messages = messages[record.get("count", 0):]
+                dead += before - len(messages) + 1
+            else:
+                messages.append(record)
+
+        return header, messages, dead + max(meta_records - 1, 0), True
+
+    def _replay_tail(
+        self, path: Path, tail: int
+    ) -> tuple[dict[str, Any], list[dict[str, Any]], int, bool] | None:
+        """
+        Read only the newest ``tail`` live messages, scanning from the end.
+
+        Trim records say how many messages before them survive (``keep``),
+        so walking backwards the number of older live messages only ever
+        shrinks. Message lines beyond the tail are skipped unparsed, as are
+        all lines once the latest metadata record has been found.
+
+        Returns:
+            Same as ``_replay`` (the dead count covers only what was
+            scanned), or None if the file has records this cannot replay.
+        """
+        newest_first: list[dict[str, Any]] = []
+        header: dict[str, Any] | None = None
+        allowed: int | None = None  # live messages left before the last trim seen
+        dead = 0
+        done = tail <= 0
+
+        for line in _reverse_lines(path):
+            if not line.strip():
+                continue
+            if line.startswith(_METADATA_PREFIX):
+                if header is None:
+                    header = json.loads(line)
+                else:
+                    dead += 1
+                if done:
+                    break
+                continue
+            if done:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                dead += 1
+                continue
+            if record.get("_type") == "trim":
+                if "keep" not in record:
+                    return None  # legacy relative trim: needs a forward replay
+                allowed = record["keep"] if allowed is None else min(allowed, record["keep"])
+                dead += 1
+            elif allowed == 0:
+                dead += 1
+            else:
+                newest_first.append(record)
+                if allowed is not None:
+                    allowed -= 1
+            done = len(newest_first) >= tail or allowed == 0
+
+        if header is None:
+            return None
+        # Complete unless we stopped at the tail limit with older messages possibly left
+        complete = not (len(newest_first) >= tail and allowed != 0)
+        return header, newest_first[::-1], dead, complete
+
+    def _read_archive(self, archive: Path, body: bool = False) -> tuple[dict[str, Any], bytes]:
+        """Read an archive's header, and its decompressed body if asked."""
+        with open(archive, "rb") as f:
+            header = json.loads(f.readline())
+            data = _decompress(header["codec"], f.read()) if body else b""
+        return header, data
+
+    def _replay_archive(
+        self, archive: Path, tail: int | None
+    ) -> tuple[dict[str, Any], list[dict[str, Any]], int, bool]:
+        header, _ = self._read_archive(archive)
+        kept = header["tail"]
+        if tail is not None and (tail <= len(kept) or len(kept) == header["messages"]):
+            messages = kept[len(kept) - tail:] if tail else []
+            return header, messages, 0, len(messages) == header["messages"]
+        _, data = self._read_archive(archive, body=True)
+        return self._replay_data(data, archive.name)
+
+    def archive(self, key: str) -> bool:
+        """Move a session to the cold tier. Returns False if it has no live file."""
+        path = self._get_session_path(key)
+        archive = self._archive_path(path)
+        with self._lock_for(key):
+            if not path.exists():
+                return False
+            mtime = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+            header, messages, _, _ = self._replay(path)
+            body = "".join(json.dumps(record) + "\n" for record in [header, *messages])
+            codec, compressed = _compress(body.encode())
+            archive_header = {
+                "_type": "archive",
+                "codec": codec,
+                "key": header.get("key") or key,
+                "created_at": header.get("created_at"),
+                "updated_at": max(header.get("updated_at") or "", mtime),
+                "metadata": header.get("metadata") or {},
+                "messages": len(messages),
+                "tail": messages[len(messages) - self.archive_tail:] if self.archive_tail else [],
+            }
+            tmp = archive.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(json.dumps(archive_header).encode() + b"\n")
+                f.write(compressed)
+            os.replace(tmp, archive)
+            path.unlink()
+            if self.manifest is not None and (entry := self.manifest.get(key)) is not None:
+                self.manifest.put({**entry, "archived": True})
+        logger.debug(f"Archived session {key} ({len(messages)} messages, {codec})")
+        return True
+
+    def archive_idle(self, cutoff: datetime) -> int:
+        archived = 0
+        for info in self.list_sessions():
+            if info.get("archived") or (info.get("updated_at") or "") >= cutoff.isoformat():
+                continue
+            try:
+                archived += self.archive(info["key"])
+            except Exception as e:
+                logger.warning(f"Failed to archive session {info['key']}: {e}")
+        return archived
+
+    def _restore(self, key: str, path: Path) -> None:
+        """Bring an archived session back to a live file (caller holds the lock)."""
+        archive = self._archive_path(path)
+        _, data = self._read_archive(archive, body=True)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".jsonl.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        archive.unlink()
+        logger.debug(f"Restored archived session {key}")
+
+    def save(self, session: Session) -> int:
+        path = self._get_session_path(session.key)
+
+        with self._lock_for(session.key):
+            if not path.exists() and self._archive_path(path).exists():
+                self._restore(session.key, path)
+            delta = None
+            if self.mode == "append" and session._synced_meta and path.exists():
+                delta = session_delta(session)
+            if delta is None:
+                self.complete(session)
+                self._rewrite(path, session)
+                session._synced_meta = metadata_record(session)
+                session._dead = 0
+                written = 1 + len(session.messages)
+                count = len(session.messages)
+            else:
+                trimmed, new_messages = delta
+                if self.manifest is not None:
+                    # A tail-loaded session may not hold all of its messages
+                    entry = self.manifest.get(session.key)
+                    if trimmed or entry is None:
+                        count = len(session.messages)
+                    else:
+                        count = entry["messages"] + len(new_messages)
+                meta = metadata_record(session)
+                records = []
+                if trimmed:
+                    kept = len(session.messages) - len(new_messages)
+                    records.append(json.dumps({"_type": "trim", "keep": kept}))
+                    session._dead += trimmed + 1
+                    session._complete = True  # anything not loaded was older still
+                if not same_metadata(meta, session._synced_meta):
+                    records.append(meta)
+                    session._synced_meta = meta
+                    session._dead += 1
+                records.extend(json.dumps(msg) for msg in new_messages)
+                if records:
+                    with open(path, "a") as f:
+                        f.write("\n".join(records) + "\n")
+                written = len(records)
+            session._synced = list(session.messages)
+            if self.manifest is not None:
+                self.manifest.put({
+                    "key": session.key,
+                    "path": path.relative_to(self.sessions_dir).as_posix(),
+                    "created_at": session.created_at.isoformat(),
+                    "updated_at": session.updated_at.isoformat(),
+                    "messages": count,
+                })
+
+        if self.mode == "append" and session._dead > self.compact_after:
+            self._schedule_compaction(session)
+        return written
+
+    def compact(self, session: Session) -> None:
+        """
+        Rewrite a session file without dead records.
+
+        Safe to run in a thread while saves continue: the file is replayed
+        up to its size at the start (including messages a tail-loaded
+        session never read), written to a temp file, and records appended
+        meanwhile are copied over under the file lock before the rename.
+        If the file was replaced in the meantime (a full rewrite, archiving
+        or a restore) or shrank, the compaction is abandoned; the open
+        handle keeps the old inode allocated, so a new file cannot reuse it.
+        """
+        path = self._get_session_path(session.key)
+        tmp = path.with_suffix(".jsonl.compact")
+        with self._lock_for(session.key):
+            if not path.exists():
+                return
+            pinned = open(path, "rb")
+            start = os.fstat(pinned.fileno())
+            offset = start.st_size
+            dead = session._dead
+
+        with pinned, get_tracer().span("session.compact", session=session.key, dead_records=dead):
+            header, messages, _, _ = self._replay(path, end=offset)
+            with open(tmp, "w") as f:
+                f.write(json.dumps(header) + "\n")
+                for msg in messages:
+                    f.write(json.dumps(msg) + "\n")
+            with self._lock_for(session.key):
+                try:
+                    current = path.stat()
+                except FileNotFoundError:
+                    current = None
+                if (
+                    current is None
+                    or (current.st_ino, current.st_dev) != (start.st_ino, start.st_dev)
+                    or current.st_size < offset
+                ):
+                    tmp.unlink(missing_ok=True)
+                    logger.debug(f"Session {session.key} was replaced during compaction; skipped")
+                    return
+                with open(path) as src, open(tmp, "a") as dst:
+                    src.seek(offset)
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.replace(tmp, path)
+                session._dead = max(session._dead - dead, 0)
+        logger.debug(f"Compacted session {session.key} ({dead} dead records)")
+
+    def _schedule_compaction(self, session: Session) -> None:
+        running = self._compactions.get(session.key)
+        if running is not None and running.is_alive():
+            return
+
+        def run() -> None:
+            try:
+                self.compact(session)
+            except Exception as e:
+                logger.warning(f"Failed to compact session {session.key}: {e}")
+
+        thread = threading.Thread(target=run, name=f"compact-{session.key}", daemon=True)
+        self._compactions[session.key] = thread
+        thread.start()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._file_locks.setdefault(key, threading.Lock())
+
+    def _rewrite(self, path: Path, session: Session) -> None:
+        """Write the whole session to a temp file and rename it into place."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".jsonl.tmp")
+        with open(tmp, "w") as f:
+            # Write metadata first, then messages
+            f.write(metadata_record(session) + "\n")
+            for msg in session.messages:
+                f.write(json.dumps(msg) + "\n")
+        os.replace(tmp, path)
+
+    def delete(self, key: str) -> bool:
+        path = self._get_session_path(key)
+        archive = self._archive_path(path)
+        with self._lock_for(key):
+            if self.manifest is not None:
+                self.manifest.remove(key)
+            found = False
+            for p in (path, archive):
+                if p.exists():
+                    p.unlink()
+                    found = True
+        return found
+
+    def _read_header(self, path: Path) -> dict[str, Any] | None:
+        """Read the first (metadata or archive header) record of a session file."""
+        try:
+            with open(path, "rb") as f:
+                first_line = f.readline().strip()
+            data = json.loads(first_line) if first_line else None
+        except Exception:
+            return None
+        return data if data and data.get("_type") in ("metadata", "archive") else None
+
+    def _flat_sessions(self) -> Iterator[tuple[Path, str, dict[str, Any]]]:
+        """Live and archived session files of the flat layout: (live path, key, header)."""
+        for path in self.sessions_dir.glob(f"*.jsonl{ARCHIVE_SUFFIX}"):
+            live = path.with_name(path.name[:-len(ARCHIVE_SUFFIX)])
+            header = self._read_header(path)
+            # A live file next to an archive is the newer copy (interrupted restore)
+            if header is not None and not live.exists():
+                yield live, header.get("key") or live.stem.replace("_", ":"), header
+        for path in self.sessions_dir.glob("*.jsonl"):
+            header = self._read_header(path)
+            if header is not None:
+                # Files written before keys were recorded: best-effort from the name
+                yield path, header.get("key") or path.stem.replace("_", ":"), header
+
+    def keys(self) -> Iterator[str]:
+        if self.manifest is not None:
+            yield from (entry["key"] for entry in self.manifest.entries())
+            return
+        for _, key, _ in self._flat_sessions():
+            yield key
+
+    def list_sessions(self, channel: str | None = None, limit: int | None = None) -> list[dict[str, Any]]:
+        if self.manifest is not None:
+            sessions = [
+                {**entry, "path": str(self.sessions_dir / entry["path"])}
+                for entry in self.manifest.entries()
+                if not channel or entry["key"].split(":", 1)[0] == channel
+            ]
+            sessions.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+            return sessions[:limit] if limit else sessions
+
+        sessions = []
+        for path, key, data in self._flat_sessions():
+            if channel and key.split(":", 1)[0] != channel:
+                continue
+            info = {"key": key, "created_at": data.get("created_at"), "path": str(path)}
+            if data["_type"] == "archive":
+                info.update(updated_at=data.get("updated_at") or "", messages=data["messages"], archived=True)
+            else:
+                # Appended saves leave the first record's updated_at stale
+                mtime = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+                info["updated_at"] = max(data.get("updated_at") or "", mtime)
+            sessions.append(info)
+
+        sessions.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+        return sessions[:limit] if limit else sessions
+
+
+def shard_sessions(sessions_dir: Path, mode: str = "append") -> int:
+    """
+    Move the session files of a flat directory into the sharded layout.
+
+    Each file is replayed and written out afresh (compacted) under its
+    hashed path, recorded in the manifest, then removed; archived sessions
+    come back live. Safe to re-run after an interruption: files already
+    moved are gone from the top level.
+
+    Returns:
+        Number of sessions moved.
+    """
+    flat = JsonlSessionStore(sessions_dir, mode=mode)
+    sharded = JsonlSessionStore(sessions_dir, mode=mode, layout="sharded")
+    moved = 0
+    for path, key, _ in list(flat._flat_sessions()):
+        session = flat._load_path(key, path)
+        if session is None:
+            continue
+        # Written in full: the sharded store has never seen this session
+        session._synced, session._synced_meta = [], ""
+        sharded.save(session)
+        path.unlink(missing_ok=True)
+        flat._archive_path(path).unlink(missing_ok=True)
+        moved += 1
+    return moved
@@ -1,14 +1,34 @@
 """Session management for conversation history."""
 
-import json
+import asyncio
+from contextlib import contextmanager
 from pathlib import Path
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Iterator
 
 from loguru import logger
 
-from nanobot.utils.helpers import ensure_dir, safe_filename
+from nanobot.session.cache import SessionCache
+from nanobot.session.writer import SessionWriter
+from nanobot.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from nanobot.session.store import SessionStore
+
+
+def number_legacy(messages: list[dict[str, Any]], before: int = 1) -> None:
+    """
+    Give messages without a ``seq`` one below the next message's (in place).
+    
+    Args:
+        before: seq of the message that follows the list.
+    """
+    upper = before
+    for msg in reversed(messages):
+        if "seq" not in msg:
+            msg["seq"] = min(upper, 1) - 1
+        upper = msg["seq"]
 
 
 @dataclass
@@ -16,7 +36,14 @@ class Session:
     """
     A conversation session.
     
-    Stores messages in JSONL format for easy reading and persistence.
+    Persisted by a ``SessionStore`` (JSONL files by default).
+    
+    Every message gets a ``seq`` number, increasing within the session.
+    The summary covers messages up to ``summary_upto``; ``commit_summary()``
+    drops exactly those, so messages added while a summary was being
+    written are never lost. Messages loaded without a seq (written before
+    seq numbers existed) are numbered in memory below the first numbered
+    one, counting down from 0.
     """
     
     key: str  # channel:chat_id
@@ -25,31 +52,70 @@ class Session:
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: dict[str, Any] = field(default_factory=dict)
     summary: str = ""  # Conversation summary from previous context evictions
+    summary_upto: int = 0  # seq of the last message the summary covers
     summary_in_progress: bool = False  # True while background summarization is running (not persisted)
     
+    # Store bookkeeping for incremental saves (not persisted, see SessionStore)
+    _synced: list[dict[str, Any]] = field(default_factory=list, repr=False)  # messages as last written
+    _synced_meta: str = field(default="", repr=False)  # metadata record as last written
+    _dead: int = field(default=0, repr=False)  # JSONL: records in the file that replay discards
+    _first_seq: int = field(default=0, repr=False)  # SQLite: seq of the first synced message
+    _complete: bool = field(default=True, repr=False)  # False if older messages were not loaded
+    _next_seq: int = field(default=1, repr=False)  # seq of the next message added
+    
+    def __post_init__(self) -> None:
+        number_legacy(self.messages)
+        # Seqs increase along the list, so the last message has the highest
+        last = self.messages[-1]["seq"] if self.messages else 0
+        self._next_seq = max(last, self.summary_upto) + 1
+    
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
         """Add a message to the session."""
         msg = {
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat(),
+            "seq": self._next_seq,
             **kwargs
         }
+        self._next_seq += 1
         self.messages.append(msg)
         self.updated_at = datetime.now()
     
-    def get_history(self, max_messages: int = 50) -> list[dict[str, Any]]:
+    def commit_summary(self, summary: str, upto: int) -> int:
+        """
+        Install a summary covering messages up to seq ``upto`` and drop them.
+        
+        Messages after ``upto`` stay, however many turns added them while
+        the summary was being written.
+        
+        Returns:
+            Number of messages dropped.
+        """
+        kept = [m for m in self.messages if m.get("seq", 0) > upto]
+        dropped = len(self.messages) - len(kept)
+        self.summary = summary
+        self.summary_upto = max(self.summary_upto, upto)
+        self.messages = kept
+        self.updated_at = datetime.now()
+        return dropped
+    
+    def get_history(self, max_messages: int | None = 50) -> list[dict[str, Any]]:
         """
         Get message history for LLM context.
         
         Args:
-            max_messages: Maximum messages to return.
+            max_messages: Maximum messages to return (None for all, e.g. when
+                the caller packs history into a token budget).
         
         Returns:
             List of messages in LLM format.
         """
         # Get recent messages
-        recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
+        if max_messages is not None and len(self.messages) > max_messages:
+            recent = self.messages[-max_messages:]
+        else:
+            recent = self.messages
         
         # Convert to LLM format (just role and content)
         return [{"role": m["role"], "content": m["content"]} for m in recent]
@@ -64,18 +130,69 @@ class SessionManager:
     """
     Manages conversation sessions.
     
-    Sessions are stored as JSONL files in the sessions directory.
+    Keeps recently used sessions in a bounded ``SessionCache`` and persists
+    them through a ``SessionStore``: JSONL files in ``~/.nanobot/sessions``
+    by default, or a ``SqliteSessionStore``. Sessions in use by a turn are
+    pinned in the cache with ``pinned()``. With ``load_tail`` set, sessions
+    are loaded with only their newest messages; ``load_full()`` brings in
+    the rest when a caller needs the whole history.
+    
+    With ``write_delay_s`` > 0, ``save()`` called from the event loop hands
+    the session to a ``SessionWriter`` instead of writing it, and
+    ``get_or_create_async()`` loads in a worker thread, so turns never wait
+    on the disk. Sessions with unwritten changes stay cached; ``flush()``
+    writes them out (call it before exiting).
+    
+    ``archive_idle()`` moves sessions idle for ``archive_after_days`` to the
+    store's cold tier; they reload transparently on their next use.
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        store: "SessionStore | None" = None,
+        cache_max_sessions: int = 1000,
+        cache_max_bytes: int = 256 * 1024 * 1024,
+        cache_idle_ttl_s: float = 3600,
+        load_tail: int = 0,
+        write_delay_s: float = 0,
+        archive_after_days: float = 0,
+    ):
         self.workspace = workspace
-        self.sessions_dir = ensure_dir(Path.home() / ".nanobot" / "sessions")
-        self._cache: dict[str, Session] = {}
+        self.load_tail = load_tail
+        self.archive_after_days = archive_after_days
+        if store is None:
+            from nanobot.session.jsonl_store import JsonlSessionStore
+            store = JsonlSessionStore(Path.home() / ".nanobot" / "sessions")
+        self.store = store
+        self._pins: dict[str, int] = {}
+        self._writer = SessionWriter(self._write, window_s=write_delay_s) if write_delay_s > 0 else None
+        self._loading: dict[str, asyncio.Future] = {}
+        self._cache = SessionCache(
+            max_sessions=cache_max_sessions,
+            max_bytes=cache_max_bytes,
+            idle_ttl_s=cache_idle_ttl_s,
+            is_pinned=self._is_pinned,
+        )
+    
+    @contextmanager
+    def pinned(self, key: str) -> Iterator[None]:
+        """Keep a session in the cache while it is in use (e.g. during a turn)."""
+        self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            self._pins[key] -= 1
+            if not self._pins[key]:
+                del self._pins[key]
+    
+    def _is_pinned(self, key: str) -> bool:
+        # Evicting a session with unwritten changes would lose them on reload
+        return key in self._pins or (self._writer is not None and self._writer.is_pending(key))
     
-    def _get_session_path(self, key: str) -> Path:
-        """Get the file path for a session."""
-        safe_key = safe_filename(key.replace(":", "_"))
-        return self.sessions_dir / f"{safe_key}.jsonl"
+    def cache_stats(self) -> dict[str, Any]:
+        """Session cache counters: sessions, bytes, hits, misses, evictions."""
+        return self._cache.stats()
     
     def get_or_create(self, key: str) -> Session:
         """
@@ -88,78 +205,78 @@ class SessionManager:
             The session.
         """
         # Check cache
-        if key in self._cache:
-            return self._cache[key]
+        session = self._cache.get(key)
+        if session is not None:
+            return session
         
         # Try to load from disk
-        session = self._load(key)
+        session = self.store.load(key, tail=self.load_tail or None)
         if session is None:
             session = Session(key=key)
         
-        self._cache[key] = session
+        self._cache.put(session)
         return session
     
-    def _load(self, key: str) -> Session | None:
-        """Load a session from disk."""
-        path = self._get_session_path(key)
-        
-        if not path.exists():
-            return None
+    async def get_or_create_async(self, key: str) -> Session:
+        """Like ``get_or_create()``, but loads from the store in a worker thread."""
+        session = self._cache.get(key)
+        if session is not None:
+            return session
         
-        try:
-            messages = []
-            metadata = {}
-            created_at = None
-            
-            with open(path) as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    data = json.loads(line)
-                    
-                    if data.get("_type") == "metadata":
-                        metadata = data.get("metadata", {})
-                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
-                    else:
-                        messages.append(data)
-            
-            summary = metadata.pop("summary", "")
-            
-            return Session(
-                key=key,
-                messages=messages,
-                created_at=created_at or datetime.now(),
-                metadata=metadata,
-                summary=summary,
+        # Concurrent callers share one load
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(
+                asyncio.to_thread(self.store.load, key, self.load_tail or None)
             )
-        except Exception as e:
-            logger.warning(f"Failed to load session {key}: {e}")
-            return None
+            self._loading[key] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(key, None))
+        loaded = await asyncio.shield(loading)
+        
+        # Someone may have created it while we were loading
+        session = self._cache.get(key)
+        if session is None:
+            session = loaded or Session(key=key)
+            self._cache.put(session)
+        return session
+    
+    async def load_full(self, session: Session) -> None:
+        """Load the older messages of a tail-loaded session (no-op if complete)."""
+        if session._complete:
+            return
+        with get_tracer().span("session.load_full", session=session.key, loaded=len(session.messages)):
+            older = await asyncio.to_thread(self.store.load_older, session)
+            self.store.complete(session, older)
+        self._cache.put(session)
     
     def save(self, session: Session) -> None:
-        """Save a session to disk."""
-        path = self._get_session_path(session.key)
-        
-        with open(path, "w") as f:
-            # Write metadata first (include summary for persistence)
-            persisted_metadata = dict(session.metadata)
-            if session.summary:
-                persisted_metadata["summary"] = session.summary
-            metadata_line = {
-                "_type": "metadata",
-                "created_at": session.created_at.isoformat(),
-                "updated_at": session.updated_at.isoformat(),
-                "metadata": persisted_metadata,
-            }
-            f.write(json.dumps(metadata_line) + "\n")
-            
-            # Write messages
-            for msg in session.messages:
-                f.write(json.dumps(msg) + "\n")
-        
-        self._cache[session.key] = session
+        """Save a session (in the background when called on the event loop with a writer)."""
+        self._cache.put(session)
+        if self._writer is None or not self._writer.schedule(session):
+            self._write(session)
+    
+    def _write(self, session: Session) -> int:
+        with get_tracer().span("session.save", session=session.key, messages=len(session.messages)) as span:
+            records = self.store.save(session)
+            span.set_attribute("records", records)
+        return records
+    
+    async def archive_idle(self) -> int:
+        """Archive sessions idle for ``archive_after_days`` (in a worker thread)."""
+        if self.archive_after_days <= 0:
+            return 0
+        cutoff = datetime.now() - timedelta(days=self.archive_after_days)
+        with get_tracer().span("session.archive_idle") as span:
+            archived = await asyncio.to_thread(self.store.archive_idle, cutoff)
+            span.set_attribute("archived", archived)
+        if archived:
+            logger.info(f"Archived {archived} idle sessions")
+        return archived
+    
+    async def flush(self) -> None:
+        """Write out all saves still waiting in the background writer."""
+        if self._writer is not None:
+            await self._writer.flush()
     
     def delete(self, key: str) -> bool:
         """
@@ -172,39 +289,18 @@ class SessionManager:
             True if deleted, False if not found.
         """
         # Remove from cache
-        self._cache.pop(key, None)
-        
-        # Remove file
-        path = self._get_session_path(key)
-        if path.exists():
-            path.unlink()
-            return True
-        return False
-    
-    def list_sessions(self) -> list[dict[str, Any]]:
+        self._cache.pop(key)
+        return self.store.delete(key)
+    
+    def list_sessions(self, channel: str | None = None, limit: int | None = None) -> list[dict[str, Any]]:
         """
         List all sessions.
         
+        Args:
+            channel: Only sessions of this channel.
+            limit: Maximum number of sessions to return.
+        
         Returns:
-            List of session info dicts.
+            List of session info dicts, most recently updated first.
         """
-        sessions = []
-        
-        for path in self.sessions_dir.glob("*.jsonl"):
-            try:
-                # Read just the metadata line
-                with open(path) as f:
-                    first_line = f.readline().strip()
-                    if first_line:
-                        data = json.loads(first_line)
-                        if data.get("_type") == "metadata":
-                            sessions.append({
-                                "key": path.stem.replace("_", ":"),
-                                "created_at": data.get("created_at"),
-                                "updated_at": data.get("updated_at"),
-                                "path": str(path)
-                            })
-            except Exception:
-                continue
-        
-        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+        return self.store.list_sessions(channel=channel, limit=limit)
@@ -0,0 +1,87 @@
+"""Manifest index of a sharded JSONL session directory."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+
+class SessionManifest:
+    """
+    Index of the sessions in a sharded directory, kept in one JSONL file.
+
+    Each line is the latest entry for a key (``key``, ``path`` relative to
+    the directory, ``created_at``, ``updated_at``, ``messages``) or a
+    ``{"key": ..., "deleted": true}`` tombstone; the last line for a key
+    wins. Updates are appended, so a save costs one short write. The whole
+    file is read once, on first use, and rewritten without superseded lines
+    once they outnumber the live entries (``compact_ratio``).
+    """
+
+    def __init__(self, path: Path, compact_ratio: int = 4):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self._entries: dict[str, dict[str, Any]] | None = None
+        self._lines = 0
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is not None:
+            return self._entries
+        entries: dict[str, dict[str, Any]] = {}
+        lines = 0
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping unreadable record in {self.path.name}")
+                        continue
+                    if entry.get("deleted"):
+                        entries.pop(entry["key"], None)
+                    else:
+                        entries[entry["key"]] = entry
+        self._entries, self._lines = entries, lines
+        return entries
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._load().get(key)
+
+    def entries(self) -> list[dict[str, Any]]:
+        """All live entries (copies), in no particular order."""
+        with self._lock:
+            return [dict(entry) for entry in self._load().values()]
+
+    def put(self, entry: dict[str, Any]) -> None:
+        """Record the latest state of a session (``entry["key"]``)."""
+        with self._lock:
+            self._load()[entry["key"]] = entry
+            self._append(entry)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._append({"key": key, "deleted": True})
+
+    def _append(self, record: dict[str, Any]) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        self._lines += 1
+        if self._lines > self.compact_ratio * max(len(self._entries), 1):
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        tmp = self.path.with_suffix(".jsonl.tmp")
+        with open(tmp, "w") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self.path)
+        self._lines = len(self._entries)
@@ -0,0 +1,208 @@
+"""SQLite session store: all sessions in one WAL-mode database."""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+from loguru import logger
+
+from nanobot.session.manager import Session, number_legacy
+from nanobot.session.store import (
+    SessionStore,
+    metadata_record,
+    same_metadata,
+    session_delta,
+    session_from_record,
+)
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Stores sessions in SQLite, for deployments with many chats.
+
+    Each message is a row keyed by ``(session_key, seq)``; ``seq`` only ever
+    grows, so saves insert new rows and trimming deletes rows below the new
+    first ``seq``. Keys are stored verbatim (no filename mangling), and
+    ``sessions`` is indexed on ``updated_at`` and ``(channel, updated_at)``
+    so listing never touches message rows; a ``tail`` load reads the newest
+    rows backwards along the primary key. The database runs in WAL mode,
+    so readers are not blocked by the writer.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                key TEXT PRIMARY KEY,
+                channel TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                next_seq INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at);
+            CREATE INDEX IF NOT EXISTS sessions_channel ON sessions (channel, updated_at);
+            CREATE TABLE IF NOT EXISTS messages (
+                session_key TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (session_key, seq)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def load(self, key: str, tail: int | None = None) -> Session | None:
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT created_at, metadata, next_seq FROM sessions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                created_at, metadata_json, next_seq = row
+                # Iterate the cursor instead of fetchall(): rows are decoded one at a time
+                messages, first_seq = [], next_seq
+                if tail is None:
+                    cursor = self._db.execute(
+                        "SELECT seq, data FROM messages WHERE session_key = ? ORDER BY seq", (key,)
+                    )
+                else:
+                    # Newest first via the primary key, flipped back below
+                    cursor = self._db.execute(
+                        "SELECT seq, data FROM messages WHERE session_key = ? ORDER BY seq DESC LIMIT ?",
+                        (key, tail),
+                    )
+                for seq, data in cursor:
+                    first_seq = min(first_seq, seq)
+                    messages.append(json.loads(data))
+                if tail is not None:
+                    messages.reverse()
+                    complete = len(messages) < tail or self._db.execute(
+                        "SELECT 1 FROM messages WHERE session_key = ? AND seq < ? LIMIT 1", (key, first_seq)
+                    ).fetchone() is None
+                else:
+                    complete = True
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load session {key}: {e}")
+            return None
+
+        session = session_from_record(key, messages, created_at, json.loads(metadata_json))
+        session._first_seq = first_seq
+        session._complete = complete
+        return session
+
+    def load_older(self, session: Session) -> list[dict[str, Any]]:
+        with self._lock:
+            cursor = self._db.execute(
+                "SELECT data FROM messages WHERE session_key = ? AND seq < ? ORDER BY seq",
+                (session.key, session._first_seq),
+            )
+            older = [json.loads(data) for (data,) in cursor]
+        return older
+
+    def complete(self, session: Session, older: list[dict[str, Any]] | None = None) -> None:
+        if session._complete:
+            return
+        if older is None:
+            older = self.load_older(session)
+        number_legacy(older, before=session.messages[0]["seq"] if session.messages else session._next_seq)
+        session.messages[:0] = older
+        session._synced[:0] = older
+        # Seqs are contiguous, so the older rows end right before the loaded ones
+        session._first_seq -= len(older)
+        session._complete = True
+
+    def save(self, session: Session) -> int:
+        meta = metadata_record(session)
+        record = json.loads(meta)
+        delta = session_delta(session) if session._synced_meta else None
+        if delta is None:
+            self.complete(session)
+
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT next_seq FROM sessions WHERE key = ?", (session.key,)
+            ).fetchone()
+            next_seq = row[0] if row else 0
+            if delta is None or row is None:
+                # Full write: replace all rows, continuing the seq numbering
+                self._db.execute("DELETE FROM messages WHERE session_key = ?", (session.key,))
+                first_seq, new_messages = next_seq, session.messages
+            else:
+                trimmed, new_messages = delta
+                first_seq = session._first_seq + trimmed
+                if trimmed:
+                    session._complete = True  # rows not loaded are deleted too
+                    self._db.execute(
+                        "DELETE FROM messages WHERE session_key = ? AND seq < ?",
+                        (session.key, first_seq),
+                    )
+                if not new_messages and not trimmed and same_metadata(meta, session._synced_meta):
+                    session._synced = list(session.messages)
+                    return 0
+            start = first_seq + len(session.messages) - len(new_messages)
+            self._db.executemany(
+                "INSERT INTO messages (session_key, seq, data) VALUES (?, ?, ?)",
+                [(session.key, start + i, json.dumps(msg)) for i, msg in enumerate(new_messages)],
+            )
+            self._db.execute(
+                "INSERT INTO sessions (key, channel, created_at, updated_at, metadata, message_count, next_seq) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "updated_at = excluded.updated_at, metadata = excluded.metadata, "
+                "message_count = excluded.message_count, next_seq = excluded.next_seq",
+                (
+                    session.key,
+                    session.key.split(":", 1)[0],
+                    record["created_at"],
+                    record["updated_at"],
+                    json.dumps(record["metadata"]),
+                    len(session.messages),
+                    max(next_seq, start + len(new_messages)),
+                ),
+            )
+
+        session._synced = list(session.messages)
+        session._synced_meta = meta
+        session._first_seq = first_seq
+        return len(new_messages) + 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE session_key = ?", (key,))
+            cur = self._db.execute("DELETE FROM sessions WHERE key = ?", (key,))
+        return cur.rowcount > 0
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            keys = [row[0] for row in self._db.execute("SELECT key FROM sessions")]
+        return iter(keys)
+
+    def list_sessions(self, channel: str | None = None, limit: int | None = None) -> list[dict[str, Any]]:
+        query = "SELECT key, created_at, updated_at, message_count FROM sessions"
+        params: list[Any] = []
+        if channel:
+            query += " WHERE channel = ?"
+            params.append(channel)
+        query += " ORDER BY updated_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [
+            {"key": key, "created_at": created, "updated_at": updated, "messages": count}
+            for key, created, updated, count in rows
+        ]
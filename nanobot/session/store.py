@@ -0,0 +1,198 @@
+"""Session storage backends: the interface and helpers shared by them."""
+
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Iterator
+
+from nanobot.session.manager import Session, number_legacy
+
+
+class SessionStore(ABC):
+    """
+    Persistent storage for sessions, behind ``SessionManager``.
+
+    Stores write incrementally where they can: ``session._synced`` and
+    ``session._synced_meta`` record what this store last wrote for a session,
+    and ``session_delta`` turns that into "drop N from the front, append
+    these". A session whose ``_synced_meta`` is empty has not been written by
+    the store yet and is written in full.
+
+    Sessions may be loaded with only their newest messages (``tail``).
+    Incremental saves never need the older ones; ``complete()`` loads them
+    before anything that does (full rewrites, summarization).
+    """
+
+    @abstractmethod
+    def load(self, key: str, tail: int | None = None) -> "Session | None":
+        """
+        Load a session, or None if it does not exist (or cannot be read).
+
+        Args:
+            key: Session key.
+            tail: Load at most this many of the newest messages (None = all).
+                Stores that cannot read a tail cheaply may load everything;
+                ``session._complete`` tells whether older messages remain.
+        """
+        pass
+
+    def load_older(self, session: "Session") -> list[dict[str, Any]]:
+        """
+        Messages older than those loaded into ``session``, oldest first.
+
+        The default reloads the whole session; stores that can should
+        override it with a cheaper lookup.
+        """
+        full = self.load(session.key)
+        if full is None:
+            return []
+        return full.messages[:max(len(full.messages) - len(session._synced), 0)]
+
+    def complete(self, session: "Session", older: list[dict[str, Any]] | None = None) -> None:
+        """
+        Load the rest of a tail-loaded session's history into it.
+
+        Args:
+            older: The result of ``load_older(session)`` if already read
+                (e.g. in a worker thread).
+        """
+        if session._complete:
+            return
+        if older is None:
+            older = self.load_older(session)
+        number_legacy(older, before=session.messages[0]["seq"] if session.messages else session._next_seq)
+        session.messages[:0] = older
+        session._synced[:0] = older
+        session._complete = True
+
+    @abstractmethod
+    def save(self, session: "Session") -> int:
+        """
+        Persist a session.
+
+        Returns:
+            Number of records written (for tracing).
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete a session. Returns False if it did not exist."""
+        pass
+
+    @abstractmethod
+    def list_sessions(self, channel: str | None = None, limit: int | None = None) -> list[dict[str, Any]]:
+        """
+        List sessions, most recently updated first.
+
+        Args:
+            channel: Only sessions of this channel.
+            limit: Maximum number of sessions to return.
+
+        Returns:
+            Dicts with ``key``, ``created_at``, ``updated_at`` (ISO strings)
+            and backend-specific details.
+        """
+        pass
+
+    @abstractmethod
+    def keys(self) -> Iterator[str]:
+        """Iterate over the keys of all stored sessions."""
+        pass
+
+    def archive_idle(self, cutoff: datetime) -> int:
+        """
+        Move sessions not updated since ``cutoff`` to cheaper cold storage.
+
+        Archived sessions load as usual. Stores without a cold tier do nothing.
+
+        Returns:
+            Number of sessions archived.
+        """
+        return 0
+
+    def close(self) -> None:
+        """Release resources (connections, background work)."""
+        pass
+
+
+def session_delta(session: "Session") -> tuple[int, list[dict[str, Any]]] | None:
+    """
+    Work out what changed in a session's messages since the last save.
+
+    Returns:
+        (messages trimmed from the front, messages to append), or None if
+        the messages were edited in a way only a full rewrite can record.
+    """
+    synced, messages = session._synced, session.messages
+    if not messages:
+        return len(synced), []
+    first = messages[0]
+    trimmed = next((i for i, m in enumerate(synced) if m is first), len(synced))
+    kept = len(synced) - trimmed
+    if kept > len(messages) or (kept and messages[kept - 1] is not synced[-1]):
+        return None
+    return trimmed, messages[kept:]
+
+
+def metadata_record(session: "Session") -> str:
+    """Serialize a session's metadata (including the summary) as a JSON record."""
+    persisted_metadata = dict(session.metadata)
+    if session.summary:
+        persisted_metadata["summary"] = session.summary
+    if session.summary_upto:
+        persisted_metadata["summary_upto"] = session.summary_upto
+    return json.dumps({
+        "_type": "metadata",
+        "key": session.key,
+        "created_at": session.created_at.isoformat(),
+        "updated_at": session.updated_at.isoformat(),
+        "metadata": persisted_metadata,
+    })
+
+
+def session_from_record(
+    key: str, messages: list[dict[str, Any]], created_at: str | None, metadata: dict[str, Any]
+) -> "Session":
+    """Build a loaded session from its stored metadata, marked as in sync with the store."""
+    metadata = dict(metadata)
+    session = Session(
+        key=key,
+        messages=messages,
+        created_at=datetime.fromisoformat(created_at) if created_at else datetime.now(),
+        metadata=metadata,
+        summary=metadata.pop("summary", ""),
+        summary_upto=metadata.pop("summary_upto", 0),
+    )
+    session._synced = list(messages)
+    session._synced_meta = metadata_record(session)
+    return session
+
+
+def same_metadata(a: str, b: str) -> bool:
+    """Compare metadata records, ignoring ``updated_at`` (which changes every turn)."""
+    if not b:
+        return False
+    da, db = json.loads(a), json.loads(b)
+    da.pop("updated_at", None)
+    db.pop("updated_at", None)
+    return da == db
+
+
+def migrate_sessions(source: SessionStore, target: SessionStore) -> int:
+    """
+    Copy every session from one store into another.
+
+    Returns:
+        Number of sessions copied.
+    """
+    count = 0
+    for key in list(source.keys()):
+        session = source.load(key)
+        if session is None:
+            continue
+        # Written in full: the target has never seen this session
+        session._synced, session._synced_meta = [], ""
+        target.save(session)
+        count += 1
+    return count
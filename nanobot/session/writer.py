@@ -0,0 +1,131 @@
+"""Background session writer: moves store I/O off the event loop."""
+
+import asyncio
+import copy
+from typing import TYPE_CHECKING, Callable
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from nanobot.session.manager import Session
+
+
+def snapshot(session: "Session") -> "Session":
+    """Copy a session deep enough for a store to write it from another thread."""
+    snap = copy.copy(session)
+    snap.messages = list(session.messages)
+    snap.metadata = dict(session.metadata)
+    snap._synced = list(session._synced)
+    return snap
+
+
+def sync_back(session: "Session", snap: "Session", loaded: int = 0) -> None:
+    """
+    Carry a written snapshot's store bookkeeping over to the live session.
+
+    Args:
+        loaded: Older messages the store prepended to the snapshot while
+            writing it (a full rewrite of a tail-loaded session).
+    """
+    if loaded and not session._complete:
+        # Unless the live session was trimmed or cleared in the meantime
+        front = snap.messages[loaded] if loaded < len(snap.messages) else None
+        if session.messages and session.messages[0] is front:
+            session.messages[:0] = snap.messages[:loaded]
+    session._synced = snap._synced
+    session._synced_meta = snap._synced_meta
+    session._dead = snap._dead
+    session._first_seq = snap._first_seq
+    session._complete = session._complete or snap._complete
+
+
+class SessionWriter:
+    """
+    Writes sessions in the background, coalescing saves.
+
+    ``schedule()`` marks a session dirty and returns at once. A writer task
+    on the event loop waits ``window_s`` so further saves of the same
+    session fold into one write, snapshots the dirty sessions (on the loop,
+    so nothing changes under it) and hands the batch to a worker thread.
+    Once the write returns, the store bookkeeping is copied back onto the
+    live sessions. Writes happen one batch at a time, so a store never sees
+    two saves of the same session at once. ``flush()`` writes everything
+    pending immediately; call it before shutting down.
+    """
+
+    def __init__(self, write: Callable[["Session"], int], window_s: float = 0.05):
+        self.write = write
+        self.window_s = window_s
+        self._pending: dict[str, "Session"] = {}
+        self._writing: set[str] = set()
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self.batches = 0
+        self.coalesced = 0
+
+    def is_pending(self, key: str) -> bool:
+        """True while a session has changes that are not on disk yet."""
+        return key in self._pending or key in self._writing
+
+    def schedule(self, session: "Session") -> bool:
+        """
+        Queue a session for writing.
+
+        Returns:
+            False if there is no running event loop (the caller should
+            write synchronously).
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if session.key in self._pending:
+            self.coalesced += 1
+        self._pending[session.key] = session
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        return True
+
+    async def flush(self) -> None:
+        """Write all pending sessions now and wait until they are on disk."""
+        while self._pending or (self._task is not None and not self._task.done()):
+            if self._task is None or self._task.done():
+                self._wake = asyncio.Event()
+                self._task = asyncio.create_task(self._run())
+            self._wake.set()
+            await asyncio.shield(self._task)
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.window_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._write_batch()
+
+    async def _write_batch(self) -> None:
+        batch, self._pending = self._pending, {}
+        snaps = [(session, snapshot(session)) for session in batch.values()]
+        sizes = [len(snap.messages) for _, snap in snaps]
+        self._writing.update(batch)
+        try:
+            failed = await asyncio.to_thread(self._write_all, [snap for _, snap in snaps])
+        finally:
+            self._writing.difference_update(batch)
+        for (session, snap), size in zip(snaps, sizes):
+            # A failed save leaves the live bookkeeping alone, so its changes go out next time
+            if snap.key not in failed:
+                sync_back(session, snap, loaded=len(snap.messages) - size)
+        self.batches += 1
+
+    def _write_all(self, snaps: list["Session"]) -> set[str]:
+        failed = set()
+        for snap in snaps:
+            try:
+                self.write(snap)
+            except Exception as e:
+                logger.error(f"Failed to save session {snap.key}: {e}")
+                failed.add(snap.key)
+        return failed
@@ -0,0 +1,13 @@
+"""Lightweight span tracing for agent turns."""
+
+from nanobot.tracing.exporter import JsonlSpanExporter, read_spans
+from nanobot.tracing.tracer import Span, Tracer, configure_tracing, get_tracer
+
+__all__ = [
+    "JsonlSpanExporter",
+    "Span",
+    "Tracer",
+    "configure_tracing",
+    "get_tracer",
+    "read_spans",
+]
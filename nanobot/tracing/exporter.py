@@ -0,0 +1,166 @@
+"""JSONL span exporter writing OTLP-shaped trace records with size-based rotation."""
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+if TYPE_CHECKING:
+    from nanobot.tracing.tracer import Span
+
+# OTLP enum values
+_SPAN_KIND_INTERNAL = 1
+_STATUS_UNSET = 0
+_STATUS_ERROR = 2
+
+
+def _attr_value(value: Any) -> dict[str, Any]:
+    """Encode a Python value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP JSON encodes 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _decode_value(value: dict[str, Any]) -> Any:
+    """Decode an OTLP AnyValue back into a Python value."""
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("boolValue", "doubleValue", "stringValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+def span_to_otlp(span: "Span") -> dict[str, Any]:
+    """Convert a finished span into an OTLP JSON span object."""
+    record: dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": _SPAN_KIND_INTERNAL,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+        "attributes": [
+            {"key": k, "value": _attr_value(v)} for k, v in span.attributes.items()
+        ],
+        "status": {"code": _STATUS_ERROR, "message": span.error} if span.error
+        else {"code": _STATUS_UNSET},
+    }
+    if span.parent_id:
+        record["parentSpanId"] = span.parent_id
+    return record
+
+
+class JsonlSpanExporter:
+    """
+    Appends finished spans to a JSONL file, one ExportTraceServiceRequest per line.
+
+    When the file grows past ``max_bytes`` it is rotated to ``<name>.1``,
+    ``<name>.2``, ... keeping at most ``backup_count`` old files.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 3,
+        service_name: str = "nanobot",
+    ):
+        self.path = Path(path).expanduser()
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.service_name = service_name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: Iterable["Span"]) -> None:
+        """Write a batch of spans as a single line."""
+        otlp_spans = [span_to_otlp(s) for s in spans]
+        if not otlp_spans:
+            return
+        record = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": self.service_name}}
+                    ]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "nanobot"},
+                    "spans": otlp_spans,
+                }],
+            }]
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._rotate_if_needed(len(line.encode("utf-8")))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size + incoming <= self.max_bytes or size == 0:
+            return
+        if self.backup_count <= 0:
+            self.path.unlink()
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+
+def read_spans(path: Path, trace_id: str) -> list[dict[str, Any]]:
+    """
+    Load all spans of a trace from the trace file and its rotated backups.
+
+    Args:
+        path: Path of the active trace file.
+        trace_id: Full trace ID or a unique prefix of it.
+
+    Returns:
+        Spans as flat dicts (trace_id, span_id, parent_id, name, start_ns,
+        end_ns, attributes, error), sorted by start time.
+    """
+    path = Path(path).expanduser()
+    files = sorted(
+        path.parent.glob(f"{path.name}*"),
+        key=lambda p: p.stat().st_mtime,
+    )
+    spans: list[dict[str, Any]] = []
+    for file in files:
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                if trace_id not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                for rs in record.get("resourceSpans", []):
+                    for ss in rs.get("scopeSpans", []):
+                        for s in ss.get("spans", []):
+                            if s.get("traceId", "").startswith(trace_id):
+                                spans.append(_flatten(s))
+    spans.sort(key=lambda s: s["start_ns"])
+    return spans
+
+
+def _flatten(s: dict[str, Any]) -> dict[str, Any]:
+    status = s.get("status", {})
+    return {
+        "trace_id": s.get("traceId", ""),
+        "span_id": s.get("spanId", ""),
+        "parent_id": s.get("parentSpanId"),
+        "name": s.get("name", ""),
+        "start_ns": int(s.get("startTimeUnixNano", 0)),
+        "end_ns": int(s.get("endTimeUnixNano", 0)),
+        "attributes": {a["key"]: _decode_value(a.get("value", {})) for a in s.get("attributes", [])},
+        "error": status.get("message") if status.get("code") == _STATUS_ERROR else None,
+    }
@@ -0,0 +1,171 @@
+"""Span tracer: records timed, nested spans for each agent turn."""
+
+import os
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from nanobot.tracing.exporter import JsonlSpanExporter
+
+
+class Span:
+    """
+    A timed operation within a trace.
+
+    Spans are context managers: entering makes the span the parent of any
+    span started inside it (per asyncio task), exiting records the end time
+    and, if an exception escaped, an error status.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+        "attributes", "error", "_tracer", "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        attributes: dict[str, Any],
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a key/value attribute (str, int, float or bool)."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed."""
+        self.error = message
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc is not None and self.error is None:
+            self.error = f"{type(exc).__name__}: {exc}"
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        self._tracer._on_end(self)
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is disabled; every operation is free."""
+
+    __slots__ = ()
+    trace_id = ""
+    span_id = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Creates spans and hands finished traces to an exporter.
+
+    Spans of one trace are buffered until the root span ends and are then
+    exported together; spans that outlive their root (e.g. background
+    summarization started by a turn) are exported on their own.
+
+    When no exporter is configured ``span()`` returns a shared no-op span,
+    so instrumented code costs one attribute check.
+    """
+
+    def __init__(self, exporter: "JsonlSpanExporter | None" = None):
+        self.exporter = exporter
+        self._pending: dict[str, list[Span]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, **attributes: Any) -> Span | _NoopSpan:
+        """Start a span as a child of the current span (or a new trace if none)."""
+        if self.exporter is None:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is None or parent.end_ns is not None:
+            return self._root(name, attributes)
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def start_trace(self, name: str, **attributes: Any) -> Span | _NoopSpan:
+        """Start a root span of a new trace, regardless of the current span."""
+        if self.exporter is None:
+            return NOOP_SPAN
+        return self._root(name, attributes)
+
+    def _root(self, name: str, attributes: dict[str, Any]) -> Span:
+        trace_id = os.urandom(16).hex()
+        self._pending[trace_id] = []
+        return Span(self, name, trace_id, None, attributes)
+
+    def _on_end(self, span: Span) -> None:
+        pending = self._pending.get(span.trace_id)
+        if pending is None:
+            # Root already exported; ship the straggler alone
+            self._export([span])
+            return
+        pending.append(span)
+        if span.parent_id is None:
+            self._export(self._pending.pop(span.trace_id))
+
+    def _export(self, spans: list[Span]) -> None:
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.warning(f"Failed to export trace spans: {e}")
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer (disabled until configure_tracing is called)."""
+    return _tracer
+
+
+def configure_tracing(exporter: "JsonlSpanExporter | None") -> Tracer:
+    """Enable tracing with the given exporter, or disable it with None."""
+    _tracer.exporter = exporter
+    _tracer._pending.clear()
+    return _tracer
@@ -2,6 +2,7 @@
 
 from pathlib import Path
 from datetime import datetime
+from typing import Iterable
 
 
 def ensure_dir(path: Path) -> Path:
@@ -89,3 +90,23 @@ def parse_session_key(key: str) -> tuple[str, str]:
     if len(parts) != 2:
         raise ValueError(f"Invalid session key: {key}")
     return parts[0], parts[1]
+
+
+def stat_signature(paths: Iterable[Path]) -> tuple:
+    """
+    Cheap change-detection key for a set of files or directories.
+    
+    Args:
+        paths: Paths to stat (missing paths are allowed).
+    
+    Returns:
+        Tuple of (path, mtime_ns, size) per path; (path, None, None) if missing.
+    """
+    key = []
+    for path in paths:
+        try:
+            st = path.stat()
+            key.append((str(path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            key.append((str(path), None, None))
+    return tuple(key)
@@ -0,0 +1,71 @@
+import os
+from pathlib import Path
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.tools.filesystem import WriteFileTool
+
+
+def _bump(path: Path, text: str) -> None:
+    # Same-second rewrites must still be noticed: force a distinct mtime
+    path.write_text(text, encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_unchanged_workspace_reuses_sections(tmp_path, monkeypatch) -> None:
+    (tmp_path / "SOUL.md").write_text("be kind", encoding="utf-8")
+    builder = ContextBuilder(tmp_path)
+    first = builder.build_system_prompt()
+
+    reads: list[Path] = []
+    original = Path.read_text
+
+    def tracking_read(self, *args, **kwargs):
+        reads.append(self)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", tracking_read)
+    assert builder.build_system_prompt() == first
+    assert reads == []
+
+
+def test_edited_bootstrap_and_memory_files_are_picked_up(tmp_path) -> None:
+    soul = tmp_path / "SOUL.md"
+    soul.write_text("be kind", encoding="utf-8")
+    builder = ContextBuilder(tmp_path)
+    assert "be kind" in builder.build_system_prompt()
+
+    _bump(soul, "be terse")
+    builder.memory.write_long_term("user likes tea")
+    prompt = builder.build_system_prompt()
+    assert "be terse" in prompt and "be kind" not in prompt
+    assert "user likes tea" in prompt
+
+
+def test_new_skill_appears_in_summary(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path)
+    assert "my-skill" not in builder.build_system_prompt()
+
+    skill_dir = tmp_path / "skills" / "my-skill"
+    skill_dir.mkdir(parents=True)
+    assert "my-skill" not in builder.build_system_prompt()  # no SKILL.md yet
+    (skill_dir / "SKILL.md").write_text(
+        "---\nname: my-skill\ndescription: Does things\n---\n\nbody", encoding="utf-8"
+    )
+    assert "Does things" in builder.build_system_prompt()
+
+
+async def test_write_tool_invalidates_builder(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path)
+    builder.build_system_prompt()
+    changed: list[Path] = []
+
+    def on_write(path: Path) -> None:
+        changed.append(path)
+        builder.invalidate(path)
+
+    tool = WriteFileTool(on_write=on_write)
+    await tool.execute(path=str(tmp_path / "USER.md"), content="name: Sam")
+    assert changed == [(tmp_path / "USER.md").resolve()]
+    assert builder._sections == {}
+    assert "name: Sam" in builder.build_system_prompt()
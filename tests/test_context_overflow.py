@@ -0,0 +1,89 @@
+from typing import Any
+
+import pytest
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tokens import TokenEstimator
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.litellm_provider import LiteLLMProvider
+
+
+@pytest.fixture(autouse=True)
+def _isolated_home(tmp_path, monkeypatch) -> None:
+    # SessionManager writes under ~/.nanobot/sessions
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+class OverflowOnceProvider(LLMProvider):
+    """Rejects the first call as too long, then answers."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[list[dict[str, Any]]] = []
+
+    async def chat(self, messages, tools=None, model=None, **kwargs) -> LLMResponse:
+        self.calls.append(list(messages))
+        if len(self.calls) == 1:
+            return LLMResponse(content="Error calling LLM: too long", finish_reason="context_length")
+        return LLMResponse(content="done", usage={"prompt_tokens": 100})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+    def get_context_window(self, model: str | None = None) -> int | None:
+        return 50_000
+
+
+def test_compact_strips_images_shrinks_turn_tools_and_drops_old_history(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path, tokens=TokenEstimator(use_tokenizer=False))
+    history = []
+    for i in range(10):
+        history += [{"role": "user", "content": f"q{i} " + "x" * 2000},
+                    {"role": "assistant", "content": f"a{i} " + "y" * 2000}]
+    turn = [
+        {"role": "user", "content": [
+            {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+            {"type": "text", "text": "what is this?"},
+        ]},
+        {"role": "assistant", "content": "", "tool_calls": []},
+        {"role": "tool", "tool_call_id": "1", "name": "read_file", "content": "z" * 40_000},
+    ]
+    messages = [{"role": "system", "content": "sys"}] + history + turn
+
+    compacted, turn_start = builder.compact(messages, 1 + len(history), target_tokens=4000)
+
+    assert compacted[turn_start]["content"] == "[image omitted]\nwhat is this?"
+    assert len(compacted[-1]["content"]) <= builder.COMPACT_TOOL_RESULT_TOKENS * 4
+    assert compacted[1:turn_start] == history[-(turn_start - 1):]
+    assert compacted[1]["role"] == "user"
+    assert builder.tokens.count_messages(compacted) <= 4000
+
+
+async def test_loop_retries_once_after_context_overflow(tmp_path) -> None:
+    provider = OverflowOnceProvider()
+    loop = AgentLoop(MessageBus(), provider, tmp_path)
+    session = loop.sessions.get_or_create("cli:direct")
+    for i in range(30):
+        session.add_message("user", f"q{i} " + "x" * 4000)
+        session.add_message("assistant", f"a{i} " + "y" * 4000)
+
+    reply = await loop.process_direct("hello")
+
+    assert reply == "done"
+    assert loop.context_window == 50_000
+    assert len(provider.calls) == 2
+    assert len(provider.calls[1]) < len(provider.calls[0])
+    assert provider.calls[1][-1]["content"] == "hello"
+
+
+def test_context_length_errors_are_recognized() -> None:
+    provider = LiteLLMProvider(default_model="gpt-4o")
+    overflow = provider._error_response(
+        Exception("This model's maximum context length is 8192 tokens"), "gpt-4o"
+    )
+    other = provider._error_response(Exception("rate limited"), "gpt-4o")
+
+    assert overflow.finish_reason == "context_length"
+    assert other.finish_reason == "error"
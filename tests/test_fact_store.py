@@ -0,0 +1,107 @@
+from nanobot.agent.facts import FactStore
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.tools.base import ToolContext, _current_context
+from nanobot.agent.tools.memory import ForgetTool, RecallTool, RememberTool
+
+
+def test_remember_dedupes_by_key_and_value(tmp_path) -> None:
+    store = FactStore(tmp_path / "facts.db")
+
+    assert store.remember("User name", "Sam")[0] == "added"
+    assert store.remember("user  NAME", "Sam")[0] == "unchanged"
+    assert store.remember("user name", "Samantha")[0] == "updated"
+    assert [(f.key, f.value) for f in store.all()] == [("user name", "Samantha")]
+
+    address = "Flat 4, 12 Example Street, Berlin, Germany"
+    assert store.remember("home address", address)[0] == "added"
+    assert store.remember("Where the user lives", address.upper())[0] == "updated"
+    assert [f.key for f in store.all()] == ["user name", "Where the user lives"]
+
+
+def test_short_values_under_other_keys_are_separate_facts(tmp_path) -> None:
+    store = FactStore(tmp_path / "facts.db")
+    store.remember("dog name", "Max")
+
+    assert store.remember("cat name", "Max")[0] == "added"
+    assert {(f.key, f.value) for f in store.all()} == {("dog name", "Max"), ("cat name", "Max")}
+
+
+def test_prune_drops_unimportant_and_stale_facts_first(tmp_path) -> None:
+    store = FactStore(tmp_path / "facts.db", max_tokens=32)
+    store.remember("birthday", "March 3rd", importance=5)
+    store.remember("coffee", "flat white, no sugar")
+    store.remember("weather", "it rained on Tuesday", importance=1)
+    store.recall("coffee")
+
+    _, pruned = store.remember("tea", "prefers green tea in the afternoon")
+
+    assert [f.key for f in pruned] == ["weather"]
+    _, pruned = store.remember("music", "likes jazz and old soul records a lot")
+    assert [f.key for f in pruned] == ["coffee"]
+    assert {f.key for f in store.all()} == {"birthday", "tea", "music"}
+
+
+def test_recall_ranks_and_counts_access(tmp_path) -> None:
+    store = FactStore(tmp_path / "facts.db")
+    store.remember("pet", "a cat called Miso")
+    store.remember("pet food", "Miso eats salmon")
+    store.remember("city", "Berlin")
+
+    assert [f.key for f in store.recall("what food does Miso eat")] == ["pet food", "pet"]
+    assert store.get("pet food").access_count == 1
+    assert store.recall("zebra") == []
+
+
+def test_memory_md_is_imported_then_rendered(tmp_path) -> None:
+    memory_dir = tmp_path / "memory"
+    memory_dir.mkdir()
+    (memory_dir / "MEMORY.md").write_text(
+        "# Long-term Memory\n\n## User Information\n\nLives in Berlin.\n\n## Preferences\n\n(User preferences)\n",
+        encoding="utf-8",
+    )
+    memory = MemoryStore(tmp_path, use_facts=True)
+    memory.remember("coffee", "flat white")
+
+    rendered = memory.read_long_term()
+    assert "- **User Information**: Lives in Berlin." in rendered
+    assert "- **coffee**: flat white" in rendered
+    assert "Preferences" not in rendered
+    assert (memory_dir / "MEMORY.md.bak").read_text(encoding="utf-8").startswith("# Long-term Memory")
+
+    # Reopening does not import the generated file again
+    assert len(MemoryStore(tmp_path, use_facts=True).facts) == 2
+
+
+async def test_fact_tools(tmp_path) -> None:
+    memory = MemoryStore(tmp_path, use_facts=True)
+    token = _current_context.set(ToolContext(channel="telegram", chat_id="42"))
+    try:
+        assert await RememberTool(memory).execute(key="city", value="Berlin") == "Remembered: city"
+    finally:
+        _current_context.reset(token)
+
+    assert memory.facts.get("city").session_key == "telegram:42"
+    assert await RecallTool(memory).execute(query="city") == "- city: Berlin"
+    assert await ForgetTool(memory).execute(key="city") == "Forgot: city"
+    assert await ForgetTool(memory).execute(key="city") == "Error: No fact with key: city"
+    assert "city" not in memory.read_long_term()
+
+
+def test_import_keeps_sections_with_the_same_heading(tmp_path) -> None:
+    store = FactStore(tmp_path / "facts.db")
+    text = "# Long-term Memory\n\nlikes tea\n\n# Memory\n\nuses vim\n\n## Pets\n\na dog\n\n## Pets\n\na cat\n"
+
+    assert store.import_markdown(text) == 4
+    assert {(f.key, f.value) for f in store.all()} == {
+        ("Notes", "likes tea"), ("Notes (2)", "uses vim"), ("Pets", "a dog"), ("Pets (2)", "a cat"),
+    }
+
+
+def test_a_fact_larger_than_the_cap_is_kept(tmp_path) -> None:
+    store = FactStore(tmp_path / "facts.db", max_tokens=20)
+    store.remember("coffee", "flat white")
+
+    status, pruned = store.remember("recipe", "a long recipe " * 20)
+    assert status == "added"
+    assert [f.key for f in pruned] == ["coffee"]
+    assert [f.key for f in store.all()] == ["recipe"]
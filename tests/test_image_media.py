@@ -0,0 +1,70 @@
+import base64
+import io
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.media import ImageEncoder
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _decode(block: dict) -> tuple[str, "Image.Image"]:
+    header, b64 = block["image_url"]["url"].split(",", 1)
+    return header, Image.open(io.BytesIO(base64.b64decode(b64)))
+
+
+def _photo(path: Path, size: tuple[int, int]) -> Path:
+    Image.new("RGB", size, (200, 50, 50)).save(path, format="JPEG", quality=95)
+    return path
+
+
+def test_large_image_is_downscaled_and_recompressed(tmp_path) -> None:
+    photo = _photo(tmp_path / "photo.jpg", (4000, 3000))
+    header, img = _decode(ImageEncoder(max_dimension=1000).encode(str(photo)))
+
+    assert header == "data:image/jpeg;base64"
+    assert img.size == (1000, 750)
+
+
+def test_small_image_is_sent_unchanged(tmp_path) -> None:
+    photo = _photo(tmp_path / "small.jpg", (200, 100))
+    block = ImageEncoder(max_dimension=1000).encode(str(photo))
+
+    assert base64.b64decode(block["image_url"]["url"].split(",", 1)[1]) == photo.read_bytes()
+
+
+def test_transparent_image_stays_png(tmp_path) -> None:
+    path = tmp_path / "logo.png"
+    Image.new("RGBA", (3000, 3000), (0, 0, 0, 0)).save(path)
+    header, img = _decode(ImageEncoder(max_dimension=500).encode(str(path)))
+
+    assert header == "data:image/png;base64"
+    assert img.size == (500, 500)
+
+
+def test_identical_content_is_encoded_once(tmp_path, monkeypatch) -> None:
+    encoder = ImageEncoder(max_dimension=1000)
+    first = _photo(tmp_path / "a.jpg", (3000, 2000))
+    copy = tmp_path / "b.jpg"
+    copy.write_bytes(first.read_bytes())
+
+    calls = []
+    original = encoder._to_data_url
+    monkeypatch.setattr(encoder, "_to_data_url", lambda *a: calls.append(a) or original(*a))
+
+    assert encoder.encode(str(first)) == encoder.encode(str(copy)) == encoder.encode(str(first))
+    assert len(calls) == 1
+
+
+async def test_prepare_fills_cache_for_context_builder(tmp_path, monkeypatch) -> None:
+    photo = _photo(tmp_path / "photo.jpg", (3000, 2000))
+    builder = ContextBuilder(tmp_path, media=ImageEncoder(max_dimension=800))
+    await builder.media.prepare([str(photo), str(tmp_path / "notes.txt")])
+
+    monkeypatch.setattr(builder.media, "_to_data_url", lambda *a: pytest.fail("re-encoded"))
+    content = builder._build_user_content("look", [str(photo)])
+
+    assert content[-1] == {"type": "text", "text": "look"}
+    assert _decode(content[0])[1].size == (800, 533)
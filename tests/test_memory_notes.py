@@ -0,0 +1,71 @@
+import threading
+import zipfile
+
+from nanobot.agent.memory import MemoryStore
+from nanobot.utils.helpers import today_date
+
+
+def test_append_today_only_appends(tmp_path) -> None:
+    memory = MemoryStore(tmp_path, fsync_every=2)
+    memory.append_today("first")
+    memory.append_today("second")
+    memory.append_today("third")
+    memory.sync()
+
+    assert memory.read_today() == f"# {today_date()}\n\nfirst\nsecond\nthird"
+
+
+def test_concurrent_appends_are_not_lost(tmp_path) -> None:
+    memory = MemoryStore(tmp_path)
+    threads = [
+        threading.Thread(target=lambda i=i: [memory.append_today(f"t{i}-{j}") for j in range(50)])
+        for i in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    lines = memory.read_today().splitlines()[2:]
+    assert sorted(lines) == sorted(f"t{i}-{j}" for i in range(4) for j in range(50))
+
+
+def test_old_months_are_archived_and_still_readable(tmp_path) -> None:
+    memory_dir = tmp_path / "memory"
+    memory_dir.mkdir()
+    for day in ("2020-01-05", "2020-01-20", "2020-02-01"):
+        (memory_dir / f"{day}.md").write_text(f"# {day}\n\nnote {day}", encoding="utf-8")
+
+    memory = MemoryStore(tmp_path)
+    memory.append_today("today")  # first use of the month rolls over
+
+    assert [p.name for p in memory.list_memory_files()] == [f"{today_date()}.md"]
+    assert sorted(p.name for p in memory.archive_dir.iterdir()) == ["2020-01.zip", "2020-02.zip"]
+    assert memory.read_day("2020-01-20") == "# 2020-01-20\n\nnote 2020-01-20"
+
+    # A late file for an archived month is merged into the existing bundle
+    (memory_dir / "2020-01-31.md").write_text("late", encoding="utf-8")
+    memory.archive_old_notes()
+    with zipfile.ZipFile(memory.archive_dir / "2020-01.zip") as zf:
+        assert sorted(zf.namelist()) == ["2020-01-05.md", "2020-01-20.md", "2020-01-31.md"]
+
+
+def test_archiving_can_be_disabled(tmp_path) -> None:
+    memory = MemoryStore(tmp_path, archive_days=0)
+    (memory.memory_dir / "2020-01-05.md").write_text("old", encoding="utf-8")
+    memory.append_today("today")
+
+    assert len(memory.list_memory_files()) == 2
+    assert not memory.archive_dir.exists()
+
+
+def test_sync_flushes_the_file_with_pending_appends(tmp_path, monkeypatch) -> None:
+    memory = MemoryStore(tmp_path, fsync_every=0)
+    memory.append_today("unsynced")
+    synced = []
+    monkeypatch.setattr("nanobot.agent.memory.os.fsync", synced.append)
+
+    memory.sync()
+    memory.sync()
+
+    assert len(synced) == 1
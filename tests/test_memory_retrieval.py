@@ -0,0 +1,99 @@
+import os
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.memory_index import MemoryIndex, chunk_markdown, index_terms
+from nanobot.agent.tools.memory import MemorySearchTool
+
+LONG_TERM = """# Memory
+
+User's name is Sam. Prefers short answers.
+
+## Pets
+Sam has a cat called Miso who hates the vacuum cleaner.
+
+## Travel
+Sam visited Kyoto in spring and loved the 抹茶 desserts.
+
+## Work
+""" + "\n".join(f"Project note {i}: routine status update about quarterly planning." for i in range(200))
+
+
+def test_chunks_follow_headings_and_cjk_is_searchable(tmp_path) -> None:
+    assert [h for h, _ in chunk_markdown(LONG_TERM)][:3] == ["Memory", "Pets", "Travel"]
+    assert index_terms("抹茶甜点") == ["抹茶", "茶甜", "甜点"]
+
+    (tmp_path / "MEMORY.md").write_text(LONG_TERM, encoding="utf-8")
+    index = MemoryIndex(tmp_path)
+    index.refresh()
+
+    assert index.search("我想吃抹茶")[0].heading == "Travel"
+    assert index.search("tell me about the cat")[0].heading == "Pets"
+
+
+def test_refresh_only_reindexes_changed_files(tmp_path) -> None:
+    (tmp_path / "MEMORY.md").write_text("Sam likes tea.", encoding="utf-8")
+    (tmp_path / "2026-01-01.md").write_text("Went hiking.", encoding="utf-8")
+    index = MemoryIndex(tmp_path)
+
+    assert index.refresh() == 2
+    assert index.refresh() == 0
+
+    notes = tmp_path / "2026-01-01.md"
+    notes.write_text("Went hiking in the Alps.", encoding="utf-8")
+    st = notes.stat()
+    os.utime(notes, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    (tmp_path / "MEMORY.md").unlink()
+
+    assert index.refresh() == 2
+    assert index.search("tea") == []
+    assert index.search("alps")[0].path.endswith("2026-01-01.md")
+
+
+
+def test_archived_notes_stay_searchable(tmp_path) -> None:
+    memory = MemoryStore(tmp_path)
+    (memory.memory_dir / "2020-01-05.md").write_text("# 2020-01-05\n\nBooked the ferry to Gotland.", encoding="utf-8")
+    assert memory.search("gotland ferry")[0].path == "memory/2020-01-05.md"
+
+    memory.archive_old_notes()
+    (hit,) = memory.search("gotland ferry")
+    assert hit.path == "memory/archive/2020-01.zip/2020-01-05.md"
+    assert hit.text == "Booked the ferry to Gotland."
+
+    # A rewritten bundle replaces its chunks; a removed one drops them
+    (memory.memory_dir / "2020-01-20.md").write_text("Ferry was cancelled.", encoding="utf-8")
+    memory.archive_old_notes()
+    assert len(memory.search("ferry")) == 2
+    (memory.archive_dir / "2020-01.zip").unlink()
+    assert memory.search("ferry") == []
+
+def test_large_memory_is_retrieved_per_message(tmp_path) -> None:
+    memory = MemoryStore(tmp_path, inline_tokens=500, pinned_tokens=15)
+    memory.write_long_term(LONG_TERM)
+    builder = ContextBuilder(tmp_path, memory=memory)
+
+    system = builder.build_messages([], "How is my cat doing?")[0]["content"]
+
+    assert "## Long-term Memory (top)\n# Memory\n\nUser's name is Sam." in system
+    assert "## Relevant Memory" in system and "Miso" in system
+    assert "Project note 150" not in system
+
+
+def test_small_memory_is_included_whole(tmp_path) -> None:
+    memory = MemoryStore(tmp_path)
+    memory.write_long_term("Sam has a cat called Miso.")
+    system = ContextBuilder(tmp_path, memory=memory).build_messages([], "hi")[0]["content"]
+
+    assert "## Long-term Memory\nSam has a cat called Miso." in system
+    assert "Relevant Memory" not in system
+
+
+async def test_memory_search_tool(tmp_path) -> None:
+    memory = MemoryStore(tmp_path)
+    memory.write_long_term(LONG_TERM)
+    tool = MemorySearchTool(memory)
+
+    result = await tool.execute(query="Kyoto trip", limit=1)
+    assert result.startswith("### memory/MEMORY.md — Travel")
+    assert await tool.execute(query="zebra") == "No memories found for: zebra"
@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BUSY_REPLY, BaseChannel
+
+
+def _msg(content: str, channel: str = "test", chat_id: str = "a") -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id="u", chat_id=chat_id, content=content)
+
+
+async def _drain(bus: MessageBus) -> list[str]:
+    out = []
+    while bus.inbound_size:
+        out.append((await bus.consume_inbound()).content)
+    return out
+
+
+async def test_drop_oldest_evicts_within_the_full_channel() -> None:
+    bus = MessageBus(max_inbound_per_channel=2, overflow_policy="drop_oldest")
+    assert await bus.publish_inbound(_msg("1"))
+    assert await bus.publish_inbound(_msg("other", channel="quiet"))
+    assert await bus.publish_inbound(_msg("2"))
+    assert await bus.publish_inbound(_msg("3"))
+
+    assert await _drain(bus) == ["other", "2", "3"]
+    assert bus.shed_counts == {"test": 1}
+
+
+async def test_reject_refuses_but_never_sheds_system_messages() -> None:
+    bus = MessageBus(max_inbound=1, overflow_policy="reject")
+    assert await bus.publish_inbound(_msg("1"))
+    assert not await bus.publish_inbound(_msg("2"))
+    assert await bus.publish_inbound(_msg("announce", channel="system", chat_id="test:a"))
+
+    assert await _drain(bus) == ["1", "announce"]
+    assert bus.shed_total == 1
+
+
+async def test_coalesce_merges_into_same_session_or_refuses() -> None:
+    bus = MessageBus(max_inbound=2, overflow_policy="coalesce")
+    await bus.publish_inbound(_msg("hi", chat_id="a"))
+    await bus.publish_inbound(_msg("yo", chat_id="b"))
+
+    assert await bus.publish_inbound(_msg("are you there?", chat_id="a"))
+    assert not await bus.publish_inbound(_msg("new", chat_id="c"))
+
+    assert await _drain(bus) == ["hi\nare you there?", "yo"]
+    assert bus.coalesced_count == 1
+    assert bus.shed_total == 1
+
+
+def test_unknown_overflow_policy_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        MessageBus(overflow_policy="drop_newest")
+
+
+class RecordingChannel(BaseChannel):
+    name = "test"
+
+    def __init__(self, bus: MessageBus) -> None:
+        super().__init__(SimpleNamespace(allow_from=[]), bus)
+        self.sent: list[OutboundMessage] = []
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def send(self, msg: OutboundMessage) -> None:
+        self.sent.append(msg)
+
+
+async def test_channel_replies_busy_when_bus_refuses() -> None:
+    bus = MessageBus(max_inbound=1, overflow_policy="reject")
+    channel = RecordingChannel(bus)
+
+    await channel._handle_message("u", "a", "first")
+    await channel._handle_message("u", "a", "second")
+
+    assert [m.content for m in channel.sent] == [BUSY_REPLY]
+    assert bus.inbound_size == 1
+
+
+async def test_debounce_merges_a_burst_into_one_message() -> None:
+    bus = MessageBus(debounce_ms=30, debounce_max_wait_ms=1000)
+    await bus.publish_inbound(_msg("hey"))
+    await bus.publish_inbound(_msg("quick question"))
+    await bus.publish_inbound(InboundMessage(
+        channel="test", sender_id="u", chat_id="a", content="", media=["/tmp/a.png"]
+    ))
+    assert bus.inbound_size == 0
+
+    msg = await asyncio.wait_for(bus.consume_inbound(), timeout=1.0)
+    assert msg.content == "hey\nquick question"
+    assert msg.media == ["/tmp/a.png"]
+    assert msg.metadata["buffered_count"] == 3
+
+
+async def test_debounce_releases_on_max_wait_and_keeps_commands_ordered() -> None:
+    bus = MessageBus(debounce_ms=50, debounce_max_wait_ms=80)
+    for i in range(6):
+        await bus.publish_inbound(_msg(str(i)))
+        await asyncio.sleep(0.02)
+    first = await asyncio.wait_for(bus.consume_inbound(), timeout=1.0)
+    assert first.content.startswith("0\n1")
+
+    await bus.publish_inbound(_msg("/stop"))
+    contents = [(await bus.consume_inbound()).content for _ in range(2)]
+    assert contents[1] == "/stop"
+    assert first.content + "\n" + contents[0] == "\n".join(str(i) for i in range(6))
+
+
+async def test_flush_debounced_releases_buffered_messages() -> None:
+    bus = MessageBus(debounce_ms=10_000, debounce_max_wait_ms=10_000)
+    await bus.publish_inbound(_msg("one"))
+    await bus.publish_inbound(_msg("two"))
+    await bus.publish_inbound(_msg("other chat", chat_id="b"))
+    assert bus.inbound_size == 0
+
+    await bus.flush_debounced()
+    assert await _drain(bus) == ["one\ntwo", "other chat"]
+    assert bus.debouncer.pending_sessions == 0
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.providers.litellm_provider import LiteLLMProvider
+
+
+def test_cache_layout_keeps_system_prompt_stable(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path, layout="cache")
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+    first = builder.build_messages(history, "one", channel="telegram", chat_id="1")
+    second = builder.build_messages(history, "two", channel="slack", chat_id="2", summary="earlier")
+
+    assert first[0] == second[0]
+    assert "Current Time" not in first[0]["content"]
+    assert first[1:3] == history
+    runtime = second[-2]["content"]
+    assert runtime.startswith("# Runtime Context")
+    assert "Current Time" in runtime and "Chat ID: 2" in runtime and "earlier" in runtime
+    assert second[-1] == {"role": "user", "content": "two"}
+
+
+def test_inline_layout_keeps_everything_in_system_prompt(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path)
+    messages = builder.build_messages([], "hi", channel="telegram", chat_id="1", summary="earlier")
+
+    assert len(messages) == 2
+    assert "Current Time" in messages[0]["content"]
+    assert "Chat ID: 1" in messages[0]["content"] and "earlier" in messages[0]["content"]
+
+
+def test_cache_breakpoints_on_system_history_end_and_last_message() -> None:
+    provider = LiteLLMProvider(default_model="anthropic/claude-sonnet-4-5", prompt_caching=True)
+    messages = [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+        {"role": "user", "content": "# Runtime Context"},
+        {"role": "user", "content": "next"},
+    ]
+    tools = [{"type": "function", "function": {"name": "a"}}, {"type": "function", "function": {"name": "b"}}]
+
+    kwargs = provider._build_kwargs(messages, tools, "claude-sonnet-4-5", 100, 0.7, None)
+
+    marked = [i for i, m in enumerate(kwargs["messages"]) if isinstance(m["content"], list)]
+    assert marked == [0, 2, 4]
+    assert kwargs["messages"][2]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" in kwargs["tools"][-1] and "cache_control" not in kwargs["tools"][0]
+    assert messages[0]["content"] == "sys"  # caller's list is untouched
+
+
+def test_no_breakpoints_for_unsupported_provider() -> None:
+    provider = LiteLLMProvider(default_model="gpt-4o", prompt_caching=True)
+    messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+
+    kwargs = provider._build_kwargs(messages, None, "gpt-4o", 100, 0.7, None)
+
+    assert kwargs["messages"] is messages
+
+
+def test_usage_reports_cached_tokens() -> None:
+    openai_usage = SimpleNamespace(
+        prompt_tokens=2000, completion_tokens=10, total_tokens=2010,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+    )
+    anthropic_usage = SimpleNamespace(
+        prompt_tokens=2000, completion_tokens=10, total_tokens=2010,
+        prompt_tokens_details=None, cache_read_input_tokens=0, cache_creation_input_tokens=1800,
+    )
+
+    assert LiteLLMProvider._parse_usage(openai_usage)["cached_tokens"] == 1536
+    usage = LiteLLMProvider._parse_usage(anthropic_usage)
+    assert "cached_tokens" not in usage
+    assert usage["cache_write_tokens"] == 1800
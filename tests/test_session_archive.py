@@ -0,0 +1,117 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from nanobot.session import jsonl_store
+from nanobot.session.jsonl_store import JsonlSessionStore
+from nanobot.session.manager import SessionManager
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+@pytest.fixture(params=["flat", "sharded"])
+def store(request, tmp_path):
+    return JsonlSessionStore(tmp_path / "sessions", layout=request.param, archive_tail=5)
+
+
+def _fill(store: JsonlSessionStore, key: str, count: int, age_days: float = 0):
+    manager = SessionManager(store.sessions_dir, store=store)
+    session = manager.get_or_create(key)
+    session.summary = "earlier talk"
+    for i in range(count):
+        session.add_message("user", f"message number {i} " + "lorem ipsum " * 20)
+    session.updated_at = datetime.now() - timedelta(days=age_days)
+    manager.save(session)
+    path = store._get_session_path(key)
+    stamp = time.time() - age_days * 86400
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_idle_sessions_are_compressed(store) -> None:
+    path = _fill(store, "telegram:old", 200, age_days=60)
+    _fill(store, "telegram:new", 3)
+    size = path.stat().st_size
+
+    assert store.archive_idle(datetime.now() - timedelta(days=30)) == 1
+    archive = store._archive_path(path)
+    assert not path.exists()
+    assert archive.stat().st_size * 10 < size
+    assert store.archive_idle(datetime.now() - timedelta(days=30)) == 0
+
+    listed = {s["key"]: s for s in store.list_sessions()}
+    assert listed["telegram:old"]["archived"] and not listed["telegram:new"].get("archived")
+
+
+def test_tail_loads_come_from_the_header(store, monkeypatch) -> None:
+    path = _fill(store, "cli:a", 40, age_days=60)
+    store.archive("cli:a")
+
+    def fail(codec, data):
+        raise AssertionError("body decompressed")
+
+    monkeypatch.setattr(jsonl_store, "_decompress", fail)
+    session = store.load("cli:a", tail=3)
+    assert session.summary == "earlier talk"
+    assert [m["content"][:17] for m in session.messages] == [f"message number {i}" for i in (37, 38, 39)]
+    assert not session._complete
+    assert not path.exists()
+
+
+def test_archived_session_reactivates_on_save(store) -> None:
+    path = _fill(store, "cli:a", 12, age_days=60)
+    store.archive("cli:a")
+
+    manager = SessionManager(store.sessions_dir, store=store, load_tail=5)
+    session = manager.get_or_create("cli:a")
+    assert len(session.messages) == 5
+    session.add_message("assistant", "welcome back")
+    manager.save(session)
+
+    assert path.exists() and not store._archive_path(path).exists()
+    full = store.load("cli:a")
+    assert len(full.messages) == 13 and full.messages[-1]["content"] == "welcome back"
+    assert full.summary == "earlier talk"
+
+
+def test_reset_of_reactivated_session_sticks_in_rewrite_mode(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions", mode="rewrite", archive_tail=5)
+    _fill(store, "cli:a", 80, age_days=60)
+    store.archive("cli:a")
+
+    manager = SessionManager(store.sessions_dir, store=store, load_tail=5)
+    session = manager.get_or_create("cli:a")
+    session.clear()
+    manager.save(session)
+
+    assert session.messages == []
+    assert store.load("cli:a").messages == []
+
+
+def test_full_load_and_delete_of_archived_session(store) -> None:
+    path = _fill(store, "cli:a", 8, age_days=60)
+    store.archive("cli:a")
+
+    assert len(store.load("cli:a").messages) == 8
+    assert list(store.keys()) == ["cli:a"]
+    assert store.delete("cli:a")
+    assert not store._archive_path(path).exists()
+    assert store.load("cli:a") is None
+
+
+def test_archive_header_is_readable_json(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions", archive_tail=2)
+    path = _fill(store, "cli:a", 4)
+    store.archive("cli:a")
+
+    with open(store._archive_path(path), "rb") as f:
+        header = json.loads(f.readline())
+    assert header["codec"] == ("zstd" if jsonl_store.ZSTD_AVAILABLE else "gzip")
+    assert header["messages"] == 4 and len(header["tail"]) == 2
+    assert header["metadata"]["summary"] == "earlier talk"
@@ -0,0 +1,79 @@
+import pytest
+
+from nanobot.session.cache import SessionCache, estimate_session_bytes
+from nanobot.session.manager import Session, SessionManager
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+def _session(key: str, content: str = "hi") -> Session:
+    session = Session(key=key)
+    session.add_message("user", content)
+    return session
+
+
+def test_lru_eviction_by_count_and_bytes() -> None:
+    cache = SessionCache(max_sessions=2, max_bytes=0, idle_ttl_s=0)
+    for key in ("a", "b"):
+        cache.put(_session(key))
+    cache.get("a")
+    cache.put(_session("c"))
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.stats() == {
+        "sessions": 2,
+        "bytes": 2 * estimate_session_bytes(_session("x")),
+        "hits": 1,
+        "misses": 0,
+        "evictions": 1,
+    }
+
+    by_bytes = SessionCache(max_sessions=0, max_bytes=1000, idle_ttl_s=0)
+    by_bytes.put(_session("big", "x" * 700))
+    by_bytes.put(_session("small"))
+    by_bytes.put(_session("big2", "x" * 700))
+    assert list(by_bytes._entries) == ["big2"]
+    assert by_bytes.bytes == estimate_session_bytes(_session("big2", "x" * 700))
+
+
+def test_idle_entries_expire(monkeypatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr("nanobot.session.cache.time.monotonic", lambda: clock[0])
+    cache = SessionCache(idle_ttl_s=60)
+    cache.put(_session("old"))
+    clock[0] += 61
+    cache.put(_session("new"))
+
+    assert "old" not in cache and "new" in cache
+
+
+def test_pinned_sessions_are_not_evicted(tmp_path) -> None:
+    manager = SessionManager(tmp_path, cache_max_sessions=1, cache_idle_ttl_s=0)
+    with manager.pinned("cli:turn"):
+        active = manager.get_or_create("cli:turn")
+        summarizing = manager.get_or_create("cli:summary")
+        summarizing.summary_in_progress = True
+        manager.get_or_create("cli:other")
+        manager.get_or_create("cli:last")
+
+        assert manager.get_or_create("cli:turn") is active
+        assert manager.get_or_create("cli:summary") is summarizing
+
+    stats = manager.cache_stats()
+    assert stats["evictions"] == 1  # only cli:other
+    assert stats["hits"] == 2 and stats["misses"] == 4
+
+
+def test_evicted_session_reloads_from_store(tmp_path) -> None:
+    manager = SessionManager(tmp_path, cache_max_sessions=1)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "remember me")
+    manager.save(session)
+    manager.get_or_create("cli:b")
+
+    reloaded = manager.get_or_create("cli:a")
+    assert reloaded is not session
+    assert [m["content"] for m in reloaded.messages] == ["remember me"]
@@ -0,0 +1,173 @@
+import json
+
+import pytest
+
+from nanobot.session.jsonl_store import JsonlSessionStore
+from nanobot.session.manager import SessionManager
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+def _records(manager: SessionManager, key: str) -> list[dict]:
+    path = manager.store._get_session_path(key)
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_append_mode_writes_only_new_records(tmp_path) -> None:
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "hi")
+    manager.save(session)
+    session.add_message("assistant", "hello")
+    manager.save(session)
+    manager.save(session)  # nothing changed
+
+    records = _records(manager, "cli:a")
+    assert [r.get("_type") or r["content"] for r in records] == ["metadata", "hi", "hello"]
+
+
+def test_trim_and_metadata_are_replayed(tmp_path) -> None:
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    for i in range(6):
+        session.add_message("user", f"m{i}")
+    manager.save(session)
+
+    # What the summarizer does: set a summary and keep only the tail
+    session.summary = "earlier: m0-m3"
+    session.messages = session.messages[-2:]
+    session.add_message("assistant", "m6")
+    manager.save(session)
+
+    records = _records(manager, "cli:a")
+    assert [r.get("_type") for r in records[-3:]] == ["trim", "metadata", None]
+    assert records[-3] == {"_type": "trim", "keep": 2}
+
+    loaded = SessionManager(tmp_path).get_or_create("cli:a")
+    assert [m["content"] for m in loaded.messages] == ["m4", "m5", "m6"]
+    assert loaded.summary == "earlier: m0-m3"
+    assert loaded._dead == 4 + 1 + 1  # trimmed messages, trim record, old metadata
+
+
+def test_clear_is_recorded_without_rewrite(tmp_path) -> None:
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "old")
+    manager.save(session)
+    session.clear()
+    session.add_message("user", "new")
+    manager.save(session)
+
+    assert _records(manager, "cli:a")[-2:] == [{"_type": "trim", "keep": 0}, session.messages[0]]
+    loaded = SessionManager(tmp_path).get_or_create("cli:a")
+    assert [m["content"] for m in loaded.messages] == ["new"]
+
+
+def test_compaction_drops_dead_records(tmp_path) -> None:
+    manager = SessionManager(tmp_path, store=JsonlSessionStore(tmp_path / ".nanobot" / "sessions", compact_after=10))
+    session = manager.get_or_create("cli:a")
+    for i in range(20):
+        session.add_message("user", f"m{i}")
+        manager.save(session)
+        if len(session.messages) > 4:
+            session.messages = session.messages[-4:]
+    manager.store._compactions["cli:a"].join()  # started in the background by save()
+    assert len(_records(manager, "cli:a")) == 1 + len(session._synced) + session._dead
+
+    manager.store.compact(session)
+    assert len(_records(manager, "cli:a")) == 1 + len(session._synced) and session._dead == 0
+    loaded = SessionManager(tmp_path).get_or_create("cli:a")
+    assert loaded.messages == session._synced
+
+
+def test_compaction_keeps_records_appended_meanwhile(tmp_path, monkeypatch) -> None:
+    import nanobot.session.jsonl_store as session_module
+
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "a")
+    session.add_message("user", "b")
+    manager.save(session)
+    session.messages = session.messages[1:]
+    manager.save(session)
+
+    tracer = session_module.get_tracer()
+
+    class SaveDuringCompaction:
+        def span(self, name, **attributes):
+            if name == "session.compact":
+                # Runs after the snapshot, before the temp file is written
+                session.add_message("user", "c")
+                manager.save(session)
+            return tracer.span(name, **attributes)
+
+    monkeypatch.setattr(session_module, "get_tracer", lambda: SaveDuringCompaction())
+    manager.store.compact(session)
+
+    records = _records(manager, "cli:a")
+    assert [r.get("_type") or r["content"] for r in records] == ["metadata", "b", "c"]
+    loaded = SessionManager(tmp_path).get_or_create("cli:a")
+    assert [m["content"] for m in loaded.messages] == ["b", "c"]
+    assert loaded._dead == 0
+
+
+def test_torn_last_record_is_skipped(tmp_path) -> None:
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "kept")
+    manager.save(session)
+    with open(manager.store._get_session_path("cli:a"), "a") as f:
+        f.write('{"role": "user", "cont')
+
+    loaded = SessionManager(tmp_path).get_or_create("cli:a")
+    assert [m["content"] for m in loaded.messages] == ["kept"]
+
+
+def test_rewrite_mode(tmp_path) -> None:
+    manager = SessionManager(tmp_path, store=JsonlSessionStore(tmp_path / ".nanobot" / "sessions", mode="rewrite"))
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "a")
+    manager.save(session)
+    session.summary = "s"
+    session.messages = []
+    manager.save(session)
+
+    assert _records(manager, "cli:a") == [
+        {"_type": "metadata", "key": "cli:a", "created_at": session.created_at.isoformat(),
+         "updated_at": session.updated_at.isoformat(), "metadata": {"summary": "s"}}
+    ]
+    with pytest.raises(ValueError):
+        JsonlSessionStore(tmp_path / "sessions", mode="journal")
+
+
+def test_compaction_is_abandoned_when_the_file_is_replaced(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions")
+    manager = SessionManager(tmp_path, store=store)
+    session = manager.get_or_create("cli:a")
+    for i in range(6):
+        session.add_message("user", f"m{i}")
+    manager.save(session)
+    session.messages = session.messages[-3:]
+    manager.save(session)
+
+    replay = store._replay
+
+    def replay_then_archive_and_restore(path, end=None):
+        result = replay(path, end=end)
+        store._replay = replay
+        # Between the replay and the copy: archive, reactivate and append
+        store.archive("cli:a")
+        revived = store.load("cli:a", tail=2)
+        revived.add_message("user", "new-after-restore")
+        store.save(revived)
+        return result
+
+    store._replay = replay_then_archive_and_restore
+    store.compact(session)
+
+    loaded = store.load("cli:a")
+    assert [m["content"] for m in loaded.messages] == ["m3", "m4", "m5", "new-after-restore"]
+    assert not store._get_session_path("cli:a").with_suffix(".jsonl.compact").exists()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+from nanobot.agent.summarizer import Summarizer
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.session.jsonl_store import JsonlSessionStore
+from nanobot.session.manager import Session, SessionManager
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+class SlowSummaryProvider(LLMProvider):
+    """Answers with a fixed summary once released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+        self.transcripts: list[str] = []
+
+    async def chat(self, messages, tools=None, model=None, **kwargs) -> LLMResponse:
+        self.transcripts.append(messages[-1]["content"])
+        await self.release.wait()
+        return LLMResponse(content="summary of the start")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def test_messages_get_increasing_seqs() -> None:
+    session = Session(key="cli:a")
+    for i in range(3):
+        session.add_message("user", f"m{i}")
+    assert [m["seq"] for m in session.messages] == [1, 2, 3]
+
+    session.clear()
+    session.add_message("user", "after reset")
+    assert session.messages[0]["seq"] == 4
+
+
+def test_commit_summary_drops_only_covered_messages() -> None:
+    session = Session(key="cli:a")
+    for i in range(5):
+        session.add_message("user", f"m{i}")
+
+    assert session.commit_summary("m0-m2", upto=3) == 3
+    assert [m["content"] for m in session.messages] == ["m3", "m4"]
+    assert session.summary_upto == 3
+
+
+def test_seqs_and_summary_point_survive_reload(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions")
+    manager = SessionManager(tmp_path, store=store)
+    session = manager.get_or_create("cli:a")
+    for i in range(4):
+        session.add_message("user", f"m{i}")
+    session.commit_summary("m0-m3", upto=4)
+    manager.save(session)
+
+    loaded = store.load("cli:a")
+    assert loaded.summary_upto == 4 and loaded.messages == []
+    loaded.add_message("user", "next")
+    assert loaded.messages[0]["seq"] == 5
+
+
+def test_messages_without_seq_are_numbered_below_the_rest(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions")
+    path = store._get_session_path("cli:a")
+    records = [
+        {"_type": "metadata", "key": "cli:a", "created_at": "2026-01-01T00:00:00", "metadata": {}},
+        {"role": "user", "content": "legacy 1"},
+        {"role": "user", "content": "legacy 2"},
+        {"role": "user", "content": "new", "seq": 1},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    session = store.load("cli:a")
+    assert [m["seq"] for m in session.messages] == [-1, 0, 1]
+
+    tail = store.load("cli:a", tail=1)
+    store.complete(tail)
+    assert [m["seq"] for m in tail.messages] == [-1, 0, 1]
+
+
+async def test_turns_during_summarization_are_kept(tmp_path) -> None:
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    for i in range(6):
+        session.add_message("user", f"m{i}")
+    provider = SlowSummaryProvider()
+
+    session.summary_in_progress = True
+    summarizer = Summarizer(provider, model="test-model")
+    summarizer.fire_and_forget(session, manager, list(session.messages), "", min_keep=2)
+    await asyncio.sleep(0)
+    # A turn finishes while the summary is being written
+    session.add_message("user", "during")
+    session.add_message("assistant", "reply")
+    provider.release.set()
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert "m3" in provider.transcripts[0] and "m4" not in provider.transcripts[0]
+    assert [m["content"] for m in session.messages] == ["m4", "m5", "during", "reply"]
+    assert session.summary == "summary of the start" and session.summary_upto == 4
+    reloaded = SessionManager(tmp_path).get_or_create("cli:a")
+    assert [m["content"] for m in reloaded.messages] == ["m4", "m5", "during", "reply"]
+
+
+async def test_failed_history_load_clears_summary_flag(tmp_path) -> None:
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    for i in range(6):
+        session.add_message("user", f"m{i}")
+
+    async def failing_load_full(session) -> None:
+        raise OSError("disk gone")
+
+    manager.load_full = failing_load_full
+    session.summary_in_progress = True
+    Summarizer(SlowSummaryProvider(), model="test-model").fire_and_forget(
+        session, manager, None, None, min_keep=2
+    )
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert not session.summary_in_progress
+    assert len(session.messages) == 6 and session.summary == ""
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from nanobot.session.jsonl_store import JsonlSessionStore, shard_sessions
+from nanobot.session.manager import SessionManager
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+def _save(store: JsonlSessionStore, key: str, count: int):
+    manager = SessionManager(store.sessions_dir, store=store)
+    session = manager.get_or_create(key)
+    for i in range(count):
+        session.add_message("user", f"{key} m{i}")
+    manager.save(session)
+    return session
+
+
+def test_sharded_paths_are_hashed_and_distinct(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions", layout="sharded")
+    # Both map to "telegram_1_2.jsonl" in the flat layout
+    _save(store, "telegram:1_2", 1)
+    _save(store, "telegram_1:2", 2)
+
+    path = store._get_session_path("telegram:1_2")
+    assert path.parent.parent.parent == store.sessions_dir
+    assert path.stem.startswith(path.parent.parent.name + path.parent.name)
+    assert len(store.load("telegram:1_2").messages) == 1
+    assert len(store.load("telegram_1:2").messages) == 2
+
+
+def test_manifest_answers_listing_without_session_files(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions", layout="sharded")
+    _save(store, "telegram:1", 3)
+    _save(store, "cli:direct", 1)
+    store._get_session_path("telegram:1").unlink()  # listing must not need it
+
+    fresh = JsonlSessionStore(tmp_path / "sessions", layout="sharded")
+    listed = fresh.list_sessions(channel="telegram")
+    assert [(s["key"], s["messages"]) for s in listed] == [("telegram:1", 3)]
+    assert sorted(fresh.keys()) == ["cli:direct", "telegram:1"]
+
+
+def test_manifest_tracks_counts_deletes_and_compacts(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions", layout="sharded")
+    session = _save(store, "cli:a", 4)
+    for i in range(10):
+        session.add_message("assistant", f"r{i}")
+        store.save(session)
+    session.messages = session.messages[-3:]
+    store.save(session)
+    assert store.manifest.get("cli:a")["messages"] == 3
+
+    # Appended saves from a tail-loaded session still count every message
+    tail = store.load("cli:a", tail=1)
+    tail.add_message("user", "more")
+    store.save(tail)
+    assert store.manifest.get("cli:a")["messages"] == 4
+
+    assert store.delete("cli:a")
+    assert list(store.keys()) == []
+    lines = (store.sessions_dir / "manifest.jsonl").read_text().splitlines()
+    assert len(lines) <= store.manifest.compact_ratio
+    assert JsonlSessionStore(tmp_path / "sessions", layout="sharded").list_sessions() == []
+
+
+def test_shard_sessions_moves_flat_files(tmp_path) -> None:
+    sessions_dir = tmp_path / "sessions"
+    flat = JsonlSessionStore(sessions_dir)
+    _save(flat, "telegram:1", 2)
+    _save(flat, "cli:direct", 1)
+    # A file from before keys were recorded in the metadata line
+    legacy = sessions_dir / "email_x.jsonl"
+    legacy.write_text(
+        json.dumps({"_type": "metadata", "created_at": "2026-01-01T00:00:00", "metadata": {}}) + "\n"
+        + json.dumps({"role": "user", "content": "old"}) + "\n"
+    )
+
+    assert shard_sessions(sessions_dir) == 3
+    assert list(sessions_dir.glob("*.jsonl")) == [sessions_dir / "manifest.jsonl"]
+
+    sharded = JsonlSessionStore(sessions_dir, layout="sharded")
+    assert sorted(sharded.keys()) == ["cli:direct", "email:x", "telegram:1"]
+    assert [m["content"] for m in sharded.load("email:x").messages] == ["old"]
+    assert shard_sessions(sessions_dir) == 0  # nothing left to move
@@ -0,0 +1,75 @@
+import pytest
+
+from nanobot.session.jsonl_store import JsonlSessionStore
+from nanobot.session.manager import SessionManager
+from nanobot.session.sqlite_store import SqliteSessionStore
+from nanobot.session.store import migrate_sessions
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+def _rows(store: SqliteSessionStore, key: str) -> list[tuple[int, str]]:
+    return store._db.execute(
+        "SELECT seq, json_extract(data, '$.content') FROM messages WHERE session_key = ? ORDER BY seq",
+        (key,),
+    ).fetchall()
+
+
+def test_saves_insert_and_trim_by_seq(tmp_path) -> None:
+    store = SqliteSessionStore(tmp_path / "sessions.db")
+    manager = SessionManager(tmp_path, store=store)
+    session = manager.get_or_create("telegram:1")
+    for i in range(4):
+        session.add_message("user", f"m{i}")
+    manager.save(session)
+
+    session.summary = "m0-m1"
+    session.messages = session.messages[2:]
+    session.add_message("assistant", "m4")
+    manager.save(session)
+
+    assert _rows(store, "telegram:1") == [(2, "m2"), (3, "m3"), (4, "m4")]
+    assert store._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    loaded = SqliteSessionStore(tmp_path / "sessions.db").load("telegram:1")
+    assert [m["content"] for m in loaded.messages] == ["m2", "m3", "m4"]
+    assert loaded.summary == "m0-m1"
+
+    # Clearing keeps seq monotonic
+    loaded.clear()
+    loaded.add_message("user", "fresh")
+    store.save(loaded)
+    assert _rows(store, "telegram:1") == [(5, "fresh")]
+
+
+def test_list_sessions_by_channel_and_recency(tmp_path) -> None:
+    store = SqliteSessionStore(tmp_path / "sessions.db")
+    manager = SessionManager(tmp_path, store=store)
+    for key in ("telegram:1", "slack:C1", "telegram:2"):
+        session = manager.get_or_create(key)
+        session.add_message("user", "hi")
+        manager.save(session)
+
+    assert [s["key"] for s in manager.list_sessions()] == ["telegram:2", "slack:C1", "telegram:1"]
+    assert [s["key"] for s in manager.list_sessions(channel="telegram", limit=1)] == ["telegram:2"]
+    assert manager.delete("slack:C1") and not manager.delete("slack:C1")
+    assert sorted(store.keys()) == ["telegram:1", "telegram:2"]
+
+
+def test_migrate_from_jsonl_keeps_exact_keys(tmp_path) -> None:
+    jsonl = JsonlSessionStore(tmp_path / "sessions")
+    manager = SessionManager(tmp_path, store=jsonl)
+    session = manager.get_or_create("email:a_b@example.com")
+    session.add_message("user", "hello")
+    session.summary = "earlier"
+    manager.save(session)
+
+    sqlite = SqliteSessionStore(tmp_path / "sessions.db")
+    assert migrate_sessions(jsonl, sqlite) == 1
+
+    migrated = sqlite.load("email:a_b@example.com")
+    assert [m["content"] for m in migrated.messages] == ["hello"]
+    assert migrated.summary == "earlier"
@@ -0,0 +1,148 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from nanobot.session import jsonl_store
+from nanobot.session.jsonl_store import JsonlSessionStore
+from nanobot.session.manager import SessionManager
+from nanobot.session.sqlite_store import SqliteSessionStore
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def make_store(request, tmp_path):
+    def make():
+        if request.param == "jsonl":
+            return JsonlSessionStore(tmp_path / "sessions")
+        return SqliteSessionStore(tmp_path / "sessions.db")
+    return make
+
+
+def _contents(session) -> list[str]:
+    return [m["content"] for m in session.messages]
+
+
+def _fill(store, key: str, count: int) -> None:
+    manager = SessionManager(Path(), store=store)
+    session = manager.get_or_create(key)
+    for i in range(count):
+        session.add_message("user", f"m{i}")
+        manager.save(session)
+
+
+def test_tail_load_reads_newest_messages(make_store) -> None:
+    _fill(make_store(), "cli:a", 10)
+
+    session = make_store().load("cli:a", tail=3)
+    assert _contents(session) == ["m7", "m8", "m9"]
+    assert not session._complete
+
+    small = make_store().load("cli:a", tail=50)
+    assert len(small.messages) == 10 and small._complete
+
+
+def test_complete_prepends_older_messages(make_store) -> None:
+    _fill(make_store(), "cli:a", 10)
+    store = make_store()
+    session = store.load("cli:a", tail=3)
+
+    store.complete(session)
+    assert _contents(session) == [f"m{i}" for i in range(10)]
+    assert session._complete
+
+    # Incremental saves still work after completing
+    session.add_message("user", "m10")
+    store.save(session)
+    assert _contents(make_store().load("cli:a")) == [f"m{i}" for i in range(11)]
+
+
+def test_save_from_tail_appends_without_older_messages(make_store) -> None:
+    _fill(make_store(), "cli:a", 10)
+    store = make_store()
+    session = store.load("cli:a", tail=3)
+    session.add_message("assistant", "m10")
+    store.save(session)
+
+    assert not session._complete
+    assert _contents(make_store().load("cli:a")) == [f"m{i}" for i in range(11)]
+
+
+def test_trim_from_tail_drops_unloaded_messages(make_store) -> None:
+    _fill(make_store(), "cli:a", 10)
+    store = make_store()
+    session = store.load("cli:a", tail=3)
+    session.summary = "m0-m7"
+    session.messages = session.messages[-2:]
+    store.save(session)
+
+    assert session._complete
+    reloaded = make_store().load("cli:a", tail=5)
+    assert _contents(reloaded) == ["m8", "m9"]
+    assert reloaded.summary == "m0-m7"
+    assert reloaded._complete
+
+
+def test_jsonl_tail_follows_trims_and_latest_metadata(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(jsonl_store, "_REVERSE_BLOCK", 16)  # exercise lines spanning blocks
+    store = JsonlSessionStore(tmp_path / "sessions")
+    manager = SessionManager(tmp_path, store=store)
+    session = manager.get_or_create("cli:a")
+    for i in range(6):
+        session.add_message("user", f"m{i}")
+    manager.save(session)
+    session.summary = "first"
+    session.messages = session.messages[-3:]
+    manager.save(session)
+    session.summary = "second"
+    session.messages = session.messages[-1:]
+    session.add_message("user", "m6")
+    manager.save(session)
+
+    for tail in (1, 2, 10):
+        loaded = store.load("cli:a", tail=tail)
+        assert _contents(loaded) == ["m5", "m6"][-tail:]
+        assert loaded.summary == "second"
+        assert loaded._complete == (tail >= 2)
+
+
+def test_jsonl_legacy_count_trim_falls_back_to_full_replay(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions")
+    path = store._get_session_path("cli:a")
+    records = [
+        {"_type": "metadata", "key": "cli:a", "created_at": "2026-01-01T00:00:00", "metadata": {}},
+        {"role": "user", "content": "m0"},
+        {"role": "user", "content": "m1"},
+        {"_type": "trim", "count": 1},
+        {"role": "user", "content": "m2"},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    assert _contents(store.load("cli:a", tail=1)) == ["m2"]
+    assert _contents(store.load("cli:a", tail=5)) == ["m1", "m2"]
+
+
+def test_compaction_keeps_messages_not_loaded(tmp_path) -> None:
+    store = JsonlSessionStore(tmp_path / "sessions")
+    _fill(store, "cli:a", 10)
+    session = store.load("cli:a", tail=2)
+    session.metadata["lang"] = "en"
+    store.save(session)
+
+    store.compact(session)
+    assert _contents(store.load("cli:a")) == [f"m{i}" for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_manager_completes_before_summarizing(tmp_path) -> None:
+    _fill(JsonlSessionStore(tmp_path / ".nanobot" / "sessions"), "cli:a", 10)
+    manager = SessionManager(tmp_path, load_tail=4)
+    session = manager.get_or_create("cli:a")
+    assert len(session.messages) == 4
+
+    await manager.load_full(session)
+    assert _contents(session) == [f"m{i}" for i in range(10)]
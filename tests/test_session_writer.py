@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from nanobot.session.jsonl_store import JsonlSessionStore
+from nanobot.session.manager import SessionManager
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+class CountingStore(JsonlSessionStore):
+    """JSONL store that records which thread each save ran on."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.saves: list[str] = []
+        self.threads: set[int] = set()
+
+    def save(self, session):
+        self.saves.append(session.key)
+        self.threads.add(threading.get_ident())
+        return super().save(session)
+
+
+def _manager(tmp_path, **kwargs) -> SessionManager:
+    store = CountingStore(tmp_path / "sessions")
+    return SessionManager(tmp_path, store=store, write_delay_s=0.05, **kwargs)
+
+
+def _contents(manager: SessionManager, key: str) -> list[str]:
+    path = manager.store._get_session_path(key)
+    return [r["content"] for r in map(json.loads, path.read_text().splitlines()) if "content" in r]
+
+
+async def test_saves_are_coalesced_and_written_off_the_loop(tmp_path) -> None:
+    manager = _manager(tmp_path)
+    session = await manager.get_or_create_async("cli:a")
+    for i in range(5):
+        session.add_message("user", f"m{i}")
+        manager.save(session)
+    assert manager.store.saves == []  # nothing written on the event loop
+
+    await manager.flush()
+    assert manager.store.saves == ["cli:a"]
+    assert threading.get_ident() not in manager.store.threads
+    assert _contents(manager, "cli:a") == [f"m{i}" for i in range(5)]
+
+
+async def test_changes_made_during_a_write_go_out_next(tmp_path) -> None:
+    manager = _manager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "first")
+    manager.save(session)
+    await asyncio.sleep(0.06)  # the writer has taken its snapshot
+    session.add_message("user", "second")
+    manager.save(session)
+
+    await manager.flush()
+    assert _contents(manager, "cli:a") == ["first", "second"]
+    assert session._synced == session.messages
+
+
+async def test_pending_sessions_are_not_evicted(tmp_path) -> None:
+    manager = _manager(tmp_path, cache_max_sessions=1)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "unsaved")
+    manager.save(session)
+    await manager.get_or_create_async("cli:b")
+
+    assert manager.get_or_create("cli:a") is session
+    await manager.flush()
+    await manager.get_or_create_async("cli:c")
+    assert "cli:a" not in manager._cache
+
+
+async def test_concurrent_loads_share_one_session(tmp_path) -> None:
+    manager = _manager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "hi")
+    manager.save(session)
+    await manager.flush()
+
+    fresh = _manager(tmp_path)
+    a, b = await asyncio.gather(fresh.get_or_create_async("cli:a"), fresh.get_or_create_async("cli:a"))
+    assert a is b and [m["content"] for m in a.messages] == ["hi"]
+
+
+def test_save_without_event_loop_writes_inline(tmp_path) -> None:
+    manager = _manager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.add_message("user", "hi")
+    manager.save(session)
+
+    assert manager.store.saves == ["cli:a"]
@@ -0,0 +1,149 @@
+from types import SimpleNamespace
+from typing import Any
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.streaming import ReplyStreamer
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.providers.base import LLMProvider, LLMResponse, StreamDelta
+from nanobot.providers.litellm_provider import LiteLLMProvider
+
+
+def _chunk(content=None, tool_calls=None, finish_reason=None, usage=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls, reasoning_content=None)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)],
+        usage=usage,
+    )
+
+
+def _tool_fragment(index, id=None, name=None, arguments=""):
+    return SimpleNamespace(
+        index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments)
+    )
+
+
+async def test_litellm_chat_stream_assembles_content_and_tool_calls(monkeypatch) -> None:
+    chunks = [
+        _chunk(content="Let me "),
+        _chunk(content="check."),
+        _chunk(tool_calls=[_tool_fragment(0, id="call_1", name="read_file", arguments='{"pa')]),
+        _chunk(tool_calls=[_tool_fragment(0, arguments='th": "a.txt"}')]),
+        _chunk(finish_reason="tool_calls"),
+        SimpleNamespace(
+            choices=[],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+        ),
+    ]
+
+    async def fake_acompletion(**kwargs: Any):
+        assert kwargs["stream"] is True
+
+        async def gen():
+            for c in chunks:
+                yield c
+
+        return gen()
+
+    monkeypatch.setattr("nanobot.providers.litellm_provider.acompletion", fake_acompletion)
+    provider = LiteLLMProvider(default_model="gpt-4o")
+
+    deltas = [d async for d in provider.chat_stream(messages=[{"role": "user", "content": "hi"}])]
+
+    assert [d.content for d in deltas if d.content] == ["Let me ", "check."]
+    response = deltas[-1].response
+    assert response is not None
+    assert response.content == "Let me check."
+    assert response.finish_reason == "tool_calls"
+    assert response.usage["prompt_tokens"] == 10
+    assert [(tc.id, tc.name, tc.arguments) for tc in response.tool_calls] == [
+        ("call_1", "read_file", {"path": "a.txt"})
+    ]
+    assert response.raw_assistant_message["tool_calls"][0]["function"]["name"] == "read_file"
+
+
+async def test_reply_streamer_publishes_first_delta_then_throttles() -> None:
+    published: list[OutboundMessage] = []
+
+    async def publish(msg: OutboundMessage) -> None:
+        published.append(msg)
+
+    streamer = ReplyStreamer(publish, channel="test", chat_id="c", interval_s=60)
+    await streamer.feed("Hel")
+    await streamer.feed("lo")
+
+    assert [m.content for m in published] == ["Hel"]
+    final = streamer.finish(OutboundMessage(channel="test", chat_id="c", content="Hello"))
+    assert final.stream_id == published[0].stream_id
+    assert final.stream_done is True
+
+
+class EditableChannel(BaseChannel):
+    name = "editable"
+    supports_streaming = True
+    stream_min_interval = 60
+
+    def __init__(self) -> None:
+        super().__init__(SimpleNamespace(allow_from=[]), MessageBus())
+        self.calls: list[tuple[str, str]] = []
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def send(self, msg: OutboundMessage) -> None:
+        self.calls.append(("send", msg.content))
+
+    async def _stream_start(self, msg: OutboundMessage) -> Any:
+        self.calls.append(("start", msg.content))
+        return "handle"
+
+    async def _stream_edit(self, handle: Any, msg: OutboundMessage) -> None:
+        self.calls.append(("edit", msg.content))
+
+
+async def test_send_stream_edits_one_message_and_always_applies_final() -> None:
+    channel = EditableChannel()
+
+    def update(content: str, done: bool = False) -> OutboundMessage:
+        return OutboundMessage(
+            channel="editable", chat_id="c", content=content, stream_id="s1", stream_done=done
+        )
+
+    await channel.send_stream(update("a"))
+    await channel.send_stream(update("ab"))  # throttled away
+    await channel.send_stream(update("abc", done=True))
+
+    assert channel.calls == [("start", "a"), ("edit", "abc")]
+    assert channel._stream_handles == {}
+
+
+class BrokenStreamProvider(LLMProvider):
+    """Streams part of a reply, then fails."""
+
+    async def chat(self, messages, tools=None, model=None, **kwargs) -> LLMResponse:
+        raise AssertionError("not streamed")
+
+    async def chat_stream(self, messages, tools=None, model=None, **kwargs):
+        yield StreamDelta(content="Half a")
+        raise RuntimeError("connection reset")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+async def test_failed_turn_closes_its_streamed_reply(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    bus = MessageBus()
+    loop = AgentLoop(bus, BrokenStreamProvider(), tmp_path, stream_replies=True)
+
+    await loop._handle_inbound(InboundMessage(channel="test", sender_id="u", chat_id="c", content="hi"))
+
+    partial, final = bus.outbound.get_nowait(), bus.outbound.get_nowait()
+    assert bus.outbound_size == 0
+    assert partial.content == "Half a" and not partial.stream_done
+    assert final.stream_id == partial.stream_id and final.stream_done
+    assert final.content == "Half a\n\nSorry, I encountered an error: connection reset"
@@ -0,0 +1,148 @@
+import asyncio
+
+from nanobot.agent.summarizer import (
+    CHUNK_SYSTEM_PROMPT,
+    MERGE_SYSTEM_PROMPT,
+    SUMMARY_SYSTEM_PROMPT,
+    Summarizer,
+)
+from nanobot.agent.tokens import TokenEstimator
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.session.manager import SessionManager
+
+
+class RecordingProvider(LLMProvider):
+    """Summarizes by echoing a label; tracks concurrency and can fail chunk calls."""
+
+    def __init__(self, fail_chunks: int = 0) -> None:
+        super().__init__()
+        self.calls: list[tuple[str, str]] = []
+        self.active = 0
+        self.peak = 0
+        self.fail_chunks = fail_chunks
+
+    async def chat(self, messages, tools=None, model=None, **kwargs) -> LLMResponse:
+        system, content = messages[0]["content"], messages[1]["content"]
+        self.calls.append((system, content))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if system == CHUNK_SYSTEM_PROMPT:
+            if self.fail_chunks:
+                self.fail_chunks -= 1
+                return LLMResponse(content="", finish_reason="error")
+            return LLMResponse(content=f"chunk summary {len(self.calls)}")
+        return LLMResponse(content="final summary")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def _summarizer(provider, **kwargs) -> Summarizer:
+    return Summarizer(provider, "test-model", tokens=TokenEstimator(use_tokenizer=False), **kwargs)
+
+
+def _messages(count: int, words: int = 50) -> list[dict]:
+    return [{"role": "user", "content": f"m{i} " + "word " * words, "seq": i + 1} for i in range(count)]
+
+
+def _by_prompt(provider, prompt: str) -> list[str]:
+    return [content for system, content in provider.calls if system == prompt]
+
+
+async def test_short_history_is_one_request() -> None:
+    provider = RecordingProvider()
+    summary = await _summarizer(provider).summarize("cli:a", _messages(3), "before")
+
+    assert summary == "final summary"
+    assert [system for system, _ in provider.calls] == [SUMMARY_SYSTEM_PROMPT]
+    assert "before" in provider.calls[0][1]
+
+
+async def test_long_history_is_chunked_and_merged() -> None:
+    provider = RecordingProvider()
+    summarizer = _summarizer(provider, chunk_tokens=200, max_concurrency=2)
+    summary = await summarizer.summarize("cli:a", _messages(20), "before")
+
+    chunks = _by_prompt(provider, CHUNK_SYSTEM_PROMPT)
+    assert len(chunks) > 2
+    assert all(summarizer.tokens.count(chunk) <= 200 for chunk in chunks)
+    assert "m0 " in chunks[0] and "m19 " in chunks[-1]
+    assert provider.peak <= 2
+    merges = _by_prompt(provider, MERGE_SYSTEM_PROMPT)
+    assert "before" in merges[-1] and summary == "final summary"
+
+
+async def test_oversized_message_is_split() -> None:
+    provider = RecordingProvider()
+    summarizer = _summarizer(provider, chunk_tokens=100)
+    await summarizer.summarize("cli:a", [{"role": "user", "content": "x" * 2000, "seq": 1}], "")
+
+    chunks = _by_prompt(provider, CHUNK_SYSTEM_PROMPT)
+    assert len(chunks) >= 5
+    assert all(summarizer.tokens.count(chunk) <= 100 for chunk in chunks)
+
+
+async def test_merges_in_rounds_when_chunk_summaries_are_too_long() -> None:
+    provider = RecordingProvider()
+    summarizer = _summarizer(provider, chunk_tokens=60)
+    await summarizer.summarize("cli:a", _messages(12, words=30), "")
+
+    merges = _by_prompt(provider, MERGE_SYSTEM_PROMPT)
+    assert len(merges) > 1
+    assert all(summarizer.tokens.count(m) <= 60 for m in merges[:-1])
+
+
+async def test_incremental_retry_only_summarizes_new_chunks() -> None:
+    provider = RecordingProvider(fail_chunks=1)
+    summarizer = _summarizer(provider, chunk_tokens=200, max_concurrency=1)
+    messages = _messages(10)
+
+    assert await summarizer.summarize("cli:a", messages, "") == ""
+    first_round = len(_by_prompt(provider, CHUNK_SYSTEM_PROMPT))
+
+    # Retried later with more evicted messages: only the failed and new chunks are requested
+    provider.calls.clear()
+    assert await summarizer.summarize("cli:a", messages + _messages(14)[10:], "") == "final summary"
+    retried = _by_prompt(provider, CHUNK_SYSTEM_PROMPT)
+    assert 0 < len(retried) < first_round + 2
+    assert not any("m1 " in chunk for chunk in retried[1:])
+
+
+async def test_without_incremental_every_chunk_is_resent() -> None:
+    provider = RecordingProvider()
+    summarizer = _summarizer(provider, chunk_tokens=200, incremental=False)
+    await summarizer.summarize("cli:a", _messages(10), "")
+    first = len(provider.calls)
+    await summarizer.summarize("cli:a", _messages(10), "")
+
+    assert len(provider.calls) == 2 * first
+
+
+class OverflowProvider(LLMProvider):
+    """Fails every request the way LiteLLMProvider reports a context overflow."""
+
+    async def chat(self, messages, tools=None, model=None, **kwargs) -> LLMResponse:
+        return LLMResponse(content="Error calling LLM: context length exceeded", finish_reason="context_length")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+async def test_context_overflow_keeps_history_and_summary(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:a")
+    session.summary = "before"
+    for i in range(6):
+        session.add_message("user", f"m{i}")
+
+    session.summary_in_progress = True
+    _summarizer(OverflowProvider()).fire_and_forget(session, manager, None, None, min_keep=2)
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert session.summary == "before" and session.summary_upto == 0
+    assert [m["content"] for m in session.messages] == [f"m{i}" for i in range(6)]
+    assert not session.summary_in_progress
@@ -0,0 +1,56 @@
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.tokens import IMAGE_TOKENS, MESSAGE_OVERHEAD, TokenEstimator, heuristic_tokens
+
+
+def _history(turns: int) -> list[dict[str, str]]:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} " + "x" * 400})
+        history.append({"role": "assistant", "content": f"answer {i} " + "y" * 400})
+    return history
+
+
+def test_heuristic_counts_cjk_per_character() -> None:
+    assert heuristic_tokens("a" * 40) == 10
+    assert heuristic_tokens("你好世界") == 4
+
+
+def test_message_count_includes_overhead_and_images() -> None:
+    tokens = TokenEstimator(use_tokenizer=False)
+    messages = [
+        {"role": "user", "content": [
+            {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,AAAA"}},
+            {"type": "text", "text": "a" * 40},
+        ]},
+    ]
+    assert tokens.count_messages(messages) == MESSAGE_OVERHEAD + IMAGE_TOKENS + 10
+
+
+def test_calibration_scales_towards_reported_usage() -> None:
+    tokens = TokenEstimator(use_tokenizer=False)
+    estimate = tokens.count("a" * 4000)
+    for _ in range(20):
+        tokens.calibrate(tokens.count("a" * 4000), 1500)
+    assert estimate == 1000
+    assert 1400 < tokens.count("a" * 4000) <= 1500
+
+
+def test_history_is_packed_newest_first_into_budget(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path, tokens=TokenEstimator(use_tokenizer=False))
+    history = _history(20)
+    system_only = builder.build_messages([], "hi")
+    fixed = builder.tokens.count_messages(system_only)
+
+    messages = builder.build_messages(history, "hi", token_budget=fixed + 1000)
+
+    kept = messages[1:-1]
+    assert 0 < len(kept) < len(history)
+    assert kept == history[-len(kept):]
+    assert kept[0]["role"] == "user"
+    assert builder.tokens.count_messages(messages) <= fixed + 1000
+
+
+def test_history_is_untouched_without_budget(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path, tokens=TokenEstimator(use_tokenizer=False))
+    history = _history(30)
+    assert builder.build_messages(history, "hi")[1:-1] == history
@@ -0,0 +1,49 @@
+from nanobot.agent.budget import ToolResultBudget, sample_head_tail
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.tokens import heuristic_tokens
+
+
+def test_small_results_pass_through_unchanged() -> None:
+    budget = ToolResultBudget(max_tokens=100, turn_tokens=1000)
+    assert budget.fit("read_file", "hello") == "hello"
+    assert budget.elided_tokens == 0
+
+
+def test_oversized_result_keeps_head_and_tail_and_reports_elision() -> None:
+    text = "\n".join(f"line {i:04d}" for i in range(2000))
+    fitted = sample_head_tail(text, 2000)
+
+    assert len(fitted) <= 2000
+    assert fitted.startswith("line 0000\n")
+    assert fitted.endswith("line 1999")
+    assert "elided from the middle" in fitted
+
+
+def test_turn_budget_shrinks_later_results_down_to_floor() -> None:
+    budget = ToolResultBudget(max_tokens=1000, turn_tokens=1500, per_tool={"web_fetch": 300}, min_tokens=100)
+    big = "x" * 8000  # ~2000 tokens
+
+    first = budget.fit("exec", big)
+    assert heuristic_tokens(first) <= 1000
+    second = budget.fit("web_fetch", big)
+    assert heuristic_tokens(second) <= 300
+    third = budget.fit("exec", big)
+    assert heuristic_tokens(third) <= 250  # remaining turn budget (~200) is below the cap
+    assert heuristic_tokens(budget.fork().fit("exec", big)) > 900  # fresh turn, fresh budget
+
+
+def test_wide_text_is_cut_to_the_same_token_budget() -> None:
+    budget = ToolResultBudget(max_tokens=500, turn_tokens=0)
+    fitted = budget.fit("web_fetch", "汉字" * 2000)  # ~4000 tokens at one per character
+
+    assert heuristic_tokens(fitted) <= 500
+    assert budget.used_tokens == heuristic_tokens(fitted)
+
+
+def test_add_tool_result_applies_budget(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path)
+    budget = ToolResultBudget(max_tokens=100, turn_tokens=0)
+    messages = builder.add_tool_result([], "call_1", "web_fetch", "y" * 5000, budget=budget)
+
+    assert len(messages[0]["content"]) <= 400
+    assert budget.elided_tokens > 0
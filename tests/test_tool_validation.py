@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
@@ -86,3 +87,51 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result
+
+
+class SlowTool(Tool):
+    def __init__(self, name: str, read_only: bool, log: list[str]) -> None:
+        self._name = name
+        self._read_only = read_only
+        self._log = log
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
+
+    @property
+    def description(self) -> str:
+        return "slow tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"delay": {"type": "number"}}}
+
+    async def execute(self, delay: float = 0.0, **kwargs: Any) -> str:
+        self._log.append(f"start {self._name}")
+        await asyncio.sleep(delay)
+        self._log.append(f"end {self._name}")
+        return f"{self._name}:{delay}"
+
+
+async def test_execute_batch_parallel_reads_keep_call_order() -> None:
+    log: list[str] = []
+    reg = ToolRegistry()
+    reg.register(SlowTool("read", read_only=True, log=log))
+    reg.register(SlowTool("write", read_only=False, log=log))
+
+    results = await reg.execute_batch([
+        ("read", {"delay": 0.03}),
+        ("read", {"delay": 0.0}),
+        ("write", {"delay": 0.0}),
+        ("read", {"delay": 0.0}),
+    ])
+
+    assert results == ["read:0.03", "read:0.0", "write:0.0", "read:0.0"]
+    # Both leading reads start before either finishes; the write is a barrier
+    assert log[:2] == ["start read", "start read"]
+    assert log[4:] == ["start write", "end write", "start read", "end read"]
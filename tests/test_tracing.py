@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.tracing import JsonlSpanExporter, Tracer, configure_tracing, read_spans
+from nanobot.tracing.tracer import NOOP_SPAN
+
+
+class SleepTool(Tool):
+    name = "sleep"
+    description = "sleep briefly"
+    parameters = {"type": "object", "properties": {}}
+
+    async def execute(self, **kwargs) -> str:
+        await asyncio.sleep(0.001)
+        return "ok"
+
+
+def test_disabled_tracer_returns_shared_noop_span() -> None:
+    tracer = Tracer()
+    assert tracer.span("anything", a=1) is NOOP_SPAN
+    assert tracer.start_trace("turn") is NOOP_SPAN
+
+
+async def test_turn_spans_nest_and_export_as_otlp(tmp_path) -> None:
+    path = tmp_path / "traces.jsonl"
+    tracer = configure_tracing(JsonlSpanExporter(path))
+    registry = ToolRegistry()
+    registry.register(SleepTool())
+    try:
+        with tracer.start_trace("turn", channel="test") as root:
+            with tracer.span("llm.chat") as llm:
+                llm.set_attribute("usage.prompt_tokens", 42)
+            await registry.execute("sleep", {})
+    finally:
+        configure_tracing(None)
+
+    record = json.loads(path.read_text().splitlines()[0])
+    otlp_spans = record["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {s["name"] for s in otlp_spans} == {"turn", "llm.chat", "tool.sleep"}
+    assert all(len(s["traceId"]) == 32 and len(s["spanId"]) == 16 for s in otlp_spans)
+
+    spans = read_spans(path, root.trace_id[:8])
+    by_name = {s["name"]: s for s in spans}
+    assert by_name["turn"]["parent_id"] is None
+    assert by_name["llm.chat"]["parent_id"] == root.span_id
+    assert by_name["tool.sleep"]["parent_id"] == root.span_id
+    assert by_name["llm.chat"]["attributes"]["usage.prompt_tokens"] == 42
+
+
+def test_exporter_rotates_by_size(tmp_path) -> None:
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(JsonlSpanExporter(path, max_bytes=200, backup_count=2))
+    for i in range(5):
+        with tracer.start_trace("turn", i=i):
+            pass
+
+    assert path.exists()
+    assert (tmp_path / "traces.jsonl.1").exists()
+    assert (tmp_path / "traces.jsonl.2").exists()
+    assert not (tmp_path / "traces.jsonl.3").exists()
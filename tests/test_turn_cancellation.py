@@ -0,0 +1,193 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from nanobot.agent.loop import INTERRUPTED_REPLY, AgentLoop
+from nanobot.agent.scheduler import TurnScheduler
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+
+@pytest.fixture(autouse=True)
+def _isolated_home(tmp_path, monkeypatch) -> None:
+    # SessionManager writes under ~/.nanobot/sessions
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+def _msg(content: str, chat_id: str = "a") -> InboundMessage:
+    return InboundMessage(channel="test", sender_id="u", chat_id=chat_id, content=content)
+
+
+class GatedProvider(LLMProvider):
+    """Blocks each chat call until released and records the prompts it saw."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[list[dict[str, Any]]] = []
+        self.called = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def chat(self, messages, tools=None, model=None, **kwargs) -> LLMResponse:
+        self.calls.append(list(messages))
+        self.called.set()
+        await self.release.wait()
+        return LLMResponse(content=f"reply {len(self.calls)}")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+async def test_cancel_stops_running_turn_and_worker_continues() -> None:
+    seen: list[str] = []
+
+    async def handler(msg: InboundMessage) -> None:
+        if msg.content == "slow":
+            await asyncio.sleep(10)
+        seen.append(msg.content)
+
+    scheduler = TurnScheduler(handler)
+    scheduler.submit("test:a", _msg("slow"))
+    scheduler.submit("test:a", _msg("next"))
+    await asyncio.sleep(0.01)
+
+    assert scheduler.cancel("test:a")
+    await asyncio.wait_for(scheduler.join(), timeout=1.0)
+    assert seen == ["next"]
+
+
+async def test_cancelled_exec_kills_background_children(tmp_path) -> None:
+    pid_file = tmp_path / "pid"
+    tool = ExecTool(working_dir=str(tmp_path))
+    task = asyncio.create_task(tool.execute(f"sleep 30 & echo $! > {pid_file}; wait"))
+    for _ in range(100):
+        if pid_file.exists() and pid_file.read_text().strip():
+            break
+        await asyncio.sleep(0.01)
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+    # Killed children may linger as zombies if nothing reaps them
+    status = Path(f"/proc/{int(pid_file.read_text())}/status")
+    assert not status.exists() or "zombie" in status.read_text()
+
+
+async def test_fold_adds_mid_turn_message_to_running_turn(tmp_path) -> None:
+    bus = MessageBus()
+    provider = GatedProvider()
+    loop = AgentLoop(bus, provider, tmp_path, turn_preemption="fold")
+    runner = asyncio.create_task(loop.run())
+    try:
+        await bus.publish_inbound(_msg("book a table"))
+        await asyncio.wait_for(provider.called.wait(), timeout=1.0)
+        await bus.publish_inbound(_msg("actually make it 8pm"))
+        await asyncio.sleep(0.05)
+        provider.release.set()
+
+        reply = await asyncio.wait_for(bus.consume_outbound(), timeout=2.0)
+    finally:
+        loop.stop()
+        runner.cancel()
+
+    assert reply.content == "reply 2"
+    assert provider.calls[1][-1] == {"role": "user", "content": "actually make it 8pm"}
+    history = loop.sessions.get_or_create("test:a").messages
+    assert [m["content"] for m in history] == ["book a table", "actually make it 8pm", "reply 2"]
+
+
+async def test_stop_command_cancels_turn_and_keeps_request_in_history(tmp_path) -> None:
+    bus = MessageBus()
+    provider = GatedProvider()
+    loop = AgentLoop(bus, provider, tmp_path)
+    runner = asyncio.create_task(loop.run())
+    try:
+        await bus.publish_inbound(_msg("long task"))
+        await asyncio.wait_for(provider.called.wait(), timeout=1.0)
+        await bus.publish_inbound(_msg("/stop"))
+
+        reply = await asyncio.wait_for(bus.consume_outbound(), timeout=2.0)
+        await asyncio.wait_for(loop.scheduler.join(), timeout=1.0)
+    finally:
+        loop.stop()
+        runner.cancel()
+
+    assert reply.content == "⏹ Stopped."
+    history = loop.sessions.get_or_create("test:a").messages
+    assert [m["content"] for m in history] == ["long task", INTERRUPTED_REPLY]
+
+
+async def test_backlog_in_one_chat_does_not_block_stop_in_another(tmp_path) -> None:
+    bus = MessageBus()
+    provider = GatedProvider()
+    loop = AgentLoop(bus, provider, tmp_path, max_concurrent_turns=1, max_queued_turns_per_session=2)
+    runner = asyncio.create_task(loop.run())
+    try:
+        await bus.publish_inbound(_msg("long task"))
+        await asyncio.wait_for(provider.called.wait(), timeout=1.0)
+        for i in range(6):
+            await bus.publish_inbound(_msg(f"more {i}"))
+        await bus.publish_inbound(_msg("/stop", chat_id="b"))
+
+        reply = await asyncio.wait_for(bus.consume_outbound(), timeout=2.0)
+    finally:
+        loop.stop()
+        runner.cancel()
+        loop.scheduler.cancel_all()
+
+    assert (reply.chat_id, reply.content) == ("b", "Nothing to stop.")
+    assert loop.scheduler.pending_turns == 2
+
+
+async def test_drain_runs_debounced_and_queued_messages_before_shutdown(tmp_path) -> None:
+    bus = MessageBus(debounce_ms=10_000, debounce_max_wait_ms=10_000)
+    provider = GatedProvider()
+    provider.release.set()
+    loop = AgentLoop(bus, provider, tmp_path)
+    await bus.publish_inbound(_msg("still typing"))
+
+    await bus.flush_debounced()
+    await asyncio.wait_for(loop.drain(), timeout=2.0)
+
+    reply = bus.outbound.get_nowait()
+    assert reply.content == "reply 1"
+    stored = loop.sessions.store.load("test:a")
+    assert [m["content"] for m in stored.messages] == ["still typing", "reply 1"]
+
+
+async def test_drain_cancels_turns_that_outlast_the_grace_period(tmp_path) -> None:
+    bus = MessageBus()
+    provider = GatedProvider()
+    loop = AgentLoop(bus, provider, tmp_path)
+    await bus.publish_inbound(_msg("long task"))
+
+    await asyncio.wait_for(loop.drain(timeout=0.05), timeout=2.0)
+
+    stored = loop.sessions.store.load("test:a")
+    assert [m["content"] for m in stored.messages] == ["long task", INTERRUPTED_REPLY]
+
+
+async def test_flood_across_sessions_is_shed_by_the_bus(tmp_path) -> None:
+    bus = MessageBus(max_inbound=5, overflow_policy="reject")
+    provider = GatedProvider()
+    loop = AgentLoop(bus, provider, tmp_path, max_concurrent_turns=1, max_queued_turns=3)
+    runner = asyncio.create_task(loop.run())
+    try:
+        for i in range(50):
+            await bus.publish_inbound(_msg("hi", chat_id=f"chat{i}"))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+
+        assert loop.scheduler.pending_turns == 3
+        assert bus.inbound_size == 5
+        assert bus.shed_total == 50 - 1 - 3 - 5  # one turn is running
+    finally:
+        loop.stop()
+        runner.cancel()
+        loop.scheduler.cancel_all()
@@ -0,0 +1,128 @@
+import asyncio
+
+from nanobot.agent.scheduler import TurnScheduler
+from nanobot.agent.tools.base import ToolContext
+from nanobot.agent.tools.message import MessageTool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.bus.events import InboundMessage, OutboundMessage
+
+
+def _msg(chat_id: str, content: str) -> InboundMessage:
+    return InboundMessage(channel="test", sender_id="u", chat_id=chat_id, content=content)
+
+
+async def test_same_session_turns_stay_ordered() -> None:
+    seen: list[str] = []
+
+    async def handler(msg: InboundMessage) -> None:
+        # Later messages finish faster; ordering must still hold
+        await asyncio.sleep(0.03 if msg.content == "1" else 0.0)
+        seen.append(msg.content)
+
+    scheduler = TurnScheduler(handler, max_concurrent=4)
+    for content in ("1", "2", "3"):
+        scheduler.submit("test:a", _msg("a", content))
+    await scheduler.join()
+
+    assert seen == ["1", "2", "3"]
+    assert scheduler.active_sessions == 0
+
+
+async def test_different_sessions_run_concurrently_up_to_cap() -> None:
+    running = 0
+    peak = 0
+
+    async def handler(msg: InboundMessage) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    scheduler = TurnScheduler(handler, max_concurrent=2)
+    for i in range(5):
+        scheduler.submit(f"test:{i}", _msg(str(i), "hi"))
+    await scheduler.join()
+
+    assert peak == 2
+
+
+async def test_handler_error_does_not_stall_session() -> None:
+    seen: list[str] = []
+
+    async def handler(msg: InboundMessage) -> None:
+        if msg.content == "boom":
+            raise RuntimeError("boom")
+        seen.append(msg.content)
+
+    scheduler = TurnScheduler(handler)
+    scheduler.submit("test:a", _msg("a", "boom"))
+    scheduler.submit("test:a", _msg("a", "after"))
+    await scheduler.join()
+
+    assert seen == ["after"]
+
+
+async def test_concurrent_turns_keep_their_own_tool_context() -> None:
+    sent: list[OutboundMessage] = []
+
+    async def send(msg: OutboundMessage) -> None:
+        await asyncio.sleep(0.01)
+        sent.append(msg)
+
+    registry = ToolRegistry()
+    registry.register(MessageTool(send_callback=send))
+
+    await asyncio.gather(
+        registry.execute("message", {"content": "to-a"}, context=ToolContext("test", "a")),
+        registry.execute("message", {"content": "to-b"}, context=ToolContext("test", "b")),
+    )
+
+    routes = {m.content: m.chat_id for m in sent}
+    assert routes == {"to-a": "a", "to-b": "b"}
+
+
+async def test_full_session_backlog_coalesces_and_other_sessions_run() -> None:
+    release = asyncio.Event()
+    seen: list[str] = []
+
+    async def handler(msg: InboundMessage) -> None:
+        if msg.content == "running":
+            await release.wait()
+        seen.append(msg.content)
+
+    scheduler = TurnScheduler(handler, max_concurrent=2, max_pending_per_session=2)
+    scheduler.submit("test:a", _msg("a", "running"))
+    await asyncio.sleep(0)
+    for content in ("q1", "q2", "q3", "q4"):
+        scheduler.submit("test:a", _msg("a", content))
+    scheduler.submit("test:b", _msg("b", "other"))
+
+    await asyncio.sleep(0.01)
+    assert seen == ["other"]  # session b is not held up by a's backlog
+    assert scheduler.pending_turns == 2 and scheduler.coalesced_count == 2
+
+    release.set()
+    await scheduler.join()
+    assert seen == ["other", "running", "q1", "q2\nq3\nq4"]
+
+
+async def test_wait_for_capacity_blocks_while_total_backlog_is_full() -> None:
+    release = asyncio.Event()
+
+    async def handler(msg: InboundMessage) -> None:
+        await release.wait()
+
+    scheduler = TurnScheduler(handler, max_concurrent=1, max_pending=2)
+    for i in range(3):
+        scheduler.submit(f"test:{i}", _msg(str(i), "hi"))
+    await asyncio.sleep(0)
+
+    waiter = asyncio.create_task(scheduler.wait_for_capacity())
+    await asyncio.sleep(0.01)
+    assert not waiter.done() and scheduler.pending_turns == 2
+
+    release.set()
+    await asyncio.wait_for(waiter, timeout=1.0)
+    await scheduler.join()
+    assert scheduler.pending_turns == 0